@@ -1,3 +1,11 @@
+import collections
+import copy
+import functools
+import instrumentation
+import math
+from fractions import Fraction
+
+
 def predict_next_element_recursive(lis, base_case, reduce_function, inference_function):
     """
     :param lis: the list to predict the next element of
@@ -33,7 +41,7 @@ def predict_next_element_recursive(lis, base_case, reduce_function, inference_fu
     return inference_function(lis, next_element_in_reduced_list)
 
 
-def predict_next_element(lis, base_case, reduce_function, inference_function):
+def predict_next_element(lis, base_case, reduce_function, inference_function, get_tail=None):
     """
     :param lis: the list to predict the next element of
 
@@ -50,19 +58,43 @@ def predict_next_element(lis, base_case, reduce_function, inference_function):
     predict_next_element(reduce_function(lis), reduce_function, inference_function) - i.e. the next element in the
     reduced list, and would give us back the next element in the list
 
+    :param get_tail: if given, it would be applied to each list once the list was reduced, and only its output would
+    be kept and given to inference_function instead of the list. this way only the current list is kept whole,
+    and the memory used does not grow with the number of reductions
+
     :return: the predicted next element in lis
     """
     if len(lis) == 0:
         return None
 
-    gens = [lis]
+    if get_tail is None:
+        def get_tail(current_gen):
+            return current_gen
+
+    if instrumentation.recorders:
+        return instrumentation.record_prediction(reduce_and_infer,
+                                                 lis,
+                                                 base_case,
+                                                 reduce_function,
+                                                 inference_function,
+                                                 get_tail)
+    return reduce_and_infer(lis, base_case, reduce_function, inference_function, get_tail)
+
+
+def reduce_and_infer(lis, base_case, reduce_function, inference_function, get_tail):
+    """
+    the body of predict_next_element, lis is not empty and get_tail is a function
+    """
+    gens = []
+    current_gen = lis
 
     while True:
-        base_case_result = base_case(gens[-1])
+        base_case_result = base_case(current_gen)
+        gens.append(get_tail(current_gen))
         if base_case_result is not None:
             gens.append([base_case_result])
             break
-        gens.append(reduce_function(gens[-1]))
+        current_gen = reduce_function(current_gen)
 
     # now predict the next element
     # the last gen contains only 1 element so we assume constant series
@@ -73,3 +105,796 @@ def predict_next_element(lis, base_case, reduce_function, inference_function):
                                                                    predicted_next_element_of_current_gen)
 
     return predicted_next_element_of_current_gen
+
+
+def predict_next_elements_side_by_side(lists, predictors):
+    """
+    predicts the next elements of lists that are reduced together, such as the slopes and the biases of SlopeAndBias.
+    each list is reduced by its own predictor, and all of them stop at the first depth in which any of them answers to
+    the base case of its predictor. there each list takes the base case number of its predictor, and the predictions
+    are inferred back up each list separately.
+    every reduced list is computed once, and only its inference tail is kept
+
+    :param lists: non empty lists
+    :param predictors: the predictor of each list
+    :return: the predicted next element of each list
+    """
+    if instrumentation.recorders:
+        return instrumentation.record_side_by_side_prediction(reduce_side_by_side_and_infer, lists, predictors)
+    return reduce_side_by_side_and_infer(lists, predictors)
+
+
+def reduce_side_by_side_and_infer(lists, predictors):
+    """
+    the body of predict_next_elements_side_by_side
+    """
+    gens = []
+    current_gen = list(lists)
+
+    while True:
+        gens.append([predictor.get_inference_tail(lis) for predictor, lis in zip(predictors, current_gen)])
+        if any(predictor.base_case(lis) is not None for predictor, lis in zip(predictors, current_gen)):
+            break
+        current_gen = [predictor.reduce_function(lis) for predictor, lis in zip(predictors, current_gen)]
+
+    predicted_next_elements = [predictor.get_base_case_number(lis) for predictor, lis in zip(predictors, current_gen)]
+    for tails in reversed(gens):
+        predicted_next_elements = [predictor.inference_function(tail, predicted_next_element)
+                                   for predictor, tail, predicted_next_element
+                                   in zip(predictors, tails, predicted_next_elements)]
+
+    return predicted_next_elements
+
+
+@functools.lru_cache(maxsize=None)
+def get_prediction_weights(length):
+    """
+    :param length:
+    :return: the weights w such that reducing a list of the given length by subtraction down to a single element and
+    inferring back up predicts sum(w[i] * lis[i]).
+    the binomial coefficients of the repeated differences, with alternating signs
+    """
+    return tuple((-1) ** (length - 1 - i) * math.comb(length, i) for i in range(length))
+
+
+def predict_next_element_by_weights(lis):
+    """
+    :param lis:
+    :return: the same prediction as reducing lis by subtraction all the way down, as a single dot product
+    """
+    if len(lis) == 0:
+        return None
+
+    weights = get_prediction_weights(len(lis))
+    return sum(weight * element for weight, element in zip(weights, lis))
+
+
+def predict_next_element_by_log_weights(lis):
+    """
+    the multiplicative counterpart of predict_next_element_by_weights, reducing lis by division is the same as
+    reducing the logs of its elements by subtraction. lis must not contain zeros.
+
+    the result is lis[-1] times the predicted ratio, so the scale of the prediction is exact and only the ratio goes
+    through the logs. the weights grow like 2 ** len(lis), so for long lists the rounding errors of the logs add up,
+    as they do in the reduction table, but not in the same way
+    :param lis:
+    :return: the same prediction as reducing lis by division all the way down, up to rounding
+    """
+    if len(lis) == 0:
+        return None
+
+    weights = list(get_prediction_weights(len(lis)))
+    # predict the ratio to the last element instead of the element itself
+    weights[-1] -= 1
+
+    log_of_ratio = math.fsum(weight * math.log(abs(element)) for weight, element in zip(weights, lis) if weight != 0)
+    ratio_is_negative = sum(weight for weight, element in zip(weights, lis) if element < 0) % 2 == 1
+
+    try:
+        ratio = math.exp(log_of_ratio)
+    except OverflowError:
+        # multiplying the floats of the reduction table overflows to inf as well
+        ratio = float('inf')
+    if ratio_is_negative:
+        ratio = -ratio
+    return multiply_by_ratio(lis[-1], ratio)
+
+
+def multiply_by_ratio(element, ratio):
+    """
+    :param element:
+    :param ratio:
+    :return: element * ratio. when element is an int too big for a float, the float ratio is multiplied by it exactly
+    and the product is rounded to an int, instead of raising OverflowError
+    """
+    try:
+        return element * ratio
+    except OverflowError:
+        if math.isfinite(ratio):
+            return round(element * Fraction(ratio))
+        # as if the int was converted to an infinite float
+        return (1 if element > 0 else -1) * ratio
+
+
+# the ratios of predict_next_element_by_exact_ratios are only normalised once their numerator or denominator is
+# longer than this many bits, most ratios of small integers never are
+EXACT_RATIO_GCD_THRESHOLD_BITS = 128
+
+
+def normalise_ratio(numerator, denominator):
+    gcd = math.gcd(numerator, denominator)
+    return numerator // gcd, denominator // gcd
+
+
+def divide_exact_ratios(numerators, denominators):
+    """
+    :param numerators:
+    :param denominators: the i'th ratio is numerators[i] / denominators[i]. a ratio whose numerator or denominator is
+    longer than EXACT_RATIO_GCD_THRESHOLD_BITS is normalised, the shorter ones might not be
+    :return: the numerators and the denominators of the ratios between consecutive ratios, in the same form
+    """
+    threshold = EXACT_RATIO_GCD_THRESHOLD_BITS
+    reduced_numerators, reduced_denominators = [], []
+    for i in range(1, len(numerators)):
+        # (a / b) / (c / d) = (a * d) / (b * c)
+        a, b, c, d = numerators[i], denominators[i], numerators[i - 1], denominators[i - 1]
+        numerator, denominator = a * d, b * c
+
+        if numerator.bit_length() > threshold or denominator.bit_length() > threshold:
+            # the same as Fraction does, divide the normalised ratios by the gcds across them, which are cheaper than
+            # the gcd of the products
+            if a.bit_length() <= threshold and b.bit_length() <= threshold:
+                a, b = normalise_ratio(a, b)
+            if c.bit_length() <= threshold and d.bit_length() <= threshold:
+                c, d = normalise_ratio(c, d)
+            gcd_of_numerators, gcd_of_denominators = math.gcd(a, c), math.gcd(d, b)
+            numerator = (a // gcd_of_numerators) * (d // gcd_of_denominators)
+            denominator = (b // gcd_of_denominators) * (c // gcd_of_numerators)
+
+        reduced_numerators.append(numerator)
+        reduced_denominators.append(denominator)
+    return reduced_numerators, reduced_denominators
+
+
+def predict_next_element_by_exact_ratios(lis):
+    """
+    the same prediction as reducing a list of ints by Fraction ratios, as DivisionFrac does, but each reduced list is
+    kept as a list of numerators and a list of denominators, which are only normalised when they get long and once at
+    the end, instead of creating a normalised Fraction for every ratio and every product.
+    a zero ends the reduction, as in Division
+
+    :param lis: a non empty list of ints
+    :return: an int if lis itself answers to the base case, otherwise a Fraction
+    """
+    record = instrumentation.get_running_record()
+    if record is not None:
+        record.record_row(lis)
+
+    if len(lis) == 1 or 0 in lis:
+        if record is not None:
+            record.record_base_case(lis, lis[-1])
+        return lis[-1] * 1
+
+    # the last ratio of each reduced list
+    last_numerators, last_denominators = [], []
+    numerators, denominators = lis[1:], lis[: -1]
+    while True:
+        last_numerators.append(numerators[-1])
+        last_denominators.append(denominators[-1])
+        if record is not None:
+            record.record_row(numerators)
+        if len(numerators) == 1 or 0 in numerators:
+            if record is not None:
+                record.record_base_case(numerators, 1)
+            break
+
+        numerators, denominators = divide_exact_ratios(numerators, denominators)
+
+    # the predicted next ratio of each reduced list is its last ratio times the predicted next ratio of the list below,
+    # and the base case predicts a ratio of 1. the product is normalised once, by Fraction
+    predicted_numerator, predicted_denominator = 1, 1
+    for i in range(len(last_numerators) - 1, -1, -1):
+        predicted_numerator *= last_numerators[i]
+        predicted_denominator *= last_denominators[i]
+
+    return lis[-1] * Fraction(predicted_numerator, predicted_denominator)
+
+
+class SharedRows:
+    """
+    the rows that different predictors compute from the same list, such as its differences or its ratios.
+    each row is computed by the first predictor that asks for it and handed as is to the rest, so the rows must not
+    be modified
+    """
+
+    def __init__(self, lis):
+        self.lis = lis
+        self.rows = {}
+
+    def get_row(self, name, create_row):
+        """
+        :param name: a key that identifies the row
+        :param create_row: called without arguments to create the row the first time it is asked for
+        :return: the row
+        """
+        if name not in self.rows:
+            self.rows[name] = create_row()
+        return self.rows[name]
+
+
+def reuse_first_reduced_list(function, lis, get_first_reduced_list):
+    """
+    :param function: a function of a list, such as a reduce_function
+    :param lis: the list the prediction starts from
+    :param get_first_reduced_list: returns what function returns on lis
+    :return: function, except that on lis itself get_first_reduced_list is called instead
+    """
+    def wrapped(current_lis):
+        if current_lis is lis:
+            return get_first_reduced_list()
+        return function(current_lis)
+
+    return wrapped
+
+
+class ReductionRow:
+    """
+    the part of a row in the reduction table that is needed in order to keep extending the row one element at a time.
+    the row itself is never stored, only its last element and a few facts about all of its elements
+    """
+
+    def __init__(self):
+        self.length = 0
+        self.last = None
+
+        # the maximal element in the row, as DivisionCanDealWithZero computes it.
+        # only tracked for predictors whose reduce_step can be undefined
+        self.maximum = -float('inf')
+        self.has_undefined_elements = False
+
+        # whether the row contains an element that makes it answer to the base case regardless of its length
+        self.contains_base_case_element = False
+
+        # whether the row has no maximal element, in which case it is replaced with the base case number
+        self.is_missing_maximum = False
+
+        # whether reduce_function of the predictor gave up on the row and replaced it with the base case number.
+        # min(map(abs, lis)) is nan when the first element is nan, so such rows never bail out
+        self.has_bailed_out = False
+        self.can_bail_out = True
+
+    def append(self, element, predictor, is_reduced):
+        """
+        :param element: the element to append. None means that the element is undefined and is filled with the maximal
+        element of the row, the way DivisionCanDealWithZero does
+        :param predictor:
+        :param is_reduced: whether the row was created by the reduce_step of the predictor
+        :return: False if the element changes the value given to the undefined elements already in the row,
+        in which case the row can not be extended and has to be rebuilt from scratch. True otherwise
+        """
+        if predictor.reduce_step_can_be_undefined and is_reduced:
+            if element is None:
+                self.has_undefined_elements = True
+                element = self.maximum
+            elif element > self.maximum:
+                if self.length > 0 and (self.has_undefined_elements or self.is_missing_maximum):
+                    return False
+                self.maximum = element
+
+            self.is_missing_maximum = self.maximum == -float('inf')
+
+        self.length += 1
+        self.last = element
+
+        if self.length == 1 and element != element:
+            self.can_bail_out = False
+        if is_reduced and self.can_bail_out and predictor.is_bailout_element(element):
+            self.has_bailed_out = True
+        if predictor.is_base_case_element(element):
+            self.contains_base_case_element = True
+        return True
+
+    def is_replaced(self):
+        return self.is_missing_maximum or self.has_bailed_out
+
+    def is_base_case(self):
+        return self.length == 1 or self.contains_base_case_element or self.is_replaced()
+
+
+class ReductionTable:
+    """
+    the reduction table that predict_next_element builds, kept up to date as elements are appended to the list.
+    only the last element of each row is kept, so appending an element costs O(depth) instead of rebuilding the table.
+
+    the predictor must implement the incremental methods of AbstractStaticPredictor (reduce_step,
+    is_base_case_element, is_bailout_element), its inference_function may only look at the last element of the
+    list it is given, and its reduce_step must never be undefined, see RebuildingReductionTable
+    """
+
+    def __init__(self, predictor, lis=(), max_depth=None):
+        """
+        :param predictor:
+        :param lis: the elements to start the table with
+        :param max_depth: if given, rows deeper than max_depth are not kept
+        """
+        self.predictor = predictor
+        self.max_depth = max_depth
+        self.rows = []
+        # the number of times the table was built again from its list, only a RebuildingReductionTable is
+        self.number_of_rebuilds = 0
+
+        self.extend(lis)
+
+    def __len__(self):
+        if len(self.rows) == 0:
+            return 0
+        return self.rows[0].length
+
+    def copy(self):
+        """
+        :return: a table which can be extended separately from this one
+        """
+        table_copy = copy.copy(self)
+        table_copy.rows = [copy.copy(row) for row in self.rows]
+        return table_copy
+
+    def get_depth(self):
+        """
+        :return: the index of the first row that answers to the base case
+        """
+        return len(self.rows) - 1
+
+    def append(self, element):
+        self.append_to_rows(element)
+
+    def append_to_rows(self, element):
+        """
+        :return: False if a row can not be extended by the element, and the table has to be rebuilt. True otherwise
+        """
+        for depth in range(len(self.rows) + 1):
+            if depth == len(self.rows):
+                self.rows.append(ReductionRow())
+
+            row = self.rows[depth]
+            previous_element = row.last
+            if not row.append(element, self.predictor, depth > 0):
+                return False
+
+            if row.is_base_case() or depth == self.max_depth:
+                del self.rows[depth + 1:]
+                return True
+
+            element = self.predictor.reduce_step(previous_element, row.last)
+
+    def extend(self, lis):
+        for element in lis:
+            self.append(element)
+
+    def get_tail(self, depth):
+        """
+        :return: the part of the row at the given depth that inference_function looks at
+        """
+        row = self.rows[depth]
+        if row.is_replaced():
+            return [self.predictor.get_base_case_number([row.last])]
+        return [row.last]
+
+    def predict(self, depth=None):
+        """
+        :param depth: the row to treat as the base case. by default it is the first row that answers to the base case
+        and the base case number is taken from base_case, as in predict_next_element.
+        if given, the base case number is taken from get_base_case_number
+        :return: the predicted next element in the list, or None if the list is empty
+        """
+        if len(self.rows) == 0:
+            return None
+
+        if instrumentation.recorders:
+            return instrumentation.record_engine_prediction(instrumentation.ENGINE_STREAM,
+                                                            self.predictor,
+                                                            None,
+                                                            self.predict_from_rows,
+                                                            depth,
+                                                            row_lengths=[row.length for row in self.rows])
+        return self.predict_from_rows(depth)
+
+    def predict_from_rows(self, depth):
+        """
+        the body of predict, the table is not empty
+        """
+        if depth is None:
+            depth = self.get_depth()
+            get_base_case_number = self.predictor.base_case
+        else:
+            get_base_case_number = self.predictor.get_base_case_number
+
+        predicted_next_element_of_current_gen = get_base_case_number(self.get_tail(depth))
+        for current_depth in range(depth, -1, -1):
+            predicted_next_element_of_current_gen = self.predictor.inference_function(
+                self.get_tail(current_depth),
+                predicted_next_element_of_current_gen)
+
+        return predicted_next_element_of_current_gen
+
+
+class RebuildingReductionTable(ReductionTable):
+    """
+    the ReductionTable of predictors whose reduce_step can be undefined, such as DivisionCanDealWithZero, which are
+    not fully incremental. an undefined element takes the value of the maximal element in its row, so when that
+    maximum changes the rows below it change everywhere and are rebuilt from the list.
+    the table keeps the whole list, so its memory grows with the list. appending an element costs O(depth) as long as
+    it does not change the maximum of a row with undefined elements, and otherwise as much as predicting the list from
+    scratch
+    """
+
+    def __init__(self, predictor, lis=(), max_depth=None):
+        self.history = []
+        super().__init__(predictor, lis, max_depth)
+
+    def copy(self):
+        table_copy = super().copy()
+        table_copy.history = list(self.history)
+        return table_copy
+
+    def append(self, element):
+        self.history.append(element)
+        if not self.append_to_rows(element):
+            self.rebuild()
+
+    def extend(self, lis):
+        # build the table once instead of rebuilding it on every change of a maximum
+        self.history.extend(lis)
+        self.rebuild()
+
+    def rebuild(self):
+        self.number_of_rebuilds += 1
+        self.rows = []
+
+        current_row = self.history
+        depth = 0
+        while len(current_row) > 0:
+            row = ReductionRow()
+            if depth > 0:
+                for element in current_row:
+                    if element is not None and element > row.maximum:
+                        row.maximum = element
+
+            filled_row = []
+            for element in current_row:
+                row.append(element, self.predictor, depth > 0)
+                filled_row.append(row.last)
+            self.rows.append(row)
+
+            if row.is_base_case() or depth == self.max_depth:
+                return
+
+            current_row = [self.predictor.reduce_step(filled_row[i - 1], filled_row[i])
+                           for i in range(1, len(filled_row))]
+            depth += 1
+
+
+def create_incremental_reduction_table(predictor, lis=(), max_depth=None):
+    """
+    :param predictor: a predictor that implements the incremental methods, see ReductionTable
+    :param lis:
+    :param max_depth:
+    :return: a ReductionTable of lis, or a RebuildingReductionTable if the reduce_step of the predictor can be undefined
+    """
+    if predictor.reduce_step_can_be_undefined:
+        return RebuildingReductionTable(predictor, lis, max_depth)
+    return ReductionTable(predictor, lis, max_depth)
+
+
+class HistoryReductionTable:
+    """
+    used for predictors that can not be reduced incrementally. keeps the whole list and predicts from scratch
+    """
+
+    def __init__(self, predictor, lis=()):
+        self.predictor = predictor
+        self.history = list(lis)
+
+    def __len__(self):
+        return len(self.history)
+
+    def copy(self):
+        return HistoryReductionTable(self.predictor, self.history)
+
+    def append(self, element):
+        self.history.append(element)
+
+    def extend(self, lis):
+        self.history.extend(lis)
+
+    def predict(self):
+        if len(self.history) == 0:
+            return None
+        return self.predictor.predict_sublist(self.history)
+
+
+class PredictionStream:
+    """
+    predicts the next element of a list that is given one element at a time.
+    the stream applies get_sublist_which_can_be_predicted as the elements arrive and keeps a reduction table of the
+    sublist, so the cost of each element does not depend on the number of elements that came before it.
+    the exceptions are the predictors whose reduce_step can be undefined, whose table keeps the whole sublist and is
+    sometimes rebuilt, see RebuildingReductionTable, and the predictors that can not be reduced incrementally at all,
+    which predict the sublist from scratch, see HistoryReductionTable
+    """
+
+    def __init__(self, predictor, lis=()):
+        self.predictor = predictor
+        self.table = predictor.create_reduction_table()
+
+        # the number of elements that are dropped from the sublist after it restarted
+        self.number_of_elements_to_drop = 0
+
+        self.extend(lis)
+
+    def __len__(self):
+        """
+        :return: the length of the sublist which can be predicted
+        """
+        return len(self.table)
+
+    def copy(self):
+        """
+        :return: a stream which can be extended separately from this one
+        """
+        stream_copy = copy.copy(self)
+        stream_copy.table = self.table.copy()
+        return stream_copy
+
+    def accept(self, element):
+        """
+        :return: whether element should be appended to the sublist which can be predicted
+        """
+        number_of_following_elements_to_drop = self.predictor.get_number_of_following_elements_to_drop(element)
+        if number_of_following_elements_to_drop is not None:
+            self.table = self.predictor.create_reduction_table()
+            self.number_of_elements_to_drop = number_of_following_elements_to_drop
+            return False
+
+        if self.number_of_elements_to_drop > 0:
+            self.number_of_elements_to_drop -= 1
+            return False
+
+        return True
+
+    def push(self, element):
+        if self.accept(element):
+            self.table.append(element)
+
+    def extend(self, lis):
+        elements_to_append = []
+        for element in lis:
+            table = self.table
+            accepted = self.accept(element)
+            if self.table is not table:
+                elements_to_append = []
+            if accepted:
+                elements_to_append.append(element)
+
+        self.table.extend(elements_to_append)
+
+    def peek_next(self):
+        """
+        :return: the prediction of predictor.predict on all the elements pushed so far
+        """
+        if len(self.table) == 0:
+            return None
+        return self.table.predict()
+
+
+class SlidingRow:
+    """
+    the last elements of a row in the reduction table of a sliding window, along with the index in the row of the last
+    element of each kind that affects the base case, so it can be told whether that element is still in the window
+    """
+
+    def __init__(self, maximal_length):
+        self.elements = collections.deque(maxlen=maximal_length)
+        # the number of elements ever appended to the row, so the last element is at index count - 1
+        self.count = 0
+
+        self.last_base_case_index = -1
+        self.last_bailout_index = -1
+        # undefined elements are those that reduce_step could not compute, they are None in elements
+        self.last_undefined_index = -1
+
+    def copy(self):
+        row_copy = copy.copy(self)
+        row_copy.elements = self.elements.copy()
+        return row_copy
+
+    def append(self, element, predictor, is_reduced):
+        index = self.count
+        self.count += 1
+        self.elements.append(element)
+
+        if element is None:
+            self.last_undefined_index = index
+            return
+        if predictor.is_base_case_element(element):
+            self.last_base_case_index = index
+        if is_reduced and predictor.is_bailout_element(element):
+            self.last_bailout_index = index
+
+    def get(self, index):
+        """
+        :param index: the index of an element in the row which is still kept
+        """
+        return self.elements[index - (self.count - len(self.elements))]
+
+
+class SlidingWindowStream:
+    """
+    predicts the next element of the last window_size elements that were given one element at a time, which is the
+    same as predictor.predict(lis[-window_size:]).
+
+    each row of the reduction table of the window is a suffix of the same row in the reduction table of the whole
+    list, since every element of a reduced row is computed from 2 neighbours. so each row keeps its last elements, and
+    as the window slides the first element of each row falls out of it. appending an element costs O(window_size)
+    and predicting costs O(depth), no matter how many elements came before the window.
+
+    the predictor must implement the incremental methods of AbstractStaticPredictor, with an inference_function that
+    only looks at the last element of the list and a reduce_step which is never undefined
+    """
+
+    def __init__(self, predictor, window_size, lis=()):
+        self.predictor = predictor
+        self.window_size = window_size
+        self.rows = []
+
+        # the index of the last element that restarted the sublist which can be predicted, and the number of elements
+        # after it that are dropped, see get_number_of_following_elements_to_drop
+        self.last_restart = None
+
+        self.extend(lis)
+
+    def __len__(self):
+        """
+        :return: the length of the sublist of the window which can be predicted
+        """
+        if len(self.rows) == 0:
+            return 0
+        return max(0, self.rows[0].count - self.get_start())
+
+    def copy(self):
+        stream_copy = copy.copy(self)
+        stream_copy.rows = [row.copy() for row in self.rows]
+        return stream_copy
+
+    def reduce_step(self, previous_element, element):
+        """
+        :return: the reduce_step of the predictor, None if it can not be computed
+        """
+        if previous_element is None or element is None:
+            return None
+        try:
+            return self.predictor.reduce_step(previous_element, element)
+        except (ZeroDivisionError, OverflowError):
+            # such elements can only be in the window when the predictor would raise on it, see peek_next
+            return None
+
+    def push(self, element):
+        if len(self.rows) == 0:
+            self.rows.append(SlidingRow(self.window_size))
+
+        number_of_following_elements_to_drop = self.predictor.get_number_of_following_elements_to_drop(element)
+        if number_of_following_elements_to_drop is not None:
+            self.last_restart = (self.rows[0].count, number_of_following_elements_to_drop)
+
+        self.rows[0].append(element, self.predictor, False)
+        depth = 1
+        while depth < self.window_size and self.rows[depth - 1].count >= 2:
+            if depth == len(self.rows):
+                self.rows.append(SlidingRow(self.window_size - depth))
+
+            previous_row = self.rows[depth - 1].elements
+            self.rows[depth].append(self.reduce_step(previous_row[-2], previous_row[-1]), self.predictor, True)
+            depth += 1
+
+    def extend(self, lis):
+        for element in lis:
+            self.push(element)
+
+    def get_start(self):
+        """
+        :return: the index of the first element of the sublist of the window which can be predicted
+        """
+        start = self.rows[0].count - len(self.rows[0].elements)
+        if self.last_restart is not None:
+            restart_index, number_of_following_elements_to_drop = self.last_restart
+            if restart_index >= start:
+                start = restart_index + 1 + number_of_following_elements_to_drop
+        return start
+
+    def is_replaced(self, depth, start):
+        """
+        :return: whether reduce_function of the predictor would replace the row at the given depth of the sublist which
+        starts at start with the base case number
+        """
+        row = self.rows[depth]
+        if depth == 0 or row.last_bailout_index < start:
+            return False
+
+        # min(map(abs, lis)) is nan when the first element is nan, so such rows never bail out
+        first_element = row.get(start)
+        return first_element == first_element
+
+    def get_tail(self, depth, is_replaced):
+        last = self.rows[depth].elements[-1]
+        if is_replaced:
+            return [self.predictor.get_base_case_number([last])]
+        return [last]
+
+    def peek_next(self):
+        """
+        :return: the prediction of predictor.predict on the last window_size elements pushed so far
+        """
+        if len(self.rows) == 0:
+            return None
+
+        if instrumentation.recorders:
+            return instrumentation.record_engine_prediction(instrumentation.ENGINE_STREAM,
+                                                            self.predictor,
+                                                            None,
+                                                            self.predict_from_rows,
+                                                            row_lengths=[len(row.elements) for row in self.rows])
+        return self.predict_from_rows()
+
+    def predict_from_rows(self):
+        """
+        the body of peek_next, the stream is not empty
+        """
+        start = self.get_start()
+        length = self.rows[0].count - start
+        if length <= 0:
+            return None
+
+        for depth in range(length):
+            row = self.rows[depth]
+            if row.last_undefined_index >= start:
+                # the predictor raises on the window, and it is left to raise the same way
+                return self.predictor.predict(list(self.rows[0].elements))
+
+            is_replaced = self.is_replaced(depth, start)
+            if is_replaced or length - depth == 1 or row.last_base_case_index >= start:
+                break
+
+        predicted_next_element_of_current_gen = self.predictor.base_case(self.get_tail(depth, is_replaced))
+        for current_depth in range(depth, -1, -1):
+            predicted_next_element_of_current_gen = self.predictor.inference_function(
+                self.get_tail(current_depth, is_replaced and current_depth == depth),
+                predicted_next_element_of_current_gen)
+
+        return predicted_next_element_of_current_gen
+
+
+class HistoryWindowStream:
+    """
+    used for predictors that can not be reduced incrementally. keeps the last window_size elements and predicts from
+    scratch, so predicting costs as much as predicting a list of window_size elements
+    """
+
+    def __init__(self, predictor, window_size, lis=()):
+        self.predictor = predictor
+        self.window = collections.deque(lis, maxlen=window_size)
+
+    def __len__(self):
+        return len(self.window)
+
+    def copy(self):
+        stream_copy = copy.copy(self)
+        stream_copy.window = self.window.copy()
+        return stream_copy
+
+    def push(self, element):
+        self.window.append(element)
+
+    def extend(self, lis):
+        self.window.extend(lis)
+
+    def peek_next(self):
+        return self.predictor.predict(list(self.window))
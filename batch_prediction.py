@@ -0,0 +1,221 @@
+"""
+this file contains a vectorised version of predict_next_element for the subtraction and division reductions,
+which reduces many lists at once with numpy. it is used by AbstractStaticPredictor.predict_batch
+"""
+import itertools
+import numpy as np
+
+SUBTRACTION = 'subtraction'
+DIVISION = 'division'
+
+# integers up to this size are converted to float64 without losing precision, so dividing them gives the same
+# result as dividing them in python
+MAXIMAL_EXACT_FLOAT_INTEGER = 2 ** 53
+
+MAXIMAL_INT64 = 2 ** 63 - 1
+
+# the lists are packed into arrays of at most about this many elements, so padding short lists to the length of
+# long ones does not blow up the memory
+MAXIMAL_NUMBER_OF_PACKED_ELEMENTS = 2 ** 22
+
+
+def get_batch_dtype(lis, operation):
+    """
+    :param lis:
+    :param operation: SUBTRACTION or DIVISION
+    :return: the numpy dtype that lis can be reduced with while giving exactly the same results as python.
+    None if there is no such dtype, for example if lis contains big integers or fractions
+    """
+    types_in_lis = set(map(type, lis))
+
+    if types_in_lis == {float}:
+        return np.float64
+
+    if types_in_lis == {int}:
+        if operation == SUBTRACTION:
+            bound, dtype = MAXIMAL_INT64, np.int64
+        else:
+            bound, dtype = MAXIMAL_EXACT_FLOAT_INTEGER, np.float64
+        if -bound <= min(lis) and max(lis) <= bound:
+            return dtype
+
+    return None
+
+
+def pack_lists(list_of_lists, dtype):
+    """
+    :param list_of_lists: non empty lists
+    :param dtype:
+    :return: an array in which the i'th row starts with the i'th list and is padded with zeros, and the lengths of the
+    lists
+    """
+    lengths = np.fromiter(map(len, list_of_lists), dtype=np.int64, count=len(list_of_lists))
+    values = np.zeros((len(list_of_lists), lengths.max()), dtype=dtype)
+
+    # the mask is filled row by row, so each list lands at the start of its own row
+    mask = np.arange(values.shape[1]) < lengths[:, None]
+    values[mask] = np.fromiter(itertools.chain.from_iterable(list_of_lists), dtype=dtype, count=lengths.sum())
+    return values, lengths
+
+
+def get_chunks_of_similar_lengths(list_of_lists):
+    """
+    :param list_of_lists:
+    :return: lists of indices into list_of_lists, such that the lists in each chunk have similar lengths and can be
+    packed together
+    """
+    indices_by_length = sorted(range(len(list_of_lists)), key=lambda i: len(list_of_lists[i]))
+
+    chunks = []
+    current_chunk = []
+    for i in indices_by_length:
+        if (len(current_chunk) + 1) * len(list_of_lists[i]) > MAXIMAL_NUMBER_OF_PACKED_ELEMENTS \
+                and len(current_chunk) > 0:
+            chunks.append(current_chunk)
+            current_chunk = []
+        current_chunk.append(i)
+
+    if len(current_chunk) > 0:
+        chunks.append(current_chunk)
+    return chunks
+
+
+def subtraction_overflows(left, right, result, is_addition, valid=True):
+    """
+    :return: for each row, whether the int64 computation of left - right (or left + right) overflowed anywhere
+    inside valid
+    """
+    if result.dtype != np.int64:
+        return np.zeros(result.shape[0], dtype=bool)
+
+    if is_addition:
+        overflowed = ((left ^ result) & (right ^ result)) < 0
+    else:
+        overflowed = ((left ^ right) & (left ^ result)) < 0
+    return (overflowed & valid).reshape(result.shape[0], -1).any(axis=1)
+
+
+def predict_next_elements_of_reduced_lists(values,
+                                           lengths,
+                                           operation,
+                                           zeros_end_reduction,
+                                           can_deal_with_zero,
+                                           minimum_allowed_number,
+                                           base_case_number):
+    """
+    runs predict_next_element on every row of values at once, without the final inference on the original lists
+
+    :param values: as returned from pack_lists
+    :param lengths:
+    :param operation: SUBTRACTION or DIVISION
+    :param zeros_end_reduction: whether a list that contains a zero answers to the base case, as in Division
+    :param can_deal_with_zero: whether the ratios after a zero are undefined and filled with the maximal ratio,
+    as in DivisionCanDealWithZero
+    :param minimum_allowed_number: if not None, a reduced list that contains a number smaller than it in absolute value
+    is replaced with the base case number, as in ImprovedDivision
+    :param base_case_number: the number the base case gives, the base case is assumed to be a list of length 1
+
+    :return: 4 arrays.
+    depths - the index of the first reduced list of each list that answers to the base case, 0 for the list itself
+    is_replaced - whether that reduced list was replaced with the base case number
+    predictions - the predicted next element of the first reduced list of each list, where depths is at least 1
+    overflowed - whether the int64 computation overflowed, in which case the other 2 arrays are meaningless for that
+    list
+    """
+    number_of_lists = len(lengths)
+    if operation == SUBTRACTION:
+        reduce_operation, inference_operation = np.subtract, np.add
+    else:
+        reduce_operation, inference_operation = np.divide, np.multiply
+
+    depths = np.zeros(number_of_lists, dtype=np.int64)
+    is_replaced = np.zeros(number_of_lists, dtype=bool)
+    overflowed = np.zeros(number_of_lists, dtype=bool)
+
+    # lasts[k][i] is the last element of the k'th reduced list of the i'th list
+    lasts = []
+
+    # the lists whose reduction did not reach the base case yet
+    indices = np.arange(number_of_lists)
+    current_lists = values
+    current_lengths = lengths
+    depth = 0
+
+    with np.errstate(all='ignore'):
+        while len(indices) > 0:
+            valid = np.arange(current_lists.shape[1]) < current_lengths[:, None]
+
+            last = np.zeros(number_of_lists, dtype=values.dtype)
+            last[indices] = current_lists[np.arange(len(indices)), current_lengths - 1]
+            lasts.append(last)
+
+            answers_to_base_case = current_lengths == 1
+            if zeros_end_reduction:
+                answers_to_base_case |= ((current_lists == 0) & valid).any(axis=1)
+            depths[indices[answers_to_base_case]] = depth
+
+            to_reduce = ~answers_to_base_case
+            indices = indices[to_reduce]
+            current_lengths = current_lengths[to_reduce] - 1
+            if len(indices) == 0:
+                break
+            current_lists = current_lists[to_reduce, :current_lengths.max() + 1]
+
+            previous_elements = current_lists[:, :-1]
+            following_elements = current_lists[:, 1:]
+            reduced_lists = reduce_operation(following_elements, previous_elements)
+            valid = np.arange(reduced_lists.shape[1]) < current_lengths[:, None]
+            depth += 1
+
+            reduced_overflowed = subtraction_overflows(following_elements, previous_elements, reduced_lists, False,
+                                                       valid)
+
+            reduced_is_replaced = np.zeros(len(indices), dtype=bool)
+            if can_deal_with_zero:
+                undefined = valid & (previous_elements == 0)
+                defined = valid & ~undefined & ~np.isnan(reduced_lists)
+                maximum = np.where(defined, reduced_lists, -np.inf).max(axis=1)
+                # python keeps the first of equal maximal elements, which matters for the sign of a zero maximum
+                first_zero = np.argmax(defined & (reduced_lists == 0), axis=1)
+                maximum = np.where(maximum == 0, reduced_lists[np.arange(len(indices)), first_zero], maximum)
+                reduced_lists = np.where(undefined, maximum[:, None], reduced_lists)
+                # the list was all zeros
+                reduced_is_replaced |= maximum == -np.inf
+
+            if minimum_allowed_number is not None:
+                absolute_values = np.abs(reduced_lists)
+                # min(map(abs, lis)) is nan when the first element is nan, and nan is never smaller than anything
+                first_is_nan = np.isnan(absolute_values[:, 0])
+                smallest = np.where(valid & ~np.isnan(absolute_values), absolute_values, np.inf).min(axis=1)
+                reduced_is_replaced |= ~first_is_nan & (smallest < minimum_allowed_number)
+
+            overflowed[indices[reduced_overflowed]] = True
+            depths[indices[reduced_is_replaced]] = depth
+            is_replaced[indices[reduced_is_replaced]] = True
+
+            to_keep = ~(reduced_overflowed | reduced_is_replaced)
+            indices = indices[to_keep]
+            current_lists = reduced_lists[to_keep]
+            current_lengths = current_lengths[to_keep]
+
+        # now predict the next element of each reduced list, from the deepest one back up to the first
+        predictions = np.zeros(number_of_lists, dtype=values.dtype)
+        replaced_prediction = inference_operation(base_case_number, base_case_number)
+        for depth in range(depths.max(initial=0), 0, -1):
+            if depth == len(lasts):
+                # only replaced lists reach this depth, and their last element is not used
+                lasts.append(np.zeros(number_of_lists, dtype=values.dtype))
+
+            predicted_at_base_case = np.where(is_replaced,
+                                              replaced_prediction,
+                                              inference_operation(lasts[depth], base_case_number))
+            predicted_from_reduced = inference_operation(lasts[depth], predictions)
+
+            inferred = depths > depth
+            overflowed |= inferred & subtraction_overflows(lasts[depth], predictions, predicted_from_reduced, True)
+
+            predictions = np.where(depths == depth,
+                                   predicted_at_base_case,
+                                   np.where(inferred, predicted_from_reduced, predictions))
+
+    return depths, is_replaced, predictions, overflowed
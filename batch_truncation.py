@@ -0,0 +1,46 @@
+"""
+this file contains a vectorised version of TruncationWrapperCreator.truncate_array, which rounds a whole list of
+numbers with numpy and gives exactly the same results as rounding each of them in python
+"""
+import numpy as np
+
+# the powers of 10 up to this one are exact in float64, so dividing by them is correctly rounded
+MAXIMAL_EXACT_POWER_OF_10 = 22
+
+# from this size on the spacing between float64 numbers is at least 1, so rint can not round them correctly
+MINIMAL_INEXACT_FLOAT_INTEGER = 2.0 ** 52
+
+
+def truncate_array(array_of_numbers, truncation_value):
+    """
+    :param array_of_numbers: a list of numbers that can be converted to float
+    :param truncation_value: the number of digits to keep after the decimal point. a negative value rounds to tens,
+    hundreds and so on, as round does
+    :return: a list with round(float(x), truncation_value) for each x in array_of_numbers.
+
+    numpy rounds by rint(x * 10 ** truncation_value) / 10 ** truncation_value. the division is correctly rounded, so the
+    result only differs from python where the multiplication rounds x * 10 ** truncation_value across a half, or where
+    the scaled number is too big for rint. those elements are rounded again in python.
+    for a negative truncation_value 10 ** truncation_value is not exact in float64, so the whole list is rounded in
+    python
+    """
+    values = np.fromiter(array_of_numbers, dtype=np.float64, count=len(array_of_numbers))
+    if truncation_value < 0 or truncation_value > MAXIMAL_EXACT_POWER_OF_10:
+        return [round(x, truncation_value) for x in values.tolist()]
+
+    scale = 10.0 ** truncation_value
+    with np.errstate(all='ignore'):
+        scaled = values * scale
+        truncated = np.rint(scaled) / scale
+
+        absolute_scaled = np.abs(scaled)
+        distance_from_half = np.abs(absolute_scaled - np.floor(absolute_scaled) - 0.5)
+        needs_python = (distance_from_half <= 2 * np.spacing(absolute_scaled)) \
+            | (absolute_scaled >= MINIMAL_INEXACT_FLOAT_INTEGER)
+        # inf and nan are left as they are, like round does
+        needs_python &= np.isfinite(values)
+
+    truncated = truncated.tolist()
+    for i in np.flatnonzero(needs_python).tolist():
+        truncated[i] = round(float(values[i]), truncation_value)
+    return truncated
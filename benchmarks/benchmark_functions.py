@@ -0,0 +1,275 @@
+"""
+this file contains the functions that time the predictors on synthetic sequences, save the results as json and compare
+them against a stored baseline
+"""
+from benchmarks.synthetic_sequences import SEQUENCE_KINDS, can_generate, get_sequence
+from extend_prediction_capabilities import create_prediction_series, get_lists_of_predictions
+import predictors
+import datetime
+import inspect
+import json
+import math
+import platform
+import signal
+import time
+
+# the truncation value the truncated predictors are created with
+BENCHMARK_TRUNCATION_VALUE = 3
+
+
+# the functions that are timed on each predictor and sequence
+BENCHMARKED_FUNCTIONS = {
+    'predict': lambda predictor, lis: predictor.predict(lis),
+    'create_prediction_series': lambda predictor, lis: create_prediction_series(lis, predictor),
+    'get_lists_of_predictions': lambda predictor, lis: get_lists_of_predictions(lis, predictor),
+}
+
+
+def get_all_predictors():
+    """
+    :return: an instance of every predictor class in predictors.py
+    """
+    all_predictors = []
+    for value in vars(predictors).values():
+        if not inspect.isclass(value) or value is predictors.AbstractStaticPredictor \
+                or not issubclass(value, predictors.AbstractStaticPredictor):
+            continue
+
+        if isinstance(value, predictors.TruncationWrapperCreator):
+            all_predictors.append(value(BENCHMARK_TRUNCATION_VALUE))
+        else:
+            all_predictors.append(value())
+    return all_predictors
+
+
+def get_predictor_name(predictor):
+    # the name of SlopeAndBias spans several lines
+    return predictor.get_name().replace('\n', ', ')
+
+
+class CallTimedOut(Exception):
+    pass
+
+
+def raise_call_timed_out(signal_number, frame):
+    raise CallTimedOut()
+
+
+def call_with_time_limit(function, time_limit):
+    """
+    :param function: called without arguments
+    :param time_limit: seconds, after which CallTimedOut is raised inside function. some predictors never finish on
+    some sequences, such as DivisionFrac whose fractions grow exponentially with the depth.
+    the limit is only enforced where the timer signal exists, and arithmetic on a single huge number is only
+    interrupted once it is done
+    :return: what function returns
+    """
+    if not hasattr(signal, 'setitimer'):
+        return function()
+
+    previous_handler = signal.signal(signal.SIGALRM, raise_call_timed_out)
+    signal.setitimer(signal.ITIMER_REAL, time_limit)
+    try:
+        return function()
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+def time_call(function, minimal_total_time, minimal_number_of_repeats=3):
+    """
+    :param function: called without arguments
+    :param minimal_total_time: function is called again until this many seconds were spent in it
+    :param minimal_number_of_repeats:
+    :return: the fastest time of a single call, in seconds
+    """
+    fastest_time = float('inf')
+    total_time = 0
+    number_of_repeats = 0
+    while number_of_repeats < minimal_number_of_repeats or total_time < minimal_total_time:
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+
+        fastest_time = min(fastest_time, elapsed)
+        total_time += elapsed
+        number_of_repeats += 1
+    return fastest_time
+
+
+def estimate_time(lengths, times, length):
+    """
+    :param lengths: the lengths that were already timed, in increasing order
+    :param times: the time of each of them
+    :param length: a longer length
+    :return: the estimated time of length, assuming that the time grows like a power of the length. the power is
+    taken from the last 2 times, and is at least 1. with a single time the power is 2
+    """
+    if len(lengths) == 0:
+        return 0
+
+    power = 2
+    if len(lengths) > 1 and times[-2] > 0 and times[-1] > 0:
+        power = max(1, math.log(times[-1] / times[-2]) / math.log(lengths[-1] / lengths[-2]))
+    return times[-1] * (length / lengths[-1]) ** power
+
+
+def run_benchmarks(list_of_predictors,
+                   lengths,
+                   sequence_kinds=None,
+                   function_names=None,
+                   minimal_total_time=0.05,
+                   maximal_time_per_call=1.0,
+                   baseline_results=None):
+    """
+    times each function on each predictor and each kind of sequence, from the shortest length to the longest.
+    the time of the next length is estimated from the times of the previous lengths, see estimate_time, and once the
+    estimate is above maximal_time_per_call the longer lengths are skipped, unless the baseline timed them.
+    a call that takes longer than 10 times maximal_time_per_call, or than 10 times its time in the baseline, is stopped
+    and recorded as a 'timeout' error, and the longer lengths are skipped
+
+    :param list_of_predictors:
+    :param lengths: the lengths of the sequences
+    :param sequence_kinds: names from SEQUENCE_KINDS, None for all of them
+    :param function_names: names from BENCHMARKED_FUNCTIONS, None for all of them
+    :param minimal_total_time: see time_call
+    :param maximal_time_per_call:
+    :param baseline_results: the results of an earlier run that this run is compared against, see compare_results.
+    the cases the baseline timed are always timed, so a case that got slower is compared and not skipped
+    :return: a list of results, each is a dict with the function, the predictor, the sequence kind, the length and
+    either the seconds a single call took, the error the call raised, or the error 'skipped' if it was not timed
+    """
+    if sequence_kinds is None:
+        sequence_kinds = list(SEQUENCE_KINDS)
+    if function_names is None:
+        function_names = list(BENCHMARKED_FUNCTIONS)
+    lengths = sorted(lengths)
+    baseline_seconds = get_baseline_seconds(baseline_results or [])
+
+    results = []
+    for kind in sequence_kinds:
+        sequences = {n: get_sequence(kind, n) for n in lengths if can_generate(kind, n)}
+        for function_name in function_names:
+            function = BENCHMARKED_FUNCTIONS[function_name]
+            for predictor in list_of_predictors:
+                timed_lengths, times = [], []
+                timed_out = False
+                for n, lis in sequences.items():
+                    result = {'function': function_name,
+                              'predictor': get_predictor_name(predictor),
+                              'sequence': kind,
+                              'length': n}
+                    key = get_result_key(result)
+                    if timed_out or (estimate_time(timed_lengths, times, n) > maximal_time_per_call
+                                     and key not in baseline_seconds):
+                        result['error'] = 'skipped'
+                        results.append(result)
+                        continue
+
+                    time_limit = 10 * max(maximal_time_per_call, baseline_seconds.get(key, 0))
+                    try:
+                        result['seconds'] = call_with_time_limit(
+                            lambda: time_call(lambda: function(predictor, lis), minimal_total_time),
+                            time_limit)
+                    except CallTimedOut:
+                        result['error'] = 'timeout'
+                        results.append(result)
+                        timed_out = True
+                        continue
+                    except Exception as e:
+                        result['error'] = type(e).__name__
+                        results.append(result)
+                        continue
+
+                    results.append(result)
+                    timed_lengths.append(n)
+                    times.append(result['seconds'])
+
+    return results
+
+
+def save_results(results, path):
+    """
+    :param results: as returned from run_benchmarks
+    :param path: the json file to write
+    :return:
+    """
+    with open(path, 'w') as f:
+        json.dump({'created': datetime.datetime.now().isoformat(timespec='seconds'),
+                   'python': platform.python_version(),
+                   'platform': platform.platform(),
+                   'results': results},
+                  f,
+                  indent=1)
+
+
+def load_results(path):
+    with open(path, 'r') as f:
+        return json.load(f)['results']
+
+
+def get_result_key(result):
+    return result['function'], result['predictor'], result['sequence'], result['length']
+
+
+def get_baseline_seconds(baseline_results):
+    """
+    :return: a dict from the key of each result the baseline timed to its seconds
+    """
+    return {get_result_key(result): result['seconds'] for result in baseline_results if 'seconds' in result}
+
+
+def select_results(results, list_of_predictors, lengths, sequence_kinds=None, function_names=None):
+    """
+    :return: the results of the cases a run of run_benchmarks with these arguments times, so a run of some of the
+    cases is only compared against the same cases in the baseline
+    """
+    predictor_names = {get_predictor_name(predictor) for predictor in list_of_predictors}
+    return [result for result in results
+            if result['predictor'] in predictor_names
+            and result['length'] in lengths
+            and (sequence_kinds is None or result['sequence'] in sequence_kinds)
+            and (function_names is None or result['function'] in function_names)]
+
+
+def compare_results(results, baseline_results, threshold):
+    """
+    :param results:
+    :param baseline_results:
+    :param threshold: a result regressed if it is slower than its baseline by more than this fraction,
+    0.1 means more than 10% slower
+    :return: the regressions, each is a tuple of the key of the result (function, predictor, sequence, length),
+    the seconds in the baseline, the seconds now and the error now. a case the baseline timed regressed if it is
+    slower, or if it was not timed now: its error is the error it raised, 'timeout', 'skipped', or 'missing' if this
+    run has no result for it. the cases the baseline did not time are ignored
+    """
+    results_by_key = {get_result_key(result): result for result in results}
+
+    regressions = []
+    for key, seconds_in_baseline in get_baseline_seconds(baseline_results).items():
+        result = results_by_key.get(key, {'error': 'missing'})
+        if 'seconds' not in result:
+            regressions.append((key, seconds_in_baseline, None, result['error']))
+        elif result['seconds'] > seconds_in_baseline * (1 + threshold):
+            regressions.append((key, seconds_in_baseline, result['seconds'], None))
+    return regressions
+
+
+def print_results(results):
+    for result in results:
+        key = ' | '.join(map(str, get_result_key(result)))
+        if 'seconds' in result:
+            print(f'{key}: {result["seconds"] * 1e6:.1f} us')
+        elif result['error'] == 'skipped':
+            print(f'{key}: skipped')
+        else:
+            print(f'{key}: raised {result["error"]}')
+
+
+def print_regressions(regressions):
+    for key, baseline_seconds, seconds, error in regressions:
+        if error is not None:
+            print(f'{" | ".join(map(str, key))}: {baseline_seconds * 1e6:.1f} us -> {error}')
+        else:
+            print(f'{" | ".join(map(str, key))}: {baseline_seconds * 1e6:.1f} us -> {seconds * 1e6:.1f} us '
+                  f'({seconds / baseline_seconds:.2f}x)')
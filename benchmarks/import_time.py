@@ -0,0 +1,92 @@
+"""
+this file contains the functions that time the cold start of a short lived process, such as a worker or a command line
+invocation: importing the predictors, creating a predictor by its name and its first predictions. each case is timed
+in a new python process, so nothing it imports is already in memory
+"""
+from definitions import ROOT_DIR
+import compileall
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+# the statements each case times, one after the other in a new process, the time of the last one is the time of the case
+COLD_START_CASES = {
+    'python startup': ['pass'],
+    'import predictor_registry': ['import predictor_registry'],
+    'import predictors': ['import predictors'],
+    'create_predictor': ['from predictor_registry import create_predictor',
+                         'create_predictor("ImprovedDivisionWithTruncation:3")'],
+    'first predict': ['from predictor_registry import create_predictor',
+                      'predictor = create_predictor("SlopeAndBias")',
+                      'predictor.predict([1, 2, 4, 8, 16])'],
+    # the first predict_batch of a predictor with a batch_reduction imports numpy
+    'first predict_batch': ['from predictor_registry import create_predictor',
+                            'predictor = create_predictor("Subtraction")',
+                            'predictor.predict_batch([[1, 4, 9, 16, 25]] * 2)'],
+    'import prediction_service': ['import service.prediction_service'],
+}
+
+# the program each case runs, it prints the seconds of the last statement
+CASE_PROGRAM = '''
+import time
+statements = {statements!r}
+for statement in statements[:-1]:
+    exec(statement)
+start = time.perf_counter()
+exec(statements[-1])
+print(time.perf_counter() - start)
+'''
+
+
+def time_case(statements):
+    """
+    :param statements: a list of statements, see COLD_START_CASES
+    :return: the seconds of the last statement, and the seconds the whole process took including the startup of python
+    """
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', CASE_PROGRAM.format(statements=statements)],
+                            cwd=ROOT_DIR,
+                            check=True,
+                            capture_output=True,
+                            text=True).stdout
+    return float(output), time.perf_counter() - start
+
+
+def run_cold_start_benchmarks(case_names=None, number_of_repeats=10):
+    """
+    the files are compiled first, so the import times do not include compiling files that changed
+    :param case_names: the names of the cases in COLD_START_CASES to time, all of them by default
+    :param number_of_repeats: the number of new processes each case is timed in
+    :return: a list of results, each is a dict of the case and the median and minimal seconds of the statement and of
+    the process
+    """
+    compileall.compile_dir(ROOT_DIR, quiet=1)
+    results = []
+    for case_name in case_names or COLD_START_CASES:
+        times = [time_case(COLD_START_CASES[case_name]) for _ in range(number_of_repeats)]
+        statement_seconds, process_seconds = zip(*times)
+        results.append({'case': case_name,
+                        'seconds': statistics.median(statement_seconds),
+                        'minimal seconds': min(statement_seconds),
+                        'process seconds': statistics.median(process_seconds)})
+    return results
+
+
+def save_cold_start_results(results, path):
+    with open(path, 'w') as f:
+        json.dump({'created': datetime.datetime.now().isoformat(timespec='seconds'),
+                   'python': platform.python_version(),
+                   'platform': platform.platform(),
+                   'results': results},
+                  f,
+                  indent=1)
+
+
+def print_cold_start_results(results):
+    for result in results:
+        print(f'{result["case"]}: {result["seconds"] * 1e3:.1f} ms (minimum {result["minimal seconds"] * 1e3:.1f} ms), '
+              f'{result["process seconds"] * 1e3:.1f} ms for the whole process')
@@ -0,0 +1,65 @@
+from benchmarks.benchmark_functions import *
+from benchmarks.synthetic_sequences import SEQUENCE_KINDS
+import argparse
+import sys
+
+if __name__ == "__main__":
+    """
+    instructions
+
+    run from the project folder
+    python -m benchmarks.main_benchmark --output results.json
+
+    to store a baseline, run once with --output baseline.json.
+    later runs given --baseline baseline.json print the cases that got slower than the threshold, and the cases the
+    baseline timed that now time out, raise or are missing, and exit with 1 if there are any
+    """
+    parser = argparse.ArgumentParser(description='time the predictors on synthetic sequences')
+    parser.add_argument('--lengths', type=int, nargs='+', default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument('--sequences', nargs='+', choices=list(SEQUENCE_KINDS), default=None)
+    parser.add_argument('--functions', nargs='+', choices=list(BENCHMARKED_FUNCTIONS), default=None)
+    parser.add_argument('--predictors', nargs='+', default=None,
+                        help='the names of the predictor classes to time, all of them by default')
+    parser.add_argument('--minimal-total-time', type=float, default=0.05,
+                        help='each case is repeated until this many seconds were spent in it')
+    parser.add_argument('--maximal-time-per-call', type=float, default=1.0,
+                        help='longer sequences are skipped once a call is estimated to take longer than this, '
+                             'unless the baseline timed them')
+    parser.add_argument('--output', default=None, help='the json file to save the results to')
+    parser.add_argument('--baseline', default=None, help='a json file saved by an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='the fraction by which a case may be slower than the baseline')
+    args = parser.parse_args()
+
+    list_of_predictors = get_all_predictors()
+    if args.predictors is not None:
+        list_of_predictors = [predictor for predictor in list_of_predictors
+                              if type(predictor).__name__ in args.predictors]
+
+    baseline_results = None
+    if args.baseline is not None:
+        baseline_results = select_results(load_results(args.baseline),
+                                          list_of_predictors,
+                                          args.lengths,
+                                          args.sequences,
+                                          args.functions)
+
+    results = run_benchmarks(list_of_predictors,
+                             args.lengths,
+                             sequence_kinds=args.sequences,
+                             function_names=args.functions,
+                             minimal_total_time=args.minimal_total_time,
+                             maximal_time_per_call=args.maximal_time_per_call,
+                             baseline_results=baseline_results)
+    print_results(results)
+
+    if args.output is not None:
+        save_results(results, args.output)
+
+    if baseline_results is not None:
+        regressions = compare_results(results, baseline_results, args.threshold)
+        print()
+        print(f'{len(regressions)} regressions of more than {args.threshold:.0%}, or cases that were not timed')
+        print_regressions(regressions)
+        if len(regressions) > 0:
+            sys.exit(1)
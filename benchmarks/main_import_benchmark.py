@@ -0,0 +1,21 @@
+from benchmarks.import_time import *
+import argparse
+
+if __name__ == "__main__":
+    """
+    instructions
+
+    run from the project folder
+    python -m benchmarks.main_import_benchmark --repeats 20 --output import_times.json
+    """
+    parser = argparse.ArgumentParser(description='time importing the predictors and their first use in new processes')
+    parser.add_argument('--cases', nargs='+', choices=list(COLD_START_CASES), default=None)
+    parser.add_argument('--repeats', type=int, default=10, help='the number of new processes each case is timed in')
+    parser.add_argument('--output', default=None, help='the json file to save the results to')
+    args = parser.parse_args()
+
+    results = run_cold_start_benchmarks(args.cases, args.repeats)
+    print_cold_start_results(results)
+
+    if args.output is not None:
+        save_cold_start_results(results, args.output)
@@ -0,0 +1,64 @@
+"""
+this file contains generators of synthetic sequences for the benchmarks, so the predictors can be timed without the
+OEIS file. each generator is deterministic, the same kind and length always give the same sequence
+"""
+import random
+from main import get_fibonacci_numbers
+
+# the elements of the exponentially growing sequences get longer with the length, so their memory grows
+# quadratically. longer sequences of those kinds are not generated
+MAXIMAL_LENGTH_OF_GROWING_SEQUENCES = 10000
+
+
+def get_polynomial_sequence(n):
+    return [3 * i ** 3 - 2 * i ** 2 + 5 * i + 7 for i in range(n)]
+
+
+def get_geometric_sequence(n):
+    return [5 * 3 ** i for i in range(n)]
+
+
+def get_zero_laden_sequence(n):
+    # about a quarter of the elements are zeros, the rest are small positive numbers
+    rng = random.Random(n)
+    return [0 if rng.random() < 0.25 else rng.randint(1, 100) for _ in range(n)]
+
+
+def get_big_integer_sequence(n):
+    # slowly growing numbers that are far too big for int64 and float64
+    return [10 ** 400 + i ** 5 for i in range(n)]
+
+
+def get_noisy_sequence(n):
+    # a polynomial with a random relative noise of up to 1%
+    rng = random.Random(n)
+    return [round((i ** 2 + 10) * rng.uniform(0.99, 1.01)) for i in range(n)]
+
+
+# the name of each kind of sequence, its generator and whether it grows exponentially
+SEQUENCE_KINDS = {
+    'polynomial': (get_polynomial_sequence, False),
+    'geometric': (get_geometric_sequence, True),
+    'fibonacci': (get_fibonacci_numbers, True),
+    'zero laden': (get_zero_laden_sequence, False),
+    'big integer': (get_big_integer_sequence, False),
+    'noisy': (get_noisy_sequence, False),
+}
+
+
+def can_generate(kind, n):
+    """
+    :return: whether get_sequence generates a sequence of this kind of length n
+    """
+    _, grows_exponentially = SEQUENCE_KINDS[kind]
+    return not grows_exponentially or n <= MAXIMAL_LENGTH_OF_GROWING_SEQUENCES
+
+
+def get_sequence(kind, n):
+    """
+    :param kind: one of the keys of SEQUENCE_KINDS
+    :param n: the length of the sequence
+    :return: the sequence
+    """
+    generator, _ = SEQUENCE_KINDS[kind]
+    return generator(n)
@@ -0,0 +1 @@
+# pytest puts the folder of this file on the path, so the tests import the modules of the project as main.py does
@@ -2,7 +2,9 @@ import os
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 
-DESKTOP = os.path.join(os.environ["HOMEPATH"], "Desktop")
+# expanduser reads HOME, and on windows USERPROFILE or HOMEDRIVE and HOMEPATH, so importing this file never fails on
+# a machine without HOMEPATH
+DESKTOP = os.path.join(os.path.expanduser("~"), "Desktop")
 
 TYPE_COMPLEX = type(complex(1, 0))
 
@@ -9,13 +9,18 @@ def create_prediction_series(lis, predictor):
     such that p[i] = the prediction of the i'th element in lis given the first i-1 elements
     to make things nice, p[0] would be equal to lis[0]
 
+    the prefixes share a single stream of the predictor, so each prefix costs one diagonal of the reduction table
+    instead of a whole table
+
     :param lis:
     :param predictor:
     :return: the prediction list created
     """
     p = [lis[0]]
+    stream = predictor.stream()
     for i in range(1, len(lis)):
-        p.append(predictor.predict(lis[: i]))
+        stream.push(lis[i - 1])
+        p.append(stream.peek_next())
 
     return p
 
@@ -27,15 +32,27 @@ def get_lists_of_predictions(lis, predictor):
     such that the i'th list is a predicted list, which has length n (the same length as lis)
     which was predicted from the first i + 1 element in lis
 
+    the stream of each prefix is copied from a single stream that is extended along lis, and each predicted element
+    but the last is pushed to the copy, so predicting an element costs one diagonal of the reduction table.
+    lis is not modified
+
     :param lis:
     :param predictor:
     :return:
     """
     predicted_lists = []
+    stream = predictor.stream()
     for i in range(1, len(lis)):
+        stream.push(lis[i - 1])
+
         current_list = lis[: i]
+        current_stream = stream.copy()
+        current_list.append(current_stream.peek_next())
         while len(current_list) < len(lis):
-            current_list.append(predictor.predict(current_list))
+            # an element is pushed only to predict the next one, so like predict the last one is never reduced,
+            # as it may not be reducible, such as the float 1.5 predicted from [1.5] by DivisionFrac
+            current_stream.push(current_list[-1])
+            current_list.append(current_stream.peek_next())
 
         predicted_lists.append(current_list)
 
@@ -0,0 +1,357 @@
+"""
+this file contains an opt-in instrumentation of the reduction engine, which records for each prediction the depth of
+its reduction table, the lengths of the rows, the time spent in each stage and why the reduction stopped.
+
+predictions are only recorded inside a PredictionRecorder
+
+    with PredictionRecorder() as recorder:
+        predictor.predict(lis)
+    print(recorder.counters)
+    print(recorder.get_slowest_records())
+
+every engine a prediction can take is recorded, see the ENGINE_ constants. the reduction table, the side by side
+reduction, the exact ratios and the streams record their rows, the kernels and the numpy engine only record their time.
+an engine that could not predict a list, such as the numpy engine on a list that overflows int64, records a fallback,
+and the engine that predicts the list instead records it again.
+
+the engine checks whether any recorder is recording once per prediction, and only then wraps the functions it is given
+with timers, so while nothing is recorded the instrumentation costs nothing
+"""
+import collections
+import heapq
+import itertools
+import time
+
+# the engines that predict, the ones that build a reduction table of python numbers first
+ENGINE_REDUCTION_TABLE = 'reduction table'
+ENGINE_SIDE_BY_SIDE = 'side by side'
+ENGINE_EXACT_RATIOS = 'exact ratios'
+# the incremental reduction tables of the streams, only the prediction from the table is recorded and not the pushes
+ENGINE_STREAM = 'stream'
+# the closed form predictions of the predictors WithKernel, which have no rows
+ENGINE_KERNEL = 'kernel'
+# the numpy reduction of predict_batch and of long lists, the lists of a batch are recorded together
+ENGINE_FIXED_WIDTH = 'fixed width'
+
+# the reasons a reduction stops
+END_SINGLE_ELEMENT = 'single element'
+END_BASE_CASE = 'base case'
+
+# the reasons reduce_function gives up on a reduced list and replaces it with the base case number
+BAILOUT_MINIMUM_ALLOWED_NUMBER = 'minimum allowed number'
+BAILOUT_ALL_ZEROS = 'all zeros'
+
+# the recorders that are currently recording
+recorders = []
+
+# the records of the predictions that are currently running, the innermost one last
+running_records = []
+
+
+def is_recording():
+    return len(recorders) > 0
+
+
+class PredictionRecord:
+    """
+    what was recorded on a single call to the engine
+    """
+
+    def __init__(self, predictor_name, lis, engine=ENGINE_REDUCTION_TABLE, number_of_lists=1):
+        """
+        :param predictor_name:
+        :param lis: the list that was predicted, or the lists of a batch
+        :param engine: one of the ENGINE_ constants
+        :param number_of_lists: the number of lists the engine predicted in this call
+        """
+        self.predictor_name = predictor_name
+        self.lis = lis
+        self.engine = engine
+        self.number_of_lists = number_of_lists
+        # the number of lists the engine could not predict, which another engine predicted instead
+        self.number_of_fallbacks = 0
+
+        # the length of each row of the reduction table that was built, the list itself first
+        self.row_lengths = []
+
+        self.base_case_time = 0
+        # the time of each call to reduce_function and to inference_function, in the order they were made
+        self.reduce_times = []
+        self.inference_times = []
+        self.total_time = 0
+
+        self.base_case_reason = None
+        self.bailout_reason = None
+
+    def get_depth(self):
+        """
+        :return: the index of the row that answered to the base case, -1 for the engines that do not record rows
+        """
+        return len(self.row_lengths) - 1
+
+    def get_end_reason(self):
+        """
+        :return: the reason the reduction stopped, a bailout of reduce_function, END_SINGLE_ELEMENT or END_BASE_CASE.
+        None for the engines that do not record rows
+        """
+        if self.bailout_reason is not None:
+            return self.bailout_reason
+        return self.base_case_reason
+
+    def record_row(self, row):
+        self.row_lengths.append(len(row))
+
+    def record_base_case(self, row, base_case_result):
+        if base_case_result is not None:
+            self.base_case_reason = END_SINGLE_ELEMENT if len(row) == 1 else END_BASE_CASE
+
+
+class PredictionRecorder:
+    """
+    aggregates the records of all the predictions made while it is recording, and keeps the slowest ones
+    """
+
+    def __init__(self, number_of_slowest_records=10, callback=None):
+        """
+        :param number_of_slowest_records: the number of records to keep, the ones with the longest total time
+        :param callback: if given, it is called with every PredictionRecord
+        """
+        self.number_of_slowest_records = number_of_slowest_records
+        self.callback = callback
+
+        # the predictions are the lists predicted by all the engines, a list that an engine could not predict is
+        # counted again by the engine that predicted it
+        self.counters = collections.Counter()
+        self.end_reasons = collections.Counter()
+        # the number of lists each engine predicted, the time spent in it and the lists it could not predict
+        self.engines = collections.Counter()
+        self.engine_times = collections.Counter()
+        self.fallbacks = collections.Counter()
+        # bailouts are counted even when they happen outside of a call to the engine, such as when SlopeAndBias
+        # creates its slopes
+        self.bailout_reasons = collections.Counter()
+        self.maximal_depth = 0
+
+        # a heap of (total_time, tie breaker, record)
+        self.slowest_records = []
+        self.tie_breakers = itertools.count()
+
+    def add(self, record):
+        self.counters['predictions'] += record.number_of_lists
+        self.counters['fallbacks'] += record.number_of_fallbacks
+        self.counters['rows'] += len(record.row_lengths)
+        self.counters['elements'] += sum(record.row_lengths)
+        self.counters['base case time'] += record.base_case_time
+        self.counters['reduce time'] += sum(record.reduce_times)
+        self.counters['inference time'] += sum(record.inference_times)
+        self.counters['total time'] += record.total_time
+        self.engines[record.engine] += record.number_of_lists
+        self.engine_times[record.engine] += record.total_time
+        self.fallbacks[record.engine] += record.number_of_fallbacks
+        if record.get_end_reason() is not None:
+            self.end_reasons[record.get_end_reason()] += 1
+        self.maximal_depth = max(self.maximal_depth, record.get_depth())
+
+        heap_item = (record.total_time, next(self.tie_breakers), record)
+        if len(self.slowest_records) < self.number_of_slowest_records:
+            heapq.heappush(self.slowest_records, heap_item)
+        elif self.number_of_slowest_records > 0:
+            heapq.heappushpop(self.slowest_records, heap_item)
+
+        if self.callback is not None:
+            self.callback(record)
+
+    def add_bailout(self, reason):
+        self.bailout_reasons[reason] += 1
+
+    def get_slowest_records(self):
+        """
+        :return: the slowest records, the slowest first
+        """
+        return [record for _, _, record in sorted(self.slowest_records, key=lambda item: item[:2], reverse=True)]
+
+    def __enter__(self):
+        recorders.append(self)
+        return self
+
+    def __exit__(self, *args):
+        recorders.remove(self)
+
+
+def record_bailout(reason):
+    """
+    called by reduce_function when it gives up on a reduced list
+    :param reason: such as BAILOUT_MINIMUM_ALLOWED_NUMBER
+    :return:
+    """
+    if not is_recording():
+        return
+
+    if len(running_records) > 0:
+        running_records[-1].bailout_reason = reason
+    for recorder in recorders:
+        recorder.add_bailout(reason)
+
+
+def get_predictor_name(*bound_methods):
+    """
+    :return: the name of the class of the first predictor that one of the given methods is bound to
+    """
+    for method in bound_methods:
+        predictor = getattr(method, '__self__', None)
+        if predictor is not None:
+            return type(predictor).__name__
+    return None
+
+
+def get_running_record():
+    """
+    :return: the record of the innermost prediction that is running, None if there is none
+    """
+    if len(running_records) == 0:
+        return None
+    return running_records[-1]
+
+
+def run_recorded(record, predict, *args):
+    """
+    calls predict(*args) as the running record, and adds the record to the recorders.
+    a prediction made while another one is running is a part of it, such as the prediction of a HistoryWindowStream,
+    and is not recorded on its own
+    """
+    if len(running_records) > 0:
+        return predict(*args)
+
+    running_records.append(record)
+    start = time.perf_counter()
+    try:
+        return predict(*args)
+    finally:
+        record.total_time = time.perf_counter() - start
+        running_records.pop()
+        for recorder in recorders:
+            recorder.add(record)
+
+
+def record_prediction(predict, lis, base_case, reduce_function, inference_function, get_tail):
+    """
+    :param predict: the engine, called with the other arguments where the functions are wrapped with timers
+    :return: what predict returns
+    """
+    record = PredictionRecord(get_predictor_name(reduce_function, base_case, inference_function), lis)
+
+    def timed_base_case(current_gen):
+        record.record_row(current_gen)
+        start = time.perf_counter()
+        base_case_result = base_case(current_gen)
+        record.base_case_time += time.perf_counter() - start
+        record.record_base_case(current_gen, base_case_result)
+        return base_case_result
+
+    def timed_reduce_function(current_gen):
+        start = time.perf_counter()
+        reduced_gen = reduce_function(current_gen)
+        record.reduce_times.append(time.perf_counter() - start)
+        return reduced_gen
+
+    def timed_inference_function(current_gen, predicted_next_element_of_reduced_gen):
+        start = time.perf_counter()
+        predicted_next_element = inference_function(current_gen, predicted_next_element_of_reduced_gen)
+        record.inference_times.append(time.perf_counter() - start)
+        return predicted_next_element
+
+    return run_recorded(record, predict, lis, timed_base_case, timed_reduce_function, timed_inference_function,
+                        get_tail)
+
+
+class TimedPredictor:
+    """
+    the methods of a predictor that predict_next_elements_side_by_side uses, wrapped with timers
+    """
+
+    def __init__(self, predictor, record, records_rows):
+        """
+        :param predictor:
+        :param record:
+        :param records_rows: whether the lengths of the lists of this predictor are the row lengths of the record
+        """
+        self.predictor = predictor
+        self.record = record
+        self.records_rows = records_rows
+
+    def get_inference_tail(self, lis):
+        if self.records_rows:
+            self.record.record_row(lis)
+        return self.predictor.get_inference_tail(lis)
+
+    def base_case(self, lis):
+        start = time.perf_counter()
+        base_case_result = self.predictor.base_case(lis)
+        self.record.base_case_time += time.perf_counter() - start
+        self.record.record_base_case(lis, base_case_result)
+        return base_case_result
+
+    def get_base_case_number(self, lis):
+        return self.predictor.get_base_case_number(lis)
+
+    def reduce_function(self, lis):
+        start = time.perf_counter()
+        reduced_lis = self.predictor.reduce_function(lis)
+        self.record.reduce_times.append(time.perf_counter() - start)
+        return reduced_lis
+
+    def inference_function(self, lis, predicted_next_element_of_reduced_lis):
+        start = time.perf_counter()
+        predicted_next_element = self.predictor.inference_function(lis, predicted_next_element_of_reduced_lis)
+        self.record.inference_times.append(time.perf_counter() - start)
+        return predicted_next_element
+
+
+def record_side_by_side_prediction(predict, lists, predictors):
+    """
+    the same as record_prediction, for predict_next_elements_side_by_side. the row lengths are those of the first list
+    """
+    record = PredictionRecord(' and '.join(type(predictor).__name__ for predictor in predictors),
+                              lists,
+                              ENGINE_SIDE_BY_SIDE)
+    timed_predictors = [TimedPredictor(predictor, record, i == 0) for i, predictor in enumerate(predictors)]
+    return run_recorded(record, predict, lists, timed_predictors)
+
+
+def record_engine_prediction(engine, predictor, lis, predict, *args, row_lengths=None):
+    """
+    records a call to an engine that predicts a single list
+    :param engine: one of the ENGINE_ constants
+    :param predictor: the predictor the engine predicts for
+    :param lis:
+    :param predict: the engine, called with args. if it returns None the engine could not predict lis
+    :param row_lengths: the lengths of the rows of the reduction table, if the engine keeps one. an engine can also
+    record its rows itself, on get_running_record
+    :return: what predict returns
+    """
+    record = PredictionRecord(type(predictor).__name__, lis, engine)
+    if row_lengths is not None:
+        record.row_lengths = list(row_lengths)
+
+    def predict_and_record_fallback():
+        predicted_next_element = predict(*args)
+        if predicted_next_element is None:
+            record.number_of_fallbacks = 1
+        return predicted_next_element
+
+    return run_recorded(record, predict_and_record_fallback)
+
+
+def record_batch_prediction(engine, predictor, lists, predict, *args):
+    """
+    the same as record_engine_prediction, for an engine that predicts lists together and returns a list with the
+    prediction of each of them, None for the ones it could not predict
+    """
+    record = PredictionRecord(type(predictor).__name__, lists, engine, len(lists))
+
+    def predict_and_record_fallbacks():
+        predictions = predict(*args)
+        record.number_of_fallbacks = sum(prediction is None for prediction in predictions)
+        return predictions
+
+    return run_recorded(record, predict_and_record_fallbacks)
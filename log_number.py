@@ -0,0 +1,119 @@
+"""
+this file contains LogNumber, a number kept as its sign and the log of its absolute value, so multiplying and dividing
+it never overflows. the division predictors switch to it for the sequences whose ratios are too big for a float
+"""
+import math
+
+# the number of significant digits a LogNumber converted to a big int has, the rest are zeros
+NUMBER_OF_SIGNIFICANT_DIGITS = 15
+
+
+def get_sign(number):
+    return (number > 0) - (number < 0)
+
+
+class LogNumber:
+    """
+    supports what the division predictors do with their numbers, multiplication, division, abs and comparisons,
+    with other LogNumbers and with python numbers
+    """
+
+    __slots__ = ('sign', 'log')
+
+    def __init__(self, sign, log):
+        """
+        :param sign: -1, 0 or 1
+        :param log: the log of the absolute value, -inf for 0
+        """
+        self.sign = sign
+        self.log = log
+
+    @staticmethod
+    def from_number(number):
+        if isinstance(number, LogNumber):
+            return number
+        if number != number:
+            return LogNumber(1, float('nan'))
+        if number == 0:
+            return LogNumber(0, -float('inf'))
+        # math.log takes ints of any size
+        return LogNumber(get_sign(number), math.log(abs(number)))
+
+    def to_number(self):
+        """
+        :return: the number as a float, or as an int with NUMBER_OF_SIGNIFICANT_DIGITS significant digits if it is too
+        big for a float
+        """
+        if self.sign == 0:
+            return 0.0
+        try:
+            return self.sign * math.exp(self.log)
+        except OverflowError:
+            pass
+
+        log10 = self.log / math.log(10)
+        exponent = math.floor(log10) - NUMBER_OF_SIGNIFICANT_DIGITS + 1
+        significant_digits = round(10 ** (log10 - math.floor(log10) + NUMBER_OF_SIGNIFICANT_DIGITS - 1))
+        return self.sign * significant_digits * 10 ** exponent
+
+    def __float__(self):
+        if self.sign == 0:
+            return 0.0
+        try:
+            return self.sign * math.exp(self.log)
+        except OverflowError:
+            return self.sign * float('inf')
+
+    def __mul__(self, other):
+        other = LogNumber.from_number(other)
+        if self.sign == 0 or other.sign == 0:
+            return LogNumber(0, -float('inf'))
+        return LogNumber(self.sign * other.sign, self.log + other.log)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = LogNumber.from_number(other)
+        if other.sign == 0:
+            raise ZeroDivisionError('division by zero')
+        if self.sign == 0:
+            return self
+        return LogNumber(self.sign * other.sign, self.log - other.log)
+
+    def __rtruediv__(self, other):
+        return LogNumber.from_number(other) / self
+
+    def __abs__(self):
+        return LogNumber(abs(self.sign), self.log)
+
+    def __neg__(self):
+        return LogNumber(-self.sign, self.log)
+
+    def get_order_key(self):
+        # numbers of the same sign are ordered by their logs, the order is reversed for negative numbers
+        if self.sign == 0:
+            return 0, 0.0
+        return self.sign, self.sign * self.log
+
+    def __eq__(self, other):
+        return self.get_order_key() == LogNumber.from_number(other).get_order_key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __lt__(self, other):
+        return self.get_order_key() < LogNumber.from_number(other).get_order_key()
+
+    def __le__(self, other):
+        return self.get_order_key() <= LogNumber.from_number(other).get_order_key()
+
+    def __gt__(self, other):
+        return self.get_order_key() > LogNumber.from_number(other).get_order_key()
+
+    def __ge__(self, other):
+        return self.get_order_key() >= LogNumber.from_number(other).get_order_key()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'LogNumber({self.sign}, {self.log})'
@@ -0,0 +1,103 @@
+"""
+this file contains the registry of the predictors by their names, which are the names of their classes, such as
+'SlopeAndBias'. the classes created by TruncationWrapperCreator take their truncation value after a colon, such as
+'ImprovedDivisionWithTruncation:3', and WindowedPredictor takes its window size and the name of the predictor it wraps,
+such as 'WindowedPredictor:20:Subtraction'.
+the names are checked without importing anything, and predictors.py is imported the first time a predictor is created,
+so a short lived process that only checks its arguments, or never creates a predictor, does not pay for importing it
+"""
+import importlib
+
+# the module all the predictor classes are in
+PREDICTORS_MODULE = 'predictors'
+
+# the predictor classes in PREDICTORS_MODULE that are created without arguments. a new predictor class has to be added
+# here to be created by its name, tests/test_predictor_registry.py checks that none is missing
+PREDICTOR_NAMES = (
+    'Division',
+    'DivisionWithKernel',
+    'DivisionFrac',
+    'ImprovedDivision',
+    'DivisionCanDealWithZero',
+    'DivisionCanDealWithZeroWithKernel',
+    'ImprovedDivisionCanDealWithZero',
+    'ImprovedDivisionFrac',
+    'Subtraction',
+    'SubtractionWithKernel',
+    'SlopeAndBias',
+)
+
+# the classes created by TruncationWrapperCreator, they are created with their truncation value
+TRUNCATED_PREDICTOR_NAMES = ('DivisionWithTruncation', 'ImprovedDivisionWithTruncation')
+
+# the class that wraps another predictor, it is created with its window size and the predictor
+WINDOWED_PREDICTOR_NAME = 'WindowedPredictor'
+
+
+def get_predictor_names():
+    """
+    :return: the names of all the predictor classes
+    """
+    return list(PREDICTOR_NAMES) + list(TRUNCATED_PREDICTOR_NAMES) + [WINDOWED_PREDICTOR_NAME]
+
+
+def parse_integer_argument(class_name, description, argument):
+    if argument == '':
+        raise ValueError(f'{class_name} needs a {description}, such as {class_name}:3')
+    try:
+        return int(argument)
+    except ValueError:
+        raise ValueError(f'the {description} of {class_name} is an integer, not {argument}') from None
+
+
+def parse_predictor_name(predictor_name):
+    """
+    :param predictor_name: such as 'SlopeAndBias', 'ImprovedDivisionWithTruncation:3' or
+    'WindowedPredictor:20:ImprovedDivisionWithTruncation:3'
+    :return: the name of the class and the arguments it is created with: no arguments, the truncation value, or the
+    name of the wrapped predictor and the window size.
+    raises ValueError if there is no such predictor
+    """
+    class_name, _, argument = predictor_name.partition(':')
+
+    if class_name in TRUNCATED_PREDICTOR_NAMES:
+        return class_name, (parse_integer_argument(class_name, 'truncation value', argument),)
+
+    if class_name == WINDOWED_PREDICTOR_NAME:
+        window_size, _, wrapped_predictor_name = argument.partition(':')
+        window_size = parse_integer_argument(class_name, 'window size', window_size)
+        if window_size < 1:
+            raise ValueError(f'the window size of {class_name} must be at least 1')
+        if wrapped_predictor_name == '':
+            raise ValueError(f'{class_name} needs the predictor it wraps after its window size, '
+                             f'such as {class_name}:20:Subtraction')
+        parse_predictor_name(wrapped_predictor_name)
+        return class_name, (wrapped_predictor_name, window_size)
+
+    if class_name not in PREDICTOR_NAMES:
+        raise ValueError(f'{class_name} is not a predictor')
+    if argument != '':
+        raise ValueError(f'{class_name} takes no arguments')
+    return class_name, ()
+
+
+def get_predictor_class(class_name):
+    """
+    :return: the predictor class, its module is imported if it was not imported yet
+    """
+    if class_name not in get_predictor_names():
+        raise ValueError(f'{class_name} is not a predictor')
+    return getattr(importlib.import_module(PREDICTORS_MODULE), class_name)
+
+
+def create_predictor(predictor_name):
+    """
+    :param predictor_name: see parse_predictor_name
+    :return: an instance of the predictor
+    """
+    class_name, arguments = parse_predictor_name(predictor_name)
+    predictor_class = get_predictor_class(class_name)
+    if class_name == WINDOWED_PREDICTOR_NAME:
+        wrapped_predictor_name, window_size = arguments
+        return predictor_class(create_predictor(wrapped_predictor_name), window_size)
+    return predictor_class(*arguments)
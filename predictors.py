@@ -1,7 +1,33 @@
 from abstract_prediction_methods import *
 from fractions import Fraction
 from definitions import TYPE_LIST
+import copy
+import instrumentation
 import math
+from log_number import LogNumber
+from sequence_view import get_index_of_last_occurrence, get_view, to_list
+import functools
+import importlib
+
+
+@functools.lru_cache(maxsize=None)
+def import_optional_module(module_name):
+    """
+    numpy takes most of the time of importing this file, so the modules that need it, batch_prediction and
+    batch_truncation, are imported the first time they are used
+    :param module_name:
+    :return: the module, None if numpy is not installed. then predict_batch falls back to predicting the lists one by
+    one, and the truncated predictors round their lists in python
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        return None
+
+
+# numpy only saves time over python numbers on lists about this long, where each row is long enough to make up for the
+# cost of the array operations
+MINIMAL_LENGTH_TO_PREDICT_WITH_FIXED_WIDTH = 1024
 
 
 class AbstractStaticPredictor:
@@ -11,6 +37,31 @@ class AbstractStaticPredictor:
     in the future.
     """
 
+    # predictors keep no state of their own, only their settings, so they are cheap to create and to send to worker
+    # processes. subclasses that keep settings list them in __slots__ as well
+    __slots__ = ()
+
+    # whether the predictor implements reduce_step, is_base_case_element and is_bailout_element, which allows it to
+    # extend its reduction table one element at a time instead of rebuilding it on each prediction
+    can_reduce_incrementally = False
+
+    # whether reduce_step might return None for an element it can not compute on its own
+    reduce_step_can_be_undefined = False
+
+    # the number of elements at the end of a list that inference_function looks at. None means the whole list
+    inference_tail_length = None
+
+    # the reduction predict_batch can run with numpy, batch_prediction.SUBTRACTION or batch_prediction.DIVISION.
+    # None if the predictor can not be vectorised
+    batch_reduction = None
+
+    # whether the predictor implements predict_with_kernel
+    has_kernel = False
+
+    # whether the predictor implements get_shared_sublist_which_can_be_predicted and get_shared_first_reduced_list,
+    # which allows it to take its first reduced list from the SharedRows of the list instead of computing it
+    shares_rows = False
+
     def get_name(self):
         return type(self).__name__
 
@@ -66,23 +117,274 @@ class AbstractStaticPredictor:
         # default to returning the whole list.
         return lis
 
-    def predict(self, lis):
+    def get_inference_tail(self, lis):
+        """
+        :param lis:
+        :return: the part of lis that inference_function needs, see inference_tail_length
+        """
+        if self.inference_tail_length is None:
+            return lis
+        return lis[-self.inference_tail_length:]
+
+    def predict_with_kernel(self, lis):
+        """
+        :param lis: a list returned from get_sublist_which_can_be_predicted
+        :return: the predicted next element in lis, computed directly from lis without building the reduction table.
+        None if the predictor has no such closed form for lis, in which case the reduction table is used
+        """
+        pass
+
+    def reduce_step(self, previous_element, element):
+        """
+        :param previous_element:
+        :param element: the element that came after previous_element in the list
+        :return: the element that reduce_function would add to the reduced list once element is appended to the list.
+        None if the element can not be computed from those 2 elements alone
+        """
+        pass
+
+    def is_base_case_element(self, element):
+        """
+        :param element:
+        :return: whether any list that contains element answers to the base case, regardless of its length
         """
+        return False
 
+    def is_bailout_element(self, element):
+        """
+        :param element:
+        :return: whether reduce_function gives up on any reduced list that contains element and replaces it with the
+        base case number
+        """
+        return False
+
+    def get_number_of_following_elements_to_drop(self, element):
+        """
+        the incremental counterpart of get_sublist_which_can_be_predicted
+        :param element: the element that was just appended to the list
+        :return: None if element does not change where the sublist which can be predicted starts.
+        otherwise the sublist restarts after element, and the returned number is the amount of elements following it
+        that are dropped as well
+        """
+        return None
+
+    def create_reduction_table(self, lis=()):
+        """
         :param lis:
+        :return: a table which can be extended one element at a time and predict the next element of lis
+        """
+        if self.can_reduce_incrementally and self.inference_tail_length == 1:
+            return create_incremental_reduction_table(self, lis)
+        return HistoryReductionTable(self, lis)
+
+    def stream(self, lis=()):
+        """
+        :param lis: the elements to start the stream with
+        :return: a PredictionStream, elements can be pushed to it one at a time and it would predict the next one
+        at the cost of O(depth) per element
+        """
+        return PredictionStream(self, lis)
+
+    def get_shared_sublist_which_can_be_predicted(self, shared_rows):
+        """
+        :param shared_rows: SharedRows of the list
+        :return: the same as get_sublist_which_can_be_predicted of the list
+        """
+        return self.get_sublist_which_can_be_predicted(shared_rows.lis)
+
+    def get_shared_first_reduced_list(self, lis, shared_rows):
+        """
+        :param lis: the list returned from get_shared_sublist_which_can_be_predicted
+        :param shared_rows:
+        :return: the same as reduce_function(lis), computed from the rows in shared_rows
+        """
+        return self.reduce_function(lis)
+
+    def get_shared_reduction_functions(self, lis, shared_rows):
+        """
+        :param lis: the list returned from get_shared_sublist_which_can_be_predicted
+        :param shared_rows:
+        :return: base_case and reduce_function to predict lis with, where lis itself is reduced by
+        get_shared_first_reduced_list
+        """
+        return self.base_case, reuse_first_reduced_list(self.reduce_function,
+                                                        lis,
+                                                        lambda: self.get_shared_first_reduced_list(lis, shared_rows))
+
+    def predict_batch(self, list_of_lists):
+        """
+        :param list_of_lists:
+        :return: a list with the result of predict on each of the lists.
+        predictors that declare a batch_reduction reduce all the lists together with numpy. lists that do not fit in
+        int64/float64, or overflow during the reduction, are predicted one by one
+        """
+        if self.batch_reduction is None or import_optional_module('batch_prediction') is None:
+            return [self.predict(lis) for lis in list_of_lists]
+
+        predictions = [None] * len(list_of_lists)
+        indices, sublists = [], []
+        for i, lis in enumerate(list_of_lists):
+            sublist_to_predict = self.get_sublist_which_can_be_predicted(get_view(lis))
+            if len(sublist_to_predict) > 0:
+                indices.append(i)
+                sublists.append(to_list(sublist_to_predict))
+
+        for i, sublist_to_predict, prediction in zip(indices,
+                                                     sublists,
+                                                     self.predict_sublists_with_fixed_width(sublists)):
+            if prediction is None:
+                prediction = self.predict_sublist_by_reduction(sublist_to_predict)
+            predictions[i] = prediction
+
+        return predictions
+
+    def predict_sublists_with_fixed_width(self, sublists):
+        """
+        :param sublists: non empty lists returned from get_sublist_which_can_be_predicted
+        :return: the predicted next element of each sublist, computed with int64/float64 numpy arrays.
+        None for the sublists whose numbers do not fit in them, or that overflow during the reduction, which have to
+        be predicted with python numbers
+        """
+        predictions = [None] * len(sublists)
+        if self.batch_reduction is None:
+            return predictions
+        batch_prediction = import_optional_module('batch_prediction')
+        if batch_prediction is None:
+            return predictions
+
+        if instrumentation.recorders:
+            return instrumentation.record_batch_prediction(instrumentation.ENGINE_FIXED_WIDTH,
+                                                           self,
+                                                           sublists,
+                                                           self.predict_sublists_with_numpy,
+                                                           sublists,
+                                                           batch_prediction)
+        return self.predict_sublists_with_numpy(sublists, batch_prediction)
+
+    def predict_sublists_with_numpy(self, sublists, batch_prediction):
+        """
+        the body of predict_sublists_with_fixed_width, once numpy is imported
+        """
+        predictions = [None] * len(sublists)
+        sublists_by_dtype = {}
+        for i, sublist_to_predict in enumerate(sublists):
+            dtype = batch_prediction.get_batch_dtype(sublist_to_predict, self.batch_reduction)
+            if dtype is not None:
+                sublists_by_dtype.setdefault(dtype, []).append(i)
+
+        base_case_number = self.get_base_case_number([])
+        for dtype, indices in sublists_by_dtype.items():
+            for chunk in batch_prediction.get_chunks_of_similar_lengths([sublists[i] for i in indices]):
+                values, lengths = batch_prediction.pack_lists([sublists[indices[j]] for j in chunk], dtype)
+                reduced_lists = batch_prediction.predict_next_elements_of_reduced_lists(
+                    values,
+                    lengths,
+                    self.batch_reduction,
+                    self.batch_reduction == batch_prediction.DIVISION and not self.reduce_step_can_be_undefined,
+                    self.reduce_step_can_be_undefined,
+                    getattr(self, 'minimum_allowed_number', None),
+                    base_case_number)
+                depths, is_replaced, reduced_predictions, overflowed = reduced_lists
+
+                for position, j in enumerate(chunk):
+                    i = indices[j]
+                    if overflowed[position]:
+                        continue
+
+                    # keep the python types of the scalar path when the reduced list is not made of numpy numbers
+                    if depths[position] == 0:
+                        predicted_next_element_of_reduced_lis = base_case_number
+                    elif depths[position] == 1 and is_replaced[position]:
+                        predicted_next_element_of_reduced_lis = self.inference_function([base_case_number],
+                                                                                        base_case_number)
+                    else:
+                        predicted_next_element_of_reduced_lis = reduced_predictions[position].item()
+                    predictions[i] = self.inference_function(sublists[i][-1:], predicted_next_element_of_reduced_lis)
+
+        return predictions
+
+    def predict(self, lis, shared_rows=None):
+        """
+
+        :param lis: a list, or a SequenceView, an array.array, a memoryview or a numpy array. those are not copied
+        until the sublist which can be predicted is found, and then only that sublist is converted to a list
+        :param shared_rows: optional SharedRows of lis, shared with other predictors of the same list
         :return: if the list can be used to predict its next element it returns the predicted element.
         otherwise it returns None
         """
-        sublist_to_predict = self.get_sublist_which_can_be_predicted(lis)
+        if shared_rows is None or not self.shares_rows:
+            shared_rows = None
+            sublist_to_predict = self.get_sublist_which_can_be_predicted(get_view(lis))
+        else:
+            sublist_to_predict = self.get_shared_sublist_which_can_be_predicted(shared_rows)
         if len(sublist_to_predict) == 0:
             return None
-        return predict_next_element(sublist_to_predict,
-                                    self.base_case,
-                                    self.reduce_function,
-                                    self.inference_function)
+
+        return self.predict_sublist(to_list(sublist_to_predict), shared_rows)
+
+    def predict_sublist(self, lis, shared_rows=None):
+        """
+        :param lis: a non empty list returned from get_sublist_which_can_be_predicted
+        :param shared_rows: if not None, the SharedRows lis was taken from
+        :return: the predicted next element in lis.
+        long lists whose numbers fit in int64/float64 are reduced with numpy, the rest with python numbers
+        """
+        if self.has_kernel:
+            if instrumentation.recorders:
+                predicted_next_element = instrumentation.record_engine_prediction(instrumentation.ENGINE_KERNEL,
+                                                                                  self,
+                                                                                  lis,
+                                                                                  self.predict_with_kernel,
+                                                                                  lis)
+            else:
+                predicted_next_element = self.predict_with_kernel(lis)
+            if predicted_next_element is not None:
+                return predicted_next_element
+
+        if len(lis) >= MINIMAL_LENGTH_TO_PREDICT_WITH_FIXED_WIDTH:
+            predicted_next_element = self.predict_sublists_with_fixed_width([lis])[0]
+            if predicted_next_element is not None:
+                return predicted_next_element
+
+        return self.predict_sublist_by_reduction(lis, shared_rows)
+
+    def predict_sublist_by_reduction(self, lis, shared_rows=None):
+        """
+        :param lis: a non empty list returned from get_sublist_which_can_be_predicted
+        :param shared_rows: if not None, the SharedRows lis was taken from
+        :return: the predicted next element in lis, from its reduction table of python numbers
+        """
+        base_case, reduce_function = self.base_case, self.reduce_function
+        if shared_rows is not None:
+            base_case, reduce_function = self.get_shared_reduction_functions(lis, shared_rows)
+
+        return predict_next_element(lis, base_case, reduce_function, self.inference_function, self.get_inference_tail)
+
+
+def get_shared_ratios(shared_rows):
+    """
+    :param shared_rows:
+    :return: the ratios between the consecutive elements of the list, None where the previous element is zero
+    """
+    def create_ratios():
+        # a view is converted once instead of being indexed element by element
+        lis = to_list(shared_rows.lis)
+        return [lis[i] / lis[i - 1] if lis[i - 1] != 0 else None for i in range(1, len(lis))]
+
+    return shared_rows.get_row('ratios', create_ratios)
 
 
 class Division(AbstractStaticPredictor):
+    __slots__ = ()
+
+    can_reduce_incrementally = True
+    inference_tail_length = 1
+    batch_reduction = 'division'
+    shares_rows = True
+
+    # whether a list whose ratios are too big for a float is predicted with LogNumbers instead of raising OverflowError
+    can_promote_to_log_domain = True
+
     def get_base_case_number(self, lis):
         # lis contains only 1 element so we assume that the series is constant
         # as such we want our inference_function to return lis[-1]
@@ -99,22 +401,103 @@ class Division(AbstractStaticPredictor):
         return [lis[i] / lis[i - 1] for i in range(1, len(lis))]
 
     def inference_function(self, lis, predicted_next_element_of_reduced_lis):
-        return lis[-1] * predicted_next_element_of_reduced_lis
+        return multiply_by_ratio(lis[-1], predicted_next_element_of_reduced_lis)
 
-    def get_sublist_which_can_be_predicted(self, lis):
+    def predict_sublist_by_reduction(self, lis, shared_rows=None):
         try:
-            last_occurrence_of_zero = len(lis) - lis[::-1].index(0)
-        except:
+            return super().predict_sublist_by_reduction(lis, shared_rows)
+        except OverflowError:
+            # a ratio of 2 ints is too big for a float
+            if not self.can_promote_to_log_domain:
+                raise
+            return self.predict_sublist_in_log_domain(lis)
+
+    def predict_sublist_in_log_domain(self, lis):
+        """
+        :param lis: a non empty list returned from get_sublist_which_can_be_predicted
+        :return: the predicted next element in lis, reduced as LogNumbers. a float if it fits in one, otherwise an int
+        """
+        log_lis = [LogNumber.from_number(element) for element in lis]
+        predicted_next_element = predict_next_element(log_lis,
+                                                      self.base_case,
+                                                      self.reduce_function,
+                                                      self.inference_function,
+                                                      self.get_inference_tail)
+        return LogNumber.from_number(predicted_next_element).to_number()
+
+    def get_sublist_which_can_be_predicted(self, lis):
+        last_occurrence_of_zero = get_index_of_last_occurrence(lis, 0)
+        if last_occurrence_of_zero is None:
             return lis
 
-        return lis[last_occurrence_of_zero + 1:]
+        return lis[last_occurrence_of_zero + 2:]
+
+    def reduce_step(self, previous_element, element):
+        return element / previous_element
+
+    def is_base_case_element(self, element):
+        return element == 0
+
+    def get_number_of_following_elements_to_drop(self, element):
+        if element == 0:
+            # get_sublist_which_can_be_predicted starts the sublist 2 places after the last zero
+            return 1
+        return None
+
+    def get_shared_sublist_which_can_be_predicted(self, shared_rows):
+        return shared_rows.get_row('sublist after the last zero',
+                                   lambda: Division.get_sublist_which_can_be_predicted(self, shared_rows.lis))
+
+    def get_shared_first_reduced_list(self, lis, shared_rows):
+        # lis is a suffix of the list without zeros, so its ratios are the defined suffix of the ratios of the list
+        ratios = get_shared_ratios(shared_rows)
+        if len(lis) == len(shared_rows.lis):
+            return ratios
+        return ratios[len(shared_rows.lis) - len(lis):]
+
+
+class DivisionWithKernel(Division):
+    """
+    predicts by a weighted sum of the logs of the elements instead of building the table of ratios.
+    O(n) instead of O(n^2), and gives the same results as Division up to rounding.
+    the rounding errors grow with the length of the list, so it is better suited for short lists
+    """
+
+    __slots__ = ()
+
+    # the kernel is already O(n), and the vectorised reduction table would round differently from it
+    batch_reduction = None
+    has_kernel = True
+
+    def predict_with_kernel(self, lis):
+        return predict_next_element_by_log_weights(lis)
 
 
 class DivisionFrac(Division):
+    __slots__ = ()
+
     # empirically gives the same results as the regular Division once you convert to float
+    batch_reduction = None
+    shares_rows = False
+
     def reduce_function(self, lis):
         return [Fraction(lis[i], lis[i - 1]) for i in range(1, len(lis))]
 
+    def reduce_step(self, previous_element, element):
+        return Fraction(element, previous_element)
+
+    def predict_sublist_by_reduction(self, lis, shared_rows=None):
+        # lists of ints are reduced without creating a Fraction for each ratio, with the same results
+        if all(type(element) is int for element in lis):
+            if instrumentation.recorders:
+                return instrumentation.record_engine_prediction(instrumentation.ENGINE_EXACT_RATIOS,
+                                                                self,
+                                                                lis,
+                                                                predict_next_element_by_exact_ratios,
+                                                                lis)
+            return predict_next_element_by_exact_ratios(lis)
+        return super().predict_sublist_by_reduction(lis, shared_rows)
+
 
 class ImprovedDivision(Division):
     """
@@ -135,19 +518,35 @@ class ImprovedDivision(Division):
     +--------------+--------+--------+
     """
 
+    __slots__ = ()
+
     minimum_allowed_number = 0.6666666667  # it seems like for any lower than 2/3 the precision drops for some reason
 
     def reduce_function(self, lis):
+        return self.bail_out_of_small_numbers(super().reduce_function(lis))
+
+    def bail_out_of_small_numbers(self, reduced_lis):
         # for some reason if we move the checking to the base case instead the precision drops.
         # so the moment we see a number smaller than 2/3 we know that our function messed up and can not proceed
         # with the current results
-        to_return = super().reduce_function(lis)
-        if min(map(abs, to_return)) < self.minimum_allowed_number:
+        if min(map(abs, reduced_lis)) < self.minimum_allowed_number:
+            instrumentation.record_bailout(instrumentation.BAILOUT_MINIMUM_ALLOWED_NUMBER)
             return [1]
-        return to_return
+        return reduced_lis
+
+    def is_bailout_element(self, element):
+        return abs(element) < self.minimum_allowed_number
+
+    def get_shared_first_reduced_list(self, lis, shared_rows):
+        return self.bail_out_of_small_numbers(super().get_shared_first_reduced_list(lis, shared_rows))
 
 
 class DivisionCanDealWithZero(Division):
+    __slots__ = ()
+
+    # zeros do not end the reduction, the element after a zero is undefined and takes the maximal element in its list
+    reduce_step_can_be_undefined = True
+
     def base_case(self, lis):
         if len(lis) == 1:
             return self.get_base_case_number(lis)
@@ -155,24 +554,64 @@ class DivisionCanDealWithZero(Division):
 
     def reduce_function(self, lis):
         to_return = [lis[i] / lis[i - 1] if lis[i - 1] != 0 else None for i in range(1, len(lis))]
-        max_in_to_return = -float('inf')
-        for item in to_return:
-            if item is not None and item > max_in_to_return:
-                max_in_to_return = item
+        return self.fill_undefined_ratios(lis, to_return)
+
+    def fill_undefined_ratios(self, lis, ratios):
+        """
+        :param lis:
+        :param ratios: the ratios of lis, None where they are undefined
+        :return: a new list of the ratios, where the undefined ratios are replaced with the maximal ratio
+        """
+        max_in_ratios = -float('inf')
+        for item in ratios:
+            if item is not None and item > max_in_ratios:
+                max_in_ratios = item
 
-        if max_in_to_return == -float('inf'):
+        if max_in_ratios == -float('inf'):
             # the list was all zeros
+            instrumentation.record_bailout(instrumentation.BAILOUT_ALL_ZEROS)
             return [self.get_base_case_number(lis)]
 
-        for i in range(len(to_return)):
-            if to_return[i] is None:
-                to_return[i] = max_in_to_return
-
-        return to_return
+        return [item if item is not None else max_in_ratios for item in ratios]
 
     def get_sublist_which_can_be_predicted(self, lis):
         return lis
 
+    def get_shared_sublist_which_can_be_predicted(self, shared_rows):
+        return shared_rows.lis
+
+    def get_shared_first_reduced_list(self, lis, shared_rows):
+        return shared_rows.get_row('filled ratios',
+                                   lambda: self.fill_undefined_ratios(lis, get_shared_ratios(shared_rows)))
+
+    def reduce_step(self, previous_element, element):
+        if previous_element == 0:
+            return None
+        return element / previous_element
+
+    def is_base_case_element(self, element):
+        return False
+
+    def get_number_of_following_elements_to_drop(self, element):
+        return None
+
+
+class DivisionCanDealWithZeroWithKernel(DivisionCanDealWithZero):
+    """
+    the same as DivisionWithKernel for lists without zeros. lists with zeros are predicted with the reduction table
+    """
+
+    __slots__ = ()
+
+    # the kernel is already O(n), and the vectorised reduction table would round differently from it
+    batch_reduction = None
+    has_kernel = True
+
+    def predict_with_kernel(self, lis):
+        if 0 in lis:
+            return None
+        return predict_next_element_by_log_weights(lis)
+
 
 class ImprovedDivisionCanDealWithZero(DivisionCanDealWithZero):
     """
@@ -190,23 +629,63 @@ class ImprovedDivisionCanDealWithZero(DivisionCanDealWithZero):
     |      1       | 15290  | 318205 |
     +--------------+--------+--------+
     """
+
+    __slots__ = ()
+
     minimum_allowed_number = 0.6666666667  # it seems like for any lower than 2/3 the precision drops for some reason
 
     def reduce_function(self, lis):
+        return self.bail_out_of_small_numbers(super().reduce_function(lis))
+
+    def bail_out_of_small_numbers(self, reduced_lis):
         # for some reason if we move the checking to the base case instead the precision drops.
         # so the moment we see a number smaller than 2/3 we know that our function messed up and can not proceed
         # with the current results
-        to_return = super().reduce_function(lis)
-        if min(map(abs, to_return)) < self.minimum_allowed_number:
+        if min(map(abs, reduced_lis)) < self.minimum_allowed_number:
+            instrumentation.record_bailout(instrumentation.BAILOUT_MINIMUM_ALLOWED_NUMBER)
             return [1]
-        return to_return
+        return reduced_lis
+
+    def is_bailout_element(self, element):
+        return abs(element) < self.minimum_allowed_number
+
+    def get_shared_first_reduced_list(self, lis, shared_rows):
+        # the slopes_creator of SlopeAndBias asks for the same row
+        return shared_rows.get_row(('filled ratios', self.minimum_allowed_number),
+                                   lambda: self.bail_out_of_small_numbers(
+                                       super(ImprovedDivisionCanDealWithZero, self).get_shared_first_reduced_list(
+                                           lis, shared_rows)))
 
 
 class ImprovedDivisionFrac(ImprovedDivision):
+    __slots__ = ()
+
     # empirically gives the same results as the regular ImprovedDivision once you convert to float
+    batch_reduction = None
+    shares_rows = False
+
     def reduce_function(self, lis):
         return [Fraction(lis[i], lis[i - 1]) for i in range(1, len(lis))]
 
+    def reduce_step(self, previous_element, element):
+        return Fraction(element, previous_element)
+
+    def predict_sublist_by_reduction(self, lis, shared_rows=None):
+        # lists of ints are reduced without creating a Fraction for each ratio, with the same results
+        if all(type(element) is int for element in lis):
+            if instrumentation.recorders:
+                return instrumentation.record_engine_prediction(instrumentation.ENGINE_EXACT_RATIOS,
+                                                                self,
+                                                                lis,
+                                                                predict_next_element_by_exact_ratios,
+                                                                lis)
+            return predict_next_element_by_exact_ratios(lis)
+        return super().predict_sublist_by_reduction(lis, shared_rows)
+
+    def is_bailout_element(self, element):
+        # the reduce_function above does not check for the minimum_allowed_number
+        return False
+
 
 class Subtraction(AbstractStaticPredictor):
     """
@@ -227,6 +706,13 @@ class Subtraction(AbstractStaticPredictor):
     +--------------+--------+--------+
     """
 
+    __slots__ = ()
+
+    can_reduce_incrementally = True
+    inference_tail_length = 1
+    batch_reduction = 'subtraction'
+    shares_rows = True
+
     def get_base_case_number(self, lis):
         # lis contains only 1 element so we assume that the series is constant
         # as such we want our inference_function to return lis[-1]
@@ -245,6 +731,28 @@ class Subtraction(AbstractStaticPredictor):
     def inference_function(self, lis, predicted_next_element_of_reduced_lis):
         return lis[-1] + predicted_next_element_of_reduced_lis
 
+    def reduce_step(self, previous_element, element):
+        return element - previous_element
+
+    def get_shared_first_reduced_list(self, lis, shared_rows):
+        return shared_rows.get_row('differences', lambda: self.reduce_function(lis))
+
+
+class SubtractionWithKernel(Subtraction):
+    """
+    predicts by a binomially weighted sum of the elements instead of building the table of differences.
+    O(n) instead of O(n^2), and for integers gives exactly the same results as Subtraction
+    """
+
+    __slots__ = ()
+
+    # the kernel is already O(n), and the vectorised reduction table would round differently from it
+    batch_reduction = None
+    has_kernel = True
+
+    def predict_with_kernel(self, lis):
+        return predict_next_element_by_weights(lis)
+
 
 class TruncationWrapperCreator(type):
     """
@@ -255,15 +763,48 @@ class TruncationWrapperCreator(type):
     get rid of some "noise" that obstructs the prediction
     """
 
+    # the ways truncate_array can round a list, see the array_truncation argument of the created classes
+    TRUNCATE_IN_PYTHON = 'python'
+    TRUNCATE_WITH_NUMPY = 'numpy'
+
+    # shorter lists are rounded in python by default, numpy costs more than it saves on them
+    MINIMAL_LENGTH_TO_TRUNCATE_WITH_NUMPY = 16
+
     @staticmethod
     def truncate_float(float_number, truncation_value):
         if truncation_value == -1:
             return float_number
-        return float(f"%.{truncation_value}f" % float_number)
+        # round gives the same float as formatting the number with truncation_value digits and parsing it back
+        return round(float(float_number), truncation_value)
 
     @staticmethod
-    def truncate_array(array_of_floats, truncation_value):
-        return list(map(lambda x: TruncationWrapperCreator.truncate_float(x, truncation_value), array_of_floats))
+    def truncate_array(array_of_floats, truncation_value, array_truncation=None):
+        """
+        :param array_of_floats:
+        :param truncation_value:
+        :param array_truncation: TRUNCATE_IN_PYTHON or TRUNCATE_WITH_NUMPY, both give the same results.
+        None picks numpy for long lists when it is installed
+        :return: a list with truncate_float of each number
+        """
+        if truncation_value == -1:
+            return list(array_of_floats)
+
+        if array_truncation is None:
+            # batch_truncation rounds a list in python anyway when truncation_value is negative
+            if len(array_of_floats) >= TruncationWrapperCreator.MINIMAL_LENGTH_TO_TRUNCATE_WITH_NUMPY \
+                    and truncation_value >= 0 \
+                    and import_optional_module('batch_truncation') is not None:
+                array_truncation = TruncationWrapperCreator.TRUNCATE_WITH_NUMPY
+            else:
+                array_truncation = TruncationWrapperCreator.TRUNCATE_IN_PYTHON
+
+        if array_truncation == TruncationWrapperCreator.TRUNCATE_WITH_NUMPY:
+            batch_truncation = import_optional_module('batch_truncation')
+            if batch_truncation is None:
+                raise ImportError('numpy is needed to truncate with numpy')
+            return batch_truncation.truncate_array(array_of_floats, truncation_value)
+
+        return [round(float(x), truncation_value) for x in array_of_floats]
 
     @classmethod
     def create_wrapper(cls, function_to_wrap, method_to_apply_on_output_of_function):
@@ -273,10 +814,18 @@ class TruncationWrapperCreator(type):
 
         return wrapped
 
+    def __new__(mcs, classname, bases, class_dict):
+        # the attributes that the __init__ below sets
+        class_dict = dict(class_dict)
+        class_dict.setdefault('__slots__', ('truncation_value', 'array_truncation'))
+        return super(TruncationWrapperCreator, mcs).__new__(mcs, classname, bases, class_dict)
+
     def __init__(cls, classname, bases, class_dict):
         """
         creates subclasses that in their init function should get a truncation_value
-        each number returned from the class functions would be truncated
+        each number returned from the class functions would be truncated.
+        the init function also takes an optional array_truncation, the way truncate_array rounds the reduced lists of
+        the instance
         :param classname:
         :param bases:
         :param class_dict:
@@ -284,8 +833,9 @@ class TruncationWrapperCreator(type):
 
         # all the class attrs can be seen in dir(cls)
 
-        def __init__(self, truncation_value):
+        def __init__(self, truncation_value, array_truncation=None):
             self.truncation_value = truncation_value
+            self.array_truncation = array_truncation
 
         setattr(cls, '__init__', __init__)
 
@@ -300,7 +850,8 @@ class TruncationWrapperCreator(type):
         # reduce_function_attr = getattr(cls, 'reduce_function')
         def reduce_function(self, *args):
             return TruncationWrapperCreator.truncate_array(super(cls, self).reduce_function(*args),
-                                                           self.truncation_value)
+                                                           self.truncation_value,
+                                                           self.array_truncation)
 
         setattr(cls, 'reduce_function', reduce_function)
 
@@ -311,6 +862,17 @@ class TruncationWrapperCreator(type):
 
         setattr(cls, 'inference_function', inference_function)
 
+        # the bailout checks of the base classes look at the numbers before they are truncated, so the reduction
+        # table has to be rebuilt from the truncated reduce_function
+        setattr(cls, 'can_reduce_incrementally', False)
+        setattr(cls, 'batch_reduction', None)
+
+        # the shared rows are not truncated
+        setattr(cls, 'shares_rows', False)
+
+        # the truncation converts the numbers to floats, which LogNumbers are meant to avoid
+        setattr(cls, 'can_promote_to_log_domain', False)
+
         super(TruncationWrapperCreator, cls).__init__(classname, bases, class_dict)
 
 
@@ -362,11 +924,15 @@ class SlopeAndBias(AbstractStaticPredictor):
     +--------------+--------+--------+
     """
 
+    __slots__ = ('slope_predictor', 'bias_predictor', 'slopes_creator')
+
     class_for_slope_prediction = ImprovedDivisionCanDealWithZero
     class_for_bias_prediction = ImprovedDivisionCanDealWithZero
 
     class_to_create_slopes = ImprovedDivisionCanDealWithZero
 
+    shares_rows = True
+
     def __init__(self):
         self.slope_predictor = self.class_for_slope_prediction()
         self.bias_predictor = self.class_for_bias_prediction()
@@ -380,7 +946,7 @@ class SlopeAndBias(AbstractStaticPredictor):
                + '\n' \
                + "bias_predictor: " + self.bias_predictor.get_name()
 
-    def convert_list_to_slopes_and_biases(self, lis):
+    def convert_list_to_slopes_and_biases(self, lis, shared_rows=None):
         # first check if the list given can even be processed
         # it it answers to base conditions of either the slope_predictor or the bias_predictor
         # then we just need to return the base numbers for each class
@@ -393,7 +959,14 @@ class SlopeAndBias(AbstractStaticPredictor):
             biases_base_number = self.bias_predictor.get_base_case_number(lis)
             return [[slope_base_number], [biases_base_number]]
 
-        slopes = list(map(math.floor, self.slopes_creator.reduce_function(lis)))
+        return self.create_slopes_and_biases(lis, shared_rows)
+
+    def create_slopes_and_biases(self, lis, shared_rows=None):
+        if shared_rows is not None and self.slopes_creator.shares_rows:
+            ratios = self.slopes_creator.get_shared_first_reduced_list(lis, shared_rows)
+        else:
+            ratios = self.slopes_creator.reduce_function(lis)
+        slopes = list(map(math.floor, ratios))
         biases = [lis[i + 1] - (lis[i] * slopes[i]) for i in range(len(slopes))]
 
         return [slopes, biases]
@@ -450,3 +1023,207 @@ class SlopeAndBias(AbstractStaticPredictor):
 
     def get_sublist_which_can_be_predicted(self, lis):
         return self.slopes_creator.get_sublist_which_can_be_predicted(lis)
+
+    def get_inference_tail(self, lis):
+        if type(lis[0]) is TYPE_LIST:
+            return [self.slope_predictor.get_inference_tail(lis[0]), self.bias_predictor.get_inference_tail(lis[1])]
+
+        # only the last element of the original list is used
+        return lis[-1:]
+
+    def get_number_of_following_elements_to_drop(self, element):
+        return self.slopes_creator.get_number_of_following_elements_to_drop(element)
+
+    def get_shared_sublist_which_can_be_predicted(self, shared_rows):
+        return self.slopes_creator.get_shared_sublist_which_can_be_predicted(shared_rows)
+
+    def predict_sublist(self, lis, shared_rows=None):
+        # the same as reducing lis with base_case, reduce_function and inference_function, but the slopes and the
+        # biases are converted once instead of in each of them, and are then reduced side by side
+        slopes_and_biases = self.convert_list_to_slopes_and_biases(lis, shared_rows)
+
+        # the base case of lis is decided by its slopes and biases, in which case their base case numbers are used
+        # for lis directly
+        if self.base_case(slopes_and_biases) is not None:
+            return self.inference_function(lis, self.get_base_case_number(slopes_and_biases))
+
+        slopes, biases = slopes_and_biases
+        predicted_slope, predicted_bias = predict_next_elements_side_by_side(
+            [self.slope_predictor.reduce_function(slopes), self.bias_predictor.reduce_function(biases)],
+            [self.slope_predictor, self.bias_predictor])
+
+        predicted_next_element_of_slopes_and_biases = self.inference_function(
+            self.get_inference_tail(slopes_and_biases),
+            [predicted_slope, predicted_bias])
+        return self.inference_function(lis, predicted_next_element_of_slopes_and_biases)
+
+    def create_reduction_table(self, lis=()):
+        predictors_used = [self.slope_predictor, self.bias_predictor, self.slopes_creator]
+        if all(predictor.can_reduce_incrementally and predictor.inference_tail_length == 1
+               for predictor in predictors_used):
+            return SlopeAndBiasReductionTable(self, lis)
+        return HistoryReductionTable(self, lis)
+
+
+class SlopeAndBiasReductionTable:
+    """
+    the reduction table of SlopeAndBias, extended one element at a time.
+    the slopes and the biases each get a ReductionTable of their own predictor, and the 2 tables are cut at the depth
+    of the shallower one when predicting.
+    the predictors of SlopeAndBias are of the DivisionCanDealWithZero family, so like a RebuildingReductionTable it
+    keeps the whole list, and it is rebuilt when the undefined ratios change
+    """
+
+    def __init__(self, predictor, lis=()):
+        self.predictor = predictor
+        self.history = list(lis)
+
+        # whether the original list answers to the base case of the slope_predictor or the bias_predictor
+        self.contains_base_case_element = any(map(self.is_base_case_element, self.history))
+
+        self.rebuild()
+
+    def __len__(self):
+        return len(self.history)
+
+    def copy(self):
+        table_copy = copy.copy(self)
+        table_copy.history = list(self.history)
+        table_copy.ratios = self.ratios.copy()
+        table_copy.slopes = self.slopes.copy()
+        table_copy.biases = self.biases.copy()
+        return table_copy
+
+    def is_base_case_element(self, element):
+        return (self.predictor.slope_predictor.is_base_case_element(element)
+                or self.predictor.bias_predictor.is_base_case_element(element))
+
+    def rebuild(self, ratios=None):
+        """
+        :param ratios: the ReductionTable of the slopes_creator for the current history, if it is already built
+        """
+        if ratios is None:
+            ratios = create_incremental_reduction_table(self.predictor.slopes_creator, self.history, max_depth=1)
+        self.ratios = ratios
+
+        slopes, biases = [], []
+        if len(self.history) > 1:
+            slopes, biases = self.predictor.create_slopes_and_biases(self.history)
+        self.slopes = self.predictor.slope_predictor.create_reduction_table(slopes)
+        self.biases = self.predictor.bias_predictor.create_reduction_table(biases)
+
+    def ratios_are_replaced(self):
+        return len(self.ratios.rows) > 1 and self.ratios.rows[1].is_replaced()
+
+    def append(self, element):
+        self.history.append(element)
+        if self.is_base_case_element(element):
+            self.contains_base_case_element = True
+
+        number_of_rebuilds = self.ratios.number_of_rebuilds
+        ratios_were_replaced = self.ratios_are_replaced()
+        self.ratios.append(element)
+
+        if self.ratios.number_of_rebuilds != number_of_rebuilds:
+            # the undefined ratios changed so every slope might have changed
+            self.rebuild(self.ratios)
+            return
+
+        if self.ratios_are_replaced():
+            if not ratios_were_replaced:
+                # the slopes_creator replaced the ratios with the base case number, see create_slopes_and_biases
+                self.rebuild(self.ratios)
+            return
+
+        if len(self.history) == 1:
+            return
+
+        slope = math.floor(self.ratios.rows[1].last)
+        self.slopes.append(slope)
+        self.biases.append(element - (self.history[-2] * slope))
+
+    def extend(self, lis):
+        lis = list(lis)
+        self.history.extend(lis)
+        if any(map(self.is_base_case_element, lis)):
+            self.contains_base_case_element = True
+        self.rebuild()
+
+    def predict(self):
+        if len(self.history) == 0:
+            return None
+
+        if instrumentation.recorders:
+            return instrumentation.record_engine_prediction(instrumentation.ENGINE_STREAM,
+                                                            self.predictor,
+                                                            self.history,
+                                                            self.predict_from_tables,
+                                                            row_lengths=[len(self.history)])
+        return self.predict_from_tables()
+
+    def predict_from_tables(self):
+        last_element = self.history[-1]
+        slope_predictor = self.predictor.slope_predictor
+        bias_predictor = self.predictor.bias_predictor
+
+        depth = min(self.slopes.get_depth(), self.biases.get_depth())
+        if len(self.history) == 1 or self.contains_base_case_element or depth == 0:
+            # the original list itself answers to the base case
+            slope = slope_predictor.get_base_case_number([last_element])
+            bias = bias_predictor.get_base_case_number([last_element])
+        else:
+            slope = self.slopes.predict(depth)
+            bias = self.biases.predict(depth)
+
+        return self.predictor.inference_function([last_element], [slope, bias])
+
+
+class WindowedPredictor:
+    """
+    predicts the next element of a list from its last window_size elements only, with any other predictor.
+    its stream keeps the reduction table of the window up to date as the window slides, so the cost of each element
+    is bounded by the window size and not by the length of the list
+    """
+
+    __slots__ = ('predictor', 'window_size')
+
+    def __init__(self, predictor, window_size):
+        """
+        :param predictor: an instance of any of the predictors
+        :param window_size: the number of elements at the end of the list that are used, at least 1
+        """
+        if window_size < 1:
+            raise ValueError('the window size must be at least 1')
+        self.predictor = predictor
+        self.window_size = window_size
+
+    def get_name(self):
+        return self.predictor.get_name() + '\n' + f'window size: {self.window_size}'
+
+    def get_window(self, lis):
+        return lis[-self.window_size:]
+
+    def predict(self, lis, shared_rows=None):
+        """
+        :param lis:
+        :param shared_rows: ignored, the shared rows are those of the whole list and not of the window
+        :return: the prediction of the predictor on the window of lis
+        """
+        return self.predictor.predict(self.get_window(lis))
+
+    def predict_batch(self, list_of_lists):
+        return self.predictor.predict_batch([self.get_window(lis) for lis in list_of_lists])
+
+    def stream(self, lis=()):
+        """
+        :param lis: the elements to start the stream with
+        :return: a stream which predicts the next element of the window of the elements pushed to it
+        """
+        predictor = self.predictor
+        if isinstance(predictor, AbstractStaticPredictor) \
+                and type(predictor).create_reduction_table is AbstractStaticPredictor.create_reduction_table \
+                and predictor.can_reduce_incrementally \
+                and predictor.inference_tail_length == 1 \
+                and not predictor.reduce_step_can_be_undefined:
+            return SlidingWindowStream(predictor, self.window_size, lis)
+        return HistoryWindowStream(predictor, self.window_size, lis)
@@ -0,0 +1,146 @@
+"""
+this file contains SequenceView, a window of a sequence which is sliced without copying it, so the prefixes and the
+suffixes that the predict path takes of a list share its memory.
+the sequence can be a list, a tuple, an array.array, a memoryview or a numpy array. the predictors reduce python
+numbers, so the window is converted to a list once, right before it is reduced, see to_list
+"""
+import array
+import itertools
+
+
+class SequenceView:
+    """
+    the elements of base from start up to stop, read only.
+    slicing it with a step of 1 returns another view of the same base
+    """
+
+    __slots__ = ('base', 'start', 'stop')
+
+    def __init__(self, base, start=0, stop=None):
+        """
+        :param base: the sequence, or another SequenceView in which case the new view is a view of its base
+        :param start:
+        :param stop: None for the end of base
+        """
+        if isinstance(base, SequenceView):
+            length = len(base)
+            start, stop, _ = slice(start, stop).indices(length)
+            start, stop = base.start + start, base.start + max(start, stop)
+            base = base.base
+        else:
+            start, stop, _ = slice(start, stop).indices(len(base))
+            stop = max(start, stop)
+
+        self.base = base
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.step is None or index.step == 1:
+                return SequenceView(self, index.start, index.stop)
+            return self.to_list()[index]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('SequenceView index out of range')
+        return self.to_number(self.base[self.start + index])
+
+    def __iter__(self):
+        if isinstance(self.base, (list, tuple)):
+            return itertools.islice(self.base, self.start, self.stop)
+        return iter(self.to_list())
+
+    def __contains__(self, element):
+        try:
+            self.index(element)
+        except ValueError:
+            return False
+        return True
+
+    def can_be_searched_in_place(self):
+        # lists, tuples and array.arrays have an index method of their own, memoryviews and numpy arrays do not
+        return isinstance(self.base, (list, tuple, array.array))
+
+    def index(self, element, start=0, stop=None):
+        """
+        the same as list.index. the base is searched in place when it has an index method of its own, otherwise the
+        window is converted to a list, see can_be_searched_in_place
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if self.can_be_searched_in_place():
+            return self.base.index(element, self.start + start, self.start + max(start, stop)) - self.start
+        return self.to_list().index(element, start, max(start, stop))
+
+    @staticmethod
+    def to_number(element):
+        # the elements of numpy arrays are numpy numbers, which overflow where python numbers do not
+        if hasattr(element, 'item'):
+            return element.item()
+        return element
+
+    def to_list(self):
+        """
+        :return: the elements of the view as a list of python numbers, the base itself if it is a list and the view is
+        all of it
+        """
+        if isinstance(self.base, list) and self.start == 0 and self.stop == len(self.base):
+            return self.base
+        window = self.base[self.start: self.stop]
+        if isinstance(window, list):
+            return window
+        if hasattr(window, 'tolist'):
+            # array.array, memoryview and numpy arrays
+            return window.tolist()
+        return list(window)
+
+    def __repr__(self):
+        return f'SequenceView({self.to_list()})'
+
+
+def to_list(lis):
+    """
+    :param lis: a list, a SequenceView or any of the sequences a SequenceView can be a view of
+    :return: lis itself if it is a list, otherwise its elements as a list of python numbers
+    """
+    if isinstance(lis, list):
+        return lis
+    if isinstance(lis, SequenceView):
+        return lis.to_list()
+    if hasattr(lis, 'tolist'):
+        return lis.tolist()
+    return list(lis)
+
+
+def get_index_of_last_occurrence(lis, element):
+    """
+    :param lis: a list or a SequenceView
+    :param element:
+    :return: the index of the last element of lis which equals element, None if there is none.
+    lis is searched forwards from one occurrence to the next, so a list, or a view which can be searched in place, is
+    not copied. the window of any other view is converted to a list once
+    """
+    if isinstance(lis, SequenceView) and not lis.can_be_searched_in_place():
+        lis = lis.to_list()
+
+    index_of_last_occurrence = None
+    try:
+        while True:
+            index_of_last_occurrence = lis.index(element, 0 if index_of_last_occurrence is None
+                                                 else index_of_last_occurrence + 1)
+    except ValueError:
+        return index_of_last_occurrence
+
+
+def get_view(lis):
+    """
+    :return: lis itself if it is a SequenceView, otherwise a SequenceView of it, so the sublists taken of it are not
+    copied
+    """
+    if isinstance(lis, SequenceView):
+        return lis
+    return SequenceView(lis)
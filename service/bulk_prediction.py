@@ -0,0 +1,151 @@
+"""
+this file contains the prediction of the next element of every sequence in files in the format of the OEIS stripped
+file, 'A000045 ,0,1,1,2,3,5,8,', read from the files themselves, from gzip files or from the standard input.
+the lines are sent to a process pool in chunks, each worker parses its chunk, predicts it with predict_batch and
+formats the output of the chunk, and the outputs are written in the order of the input as soon as they are ready.
+only a few chunks per worker are in memory at a time, so the memory in use does not grow with the input
+"""
+from service.request_prediction import predict_requests
+from testing_on_oeis.load_oeis_series_helper import extract_sequence_from_line, line_is_comment_line, open_oeis_file
+from concurrent.futures import ProcessPoolExecutor
+import collections
+import csv
+import gzip
+import io
+import itertools
+import json
+import os
+import sys
+
+OUTPUT_FORMATS = ['csv', 'jsonl']
+
+# the first bytes of a gzip file
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def open_input(path):
+    """
+    :param path: a stripped file, a gzip file of one, or '-' for the standard input, which can be gzipped as well
+    :return: the input opened for reading text
+    """
+    if path != '-':
+        return open_oeis_file(path)
+
+    stdin = sys.stdin.buffer
+    if stdin.peek(len(GZIP_MAGIC))[: len(GZIP_MAGIC)] == GZIP_MAGIC:
+        return io.TextIOWrapper(gzip.GzipFile(fileobj=stdin))
+    return io.TextIOWrapper(stdin)
+
+
+def iterate_input_lines(paths):
+    """
+    :param paths: see open_input
+    :return: a generator over the lines of the sequences in the inputs one after the other, without the comments
+    """
+    for path in paths:
+        with open_input(path) as f:
+            for line in f:
+                if line.strip() != '' and not line_is_comment_line(line):
+                    yield line
+
+
+def get_header(predictor_names, output_format):
+    """
+    :return: the text the output starts with
+    """
+    if output_format == 'csv':
+        return format_csv_rows([['name'] + list(predictor_names)])
+    return ''
+
+
+def format_csv_rows(rows):
+    text = io.StringIO()
+    csv.writer(text, lineterminator='\n').writerows(rows)
+    return text.getvalue()
+
+
+def predict_lines(predictor_names, lines, output_format):
+    """
+    the work of a worker process on a chunk
+    :param predictor_names: see parse_predictor_name in predictor_registry.py
+    :param lines: lines of sequences
+    :param output_format: one of OUTPUT_FORMATS
+    :return: the output of the lines, a row for each line with the prediction of each predictor. a prediction is
+    empty in csv and null in jsonl if the predictor can not predict the sequence, or if the line is not a sequence
+    """
+    names, sequences, errors = [], [], []
+    for line in lines:
+        try:
+            name, sequence = extract_sequence_from_line(line.strip())
+            error = None
+        except (ValueError, SyntaxError):
+            name, sequence, error = line.split(' ', 1)[0].strip(), [], 'the line is not a sequence'
+        names.append(name)
+        sequences.append(sequence)
+        errors.append(error)
+
+    predictions, _ = predict_requests([(predictor_name, sequence)
+                                       for sequence in sequences
+                                       for predictor_name in predictor_names])
+    number_of_predictors = len(predictor_names)
+    predictions_of_lines = [predictions[i * number_of_predictors: (i + 1) * number_of_predictors]
+                            for i in range(len(lines))]
+
+    if output_format == 'csv':
+        return format_csv_rows([name] + ['' if prediction is None else prediction for prediction in predictions_of_line]
+                               for name, predictions_of_line in zip(names, predictions_of_lines))
+
+    rows = []
+    for name, predictions_of_line, error in zip(names, predictions_of_lines, errors):
+        row = {'name': name, 'predictions': dict(zip(predictor_names, predictions_of_line))}
+        if error is not None:
+            row['error'] = error
+        rows.append(json.dumps(row) + '\n')
+    return ''.join(rows)
+
+
+def split_lines_to_chunks(lines, chunk_size):
+    """
+    :return: a generator over lists of chunk_size consecutive lines, the lines are read lazily
+    """
+    while True:
+        chunk = list(itertools.islice(lines, chunk_size))
+        if len(chunk) == 0:
+            return
+        yield chunk
+
+
+def predict_in_bulk(predictor_names, paths, output, output_format='csv', number_of_workers=None, chunk_size=1000):
+    """
+    :param predictor_names: see parse_predictor_name in predictor_registry.py
+    :param paths: see open_input
+    :param output: a text stream the output is written to
+    :param output_format: one of OUTPUT_FORMATS
+    :param number_of_workers: the number of processes, None for the number of cpus. with 1 worker the sequences are
+    predicted in the current process
+    :param chunk_size: the number of lines sent to a worker at a time
+    :return: the number of lines predicted
+    """
+    output.write(get_header(predictor_names, output_format))
+    chunks = split_lines_to_chunks(iterate_input_lines(paths), chunk_size)
+    number_of_lines = 0
+
+    if number_of_workers == 1:
+        for chunk in chunks:
+            output.write(predict_lines(predictor_names, chunk, output_format))
+            number_of_lines += len(chunk)
+        return number_of_lines
+
+    with ProcessPoolExecutor(max_workers=number_of_workers) as executor:
+        maximal_number_of_pending_chunks = 2 * (number_of_workers or os.cpu_count())
+        # the outputs are written in the order the chunks were submitted
+        pending = collections.deque()
+        for chunk in chunks:
+            if len(pending) >= maximal_number_of_pending_chunks:
+                output.write(pending.popleft().result())
+            pending.append(executor.submit(predict_lines, predictor_names, chunk, output_format))
+            number_of_lines += len(chunk)
+
+        while len(pending) > 0:
+            output.write(pending.popleft().result())
+    return number_of_lines
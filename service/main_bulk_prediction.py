@@ -0,0 +1,45 @@
+from service.bulk_prediction import OUTPUT_FORMATS, predict_in_bulk
+from predictor_registry import parse_predictor_name
+import argparse
+import os
+import sys
+
+if __name__ == "__main__":
+    """
+    instructions
+
+    run from the project folder, with files in the format of the OEIS stripped file
+    python -m service.main_bulk_prediction stripped.gz --predictors SlopeAndBias Subtraction --output predictions.csv
+
+    with no files, or with -, the sequences are read from the standard input
+    cat sequences.txt | python -m service.main_bulk_prediction --predictors Subtraction --format jsonl
+    """
+    parser = argparse.ArgumentParser(description='predict the next element of every sequence in OEIS format files')
+    parser.add_argument('paths', nargs='*', default=['-'],
+                        help='stripped files or gzip files of them, - for the standard input')
+    parser.add_argument('--predictors', nargs='+', required=True,
+                        help='names of predictor classes, such as SlopeAndBias, ImprovedDivisionWithTruncation:3 or '
+                             'WindowedPredictor:20:Subtraction, see predictor_registry.py')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv')
+    parser.add_argument('--output', default=None, help='the file to write to, the standard output by default')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='the number of processes, all the cpus by default')
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    for predictor_name in args.predictors:
+        try:
+            parse_predictor_name(predictor_name)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.output is None:
+        try:
+            predict_in_bulk(args.predictors, args.paths, sys.stdout, args.format, args.workers, args.chunk_size)
+        except BrokenPipeError:
+            # the output was piped to a program that stopped reading it, such as head
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            sys.exit(1)
+    else:
+        with open(args.output, 'w', newline='') as output:
+            predict_in_bulk(args.predictors, args.paths, output, args.format, args.workers, args.chunk_size)
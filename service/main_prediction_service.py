@@ -0,0 +1,34 @@
+from service.prediction_service import PredictionService, serve
+import argparse
+import asyncio
+
+if __name__ == "__main__":
+    """
+    instructions
+
+    run from the project folder
+    python -m service.main_prediction_service --port 8765
+    or, on a unix socket
+    python -m service.main_prediction_service --unix-socket /tmp/predictions.sock
+
+    then send a json request per line, such as
+    {"id": 1, "predictor": "SlopeAndBias", "sequence": [1, 1, 2, 3, 5, 8]}
+    and read a json response per line, see prediction_service.py
+    """
+    parser = argparse.ArgumentParser(description='predict the next element of sequences sent as json lines')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix-socket', default=None, help='listen on this unix socket instead of on host and port')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='the number of processes, all the cpus by default')
+    parser.add_argument('--max-batch-size', type=int, default=256,
+                        help='the most requests predicted together by a worker')
+    parser.add_argument('--max-batch-delay', type=float, default=5,
+                        help='the most milliseconds a request waits for others to be predicted with')
+    args = parser.parse_args()
+
+    prediction_service = PredictionService(args.workers, args.max_batch_size, args.max_batch_delay / 1000)
+    try:
+        asyncio.run(serve(prediction_service, args.host, args.port, args.unix_socket))
+    except KeyboardInterrupt:
+        pass
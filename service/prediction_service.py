@@ -0,0 +1,281 @@
+"""
+this file contains an asyncio server that predicts the next element of sequences for many clients at once.
+a client sends a request per line, a json object such as
+    {"id": 7, "predictor": "ImprovedDivisionWithTruncation:3", "sequence": [1, 2, 4, 8]}
+and gets a line back for each request as soon as it is predicted, in the order the predictions finish:
+    {"id": 7, "prediction": 16.0, "latency": {"queued": 0.002, "predicted": 0.001, "total": 0.004}, "batch size": 12}
+a request that can not be predicted gets "prediction": null, and a request that is not valid gets an "error" instead.
+the line {"statistics": true} gets the latency percentiles and the batch sizes of the requests predicted so far.
+
+the requests of all the clients are gathered into micro batches, a batch is sent to the process pool once it has
+max_batch_size requests or once its first request waited max_batch_delay seconds. in the workers the requests of each
+predictor are predicted together with predict_batch, which reduces the lists that fit in int64/float64 with numpy
+"""
+from service.request_prediction import predict_requests
+from predictor_registry import parse_predictor_name
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import collections
+import functools
+import json
+import os
+import time
+
+# the longest line a client may send, sequences can have many big terms
+MAXIMAL_LINE_LENGTH = 2 ** 26
+
+# the number of the latest requests the statistics are computed from
+NUMBER_OF_LATENCIES_KEPT = 100000
+
+
+class PendingRequest:
+    """
+    a request waiting in a batch, the handler of its client waits on future
+    """
+
+    __slots__ = ('predictor_name', 'sequence', 'arrival_time', 'future')
+
+    def __init__(self, predictor_name, sequence, arrival_time, future):
+        self.predictor_name = predictor_name
+        self.sequence = sequence
+        self.arrival_time = arrival_time
+        self.future = future
+
+
+class PredictionService:
+    """
+    the state shared by all the connections: the queue of requests, the process pool and the statistics
+    """
+
+    def __init__(self, number_of_workers=None, max_batch_size=256, max_batch_delay=0.005):
+        """
+        :param number_of_workers: the number of processes in the pool, None for the number of cpus
+        :param max_batch_size: the most requests sent to a worker at once
+        :param max_batch_delay: the most seconds the first request of a batch waits for more requests
+        """
+        self.number_of_workers = number_of_workers or os.cpu_count()
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+
+        self.executor = None
+        self.queue = None
+        self.batches_in_flight = None
+        self.batcher = None
+        # the event loop only keeps weak references to its tasks
+        self.batch_tasks = set()
+
+        self.latencies = collections.deque(maxlen=NUMBER_OF_LATENCIES_KEPT)
+        self.number_of_requests = 0
+        self.number_of_batches = 0
+
+    async def start(self):
+        self.executor = ProcessPoolExecutor(max_workers=self.number_of_workers)
+        self.queue = asyncio.Queue()
+        # each worker has one batch to predict and one waiting, more would only wait in the pool instead of the queue
+        self.batches_in_flight = asyncio.Semaphore(2 * self.number_of_workers)
+        self.batcher = asyncio.create_task(self.gather_batches())
+
+    async def stop(self):
+        self.batcher.cancel()
+        try:
+            await self.batcher
+        except asyncio.CancelledError:
+            pass
+        # the shutdown waits for the batches the workers are predicting, in a thread so the event loop keeps serving
+        await asyncio.get_running_loop().run_in_executor(None,
+                                                         functools.partial(self.executor.shutdown, cancel_futures=True))
+
+    async def predict(self, predictor_name, sequence):
+        """
+        :return: the prediction on the sequence as to_json_number returns it, and the latency dict of the response
+        and the size of the batch it was predicted in
+        """
+        pending_request = PendingRequest(predictor_name,
+                                         sequence,
+                                         time.perf_counter(),
+                                         asyncio.get_running_loop().create_future())
+        await self.queue.put(pending_request)
+        return await pending_request.future
+
+    async def gather_batches(self):
+        """
+        takes the requests off the queue in batches, and sends each batch to the pool without waiting for the
+        previous batches to be predicted
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = batch[0].arrival_time + self.max_batch_delay
+            while len(batch) < self.max_batch_size:
+                # the requests that already wait are taken even after the deadline
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self.batches_in_flight.acquire()
+            batch_task = loop.create_task(self.predict_batch(batch))
+            self.batch_tasks.add(batch_task)
+            batch_task.add_done_callback(self.batch_tasks.discard)
+
+    async def predict_batch(self, batch):
+        try:
+            dispatch_time = time.perf_counter()
+            try:
+                predictions, prediction_time = await asyncio.get_running_loop().run_in_executor(
+                    self.executor,
+                    predict_requests,
+                    [(pending_request.predictor_name, pending_request.sequence) for pending_request in batch])
+            except Exception as e:
+                for pending_request in batch:
+                    if not pending_request.future.done():
+                        pending_request.future.set_exception(e)
+                return
+        finally:
+            self.batches_in_flight.release()
+
+        end_time = time.perf_counter()
+        self.number_of_batches += 1
+        for pending_request, prediction in zip(batch, predictions):
+            latency = {'queued': dispatch_time - pending_request.arrival_time,
+                       'predicted': prediction_time,
+                       'total': end_time - pending_request.arrival_time}
+            self.latencies.append(latency['total'])
+            self.number_of_requests += 1
+            if not pending_request.future.done():
+                pending_request.future.set_result((prediction, latency, len(batch)))
+
+    def get_statistics(self):
+        """
+        :return: the number of requests and batches predicted so far, and the percentiles of the latency of the
+        latest requests
+        """
+        latencies = sorted(self.latencies)
+        statistics = {'requests': self.number_of_requests,
+                      'batches': self.number_of_batches,
+                      'mean batch size': self.number_of_requests / self.number_of_batches
+                      if self.number_of_batches > 0 else None}
+        for percentile in [50, 90, 99, 99.9]:
+            statistics[f'p{percentile} latency'] = latencies[min(len(latencies) - 1,
+                                                                 int(len(latencies) * percentile / 100))] \
+                if len(latencies) > 0 else None
+        return statistics
+
+    async def respond(self, request, writer):
+        """
+        :param request: the json object the client sent
+        :param writer: the stream of the client
+        :return:
+        """
+        response = {'id': request.get('id')}
+        try:
+            prediction, latency, batch_size = await self.predict(request['predictor'], request['sequence'])
+            response.update({'prediction': prediction, 'latency': latency, 'batch size': batch_size})
+        except Exception as e:
+            response['error'] = f'{type(e).__name__}: {e}'
+
+        writer.write(json.dumps(response).encode() + b'\n')
+        await writer.drain()
+
+    async def handle_connection(self, reader, writer):
+        """
+        reads the requests of a client line by line, each is answered as soon as it is predicted, so a client can send
+        many requests without waiting for their responses
+        """
+        responses = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+                    break
+                if len(line) == 0:
+                    break
+                if line.strip() == b'':
+                    continue
+
+                request, error_response = parse_request(line)
+                if error_response is not None:
+                    writer.write(json.dumps(error_response).encode() + b'\n')
+                elif request.get('statistics'):
+                    writer.write(json.dumps({'id': request.get('id'), 'statistics': self.get_statistics()}).encode()
+                                 + b'\n')
+                else:
+                    response = asyncio.create_task(self.respond(request, writer))
+                    responses.add(response)
+                    response.add_done_callback(responses.discard)
+
+            if len(responses) > 0:
+                await asyncio.gather(*responses, return_exceptions=True)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+def parse_request(line):
+    """
+    :param line: a line a client sent
+    :return: the request, and the response to it if it is not a valid request, otherwise None
+    """
+    try:
+        request = json.loads(line)
+    except ValueError:
+        return None, {'id': None, 'error': 'the line is not json'}
+    if not isinstance(request, dict):
+        return None, {'id': None, 'error': 'a request is a json object'}
+    if request.get('statistics'):
+        return request, None
+
+    error = None
+    if not isinstance(request.get('predictor'), str):
+        error = 'a request needs the name of a predictor'
+    elif not isinstance(request.get('sequence'), list) or \
+            not all(isinstance(element, (int, float)) and not isinstance(element, bool)
+                    for element in request['sequence']):
+        error = 'a request needs a sequence, a list of numbers'
+    else:
+        try:
+            # the name is checked without creating the predictor, which only the workers need
+            parse_predictor_name(request['predictor'])
+        except ValueError as e:
+            error = str(e)
+
+    if error is None:
+        return request, None
+    return request, {'id': request.get('id'), 'error': error}
+
+
+async def serve(service, host=None, port=None, path_to_unix_socket=None):
+    """
+    runs the service until it is cancelled
+    :param service: a PredictionService
+    :param host:
+    :param port:
+    :param path_to_unix_socket: if given, the service listens on this unix socket instead of on host and port
+    :return:
+    """
+    await service.start()
+    try:
+        if path_to_unix_socket is not None:
+            server = await asyncio.start_unix_server(service.handle_connection,
+                                                     path_to_unix_socket,
+                                                     limit=MAXIMAL_LINE_LENGTH)
+        else:
+            server = await asyncio.start_server(service.handle_connection, host, port, limit=MAXIMAL_LINE_LENGTH)
+
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+        if path_to_unix_socket is not None and os.path.exists(path_to_unix_socket):
+            os.unlink(path_to_unix_socket)
@@ -0,0 +1,76 @@
+"""
+this file contains the prediction of a batch of requests, each is the name of a predictor and a sequence, which the
+workers of the prediction service and of the bulk prediction run. the requests of each predictor are predicted together
+with predict_batch, and the predictions are converted to numbers json can hold
+"""
+from predictor_registry import create_predictor
+from fractions import Fraction
+import math
+import time
+
+# the predictors created by each worker process, by their names
+predictors_by_name = {}
+
+
+def get_predictor(predictor_name):
+    """
+    :return: the predictor created from predictor_name, see create_predictor. it is created once in each process
+    """
+    if predictor_name not in predictors_by_name:
+        predictors_by_name[predictor_name] = create_predictor(predictor_name)
+    return predictors_by_name[predictor_name]
+
+
+def to_json_number(prediction):
+    """
+    :param prediction: a prediction of a predictor, or None
+    :return: the prediction as a number json can hold. a Fraction is written as an int if it is whole and as a float
+    otherwise, and numbers which json can not hold, such as nan or a prediction too big for a float, as a string
+    """
+    if prediction is None or (isinstance(prediction, int) and not isinstance(prediction, bool)):
+        return prediction
+    if isinstance(prediction, Fraction) and prediction.denominator == 1:
+        return prediction.numerator
+    if isinstance(prediction, float) and math.isfinite(prediction):
+        return prediction
+
+    # a Fraction too big for a float raises OverflowError
+    try:
+        number = float(prediction)
+    except (TypeError, ValueError, OverflowError):
+        return str(prediction)
+    return number if math.isfinite(number) else str(prediction)
+
+
+def predict_requests(requests):
+    """
+    the work of a worker process on a batch
+    :param requests: a list of the predictor name and the sequence of each request
+    :return: a list with the prediction on each request, as to_json_number returns it, and the seconds it took
+    """
+    start_time = time.perf_counter()
+    predictions = [None] * len(requests)
+
+    indices_by_predictor_name = {}
+    for i, (predictor_name, _) in enumerate(requests):
+        indices_by_predictor_name.setdefault(predictor_name, []).append(i)
+
+    for predictor_name, indices in indices_by_predictor_name.items():
+        predictor = get_predictor(predictor_name)
+        try:
+            batch_predictions = predictor.predict_batch([requests[i][1] for i in indices])
+        except (ArithmeticError, ValueError, TypeError):
+            # one sequence the predictor can not handle should not fail the others
+            batch_predictions = [predict_or_none(predictor, requests[i][1]) for i in indices]
+
+        for i, prediction in zip(indices, batch_predictions):
+            predictions[i] = to_json_number(prediction)
+
+    return predictions, time.perf_counter() - start_time
+
+
+def predict_or_none(predictor, sequence):
+    try:
+        return predictor.predict(sequence)
+    except (ArithmeticError, ValueError, TypeError):
+        return None
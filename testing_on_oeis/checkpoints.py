@@ -0,0 +1,205 @@
+"""
+this file contains the files of a checkpointed run of t_prediction_function, which are kept in a directory of their
+own:
+- results - the outcome of each predictor on each sequence that was scored, see get_outcome, in the order of the
+  corpus. a header, MAGIC then the number 1 (to detect a different byte order) and the number of predictors, followed
+  by a record for each sequence: its A-number as int64 and the outcome of each predictor as float64, in the byte order
+  of the machine that created it. the file is only appended to
+- checkpoint.json - the names of the predictors, the arguments that select the sequences of the run, the number of
+  sequences that were scored, the size of the results file at that point and the counters of each predictor.
+  it is replaced at once, so it always describes a prefix of the results file that was synced to the disk
+
+a run that stops at any point resumes from its last checkpoint, and what was written to the results file after it is
+truncated
+"""
+from testing_on_oeis.prediction_errors import PredictionErrors
+import hashlib
+import json
+import os
+import struct
+
+RESULTS_FILE_NAME = 'results'
+CHECKPOINT_FILE_NAME = 'checkpoint.json'
+
+MAGIC = b'OEISRSLT'
+HEADER = struct.Struct('=qq')
+HEADER_SIZE = len(MAGIC) + HEADER.size
+
+
+def get_record_struct(number_of_predictors):
+    return struct.Struct('=q%dd' % number_of_predictors)
+
+
+class ResultsFile:
+    """
+    the results file of a run, opened for appending records
+    """
+
+    def __init__(self, path, number_of_predictors, size=None):
+        """
+        :param path:
+        :param number_of_predictors:
+        :param size: the size the file had at the last checkpoint, it is truncated to it.
+        None for a new run, in which case the file is created, or emptied if it has the records of a run that did not
+        reach its first checkpoint
+        """
+        self.number_of_predictors = number_of_predictors
+        self.record_struct = get_record_struct(number_of_predictors)
+
+        if size is None:
+            with open(path, 'wb') as f:
+                f.write(MAGIC + HEADER.pack(1, number_of_predictors))
+
+        self.file = open(path, 'r+b')
+        if read_header(self.file) != number_of_predictors:
+            self.file.close()
+            raise ValueError(f'{path} has the results of a different number of predictors')
+
+        if size is not None:
+            self.file.truncate(size)
+        self.file.seek(0, os.SEEK_END)
+
+    def append(self, name_numbers, outcomes):
+        """
+        :param name_numbers: the A-numbers of the sequences, without the 'A'
+        :param outcomes: the outcomes of all the predictors on the first sequence, then on the second and so on
+        :return:
+        """
+        number_of_predictors = self.number_of_predictors
+        self.file.write(b''.join(self.record_struct.pack(name_number,
+                                                         *outcomes[i * number_of_predictors:
+                                                                   (i + 1) * number_of_predictors])
+                                 for i, name_number in enumerate(name_numbers)))
+
+    def sync(self):
+        """
+        :return: the size of the file once everything appended to it is on the disk
+        """
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def read_header(f):
+    """
+    :param f: the results file opened for reading bytes, at its start
+    :return: the number of predictors
+    """
+    header = f.read(HEADER_SIZE)
+    if len(header) != HEADER_SIZE or not header.startswith(MAGIC):
+        raise ValueError('not a results file')
+
+    one, number_of_predictors = HEADER.unpack(header[len(MAGIC):])
+    if one != 1:
+        raise ValueError('the results file was created on a machine with a different byte order')
+    return number_of_predictors
+
+
+def iterate_results(path, size=None):
+    """
+    :param path: a results file
+    :param size: if given, only the records in the first size bytes are read
+    :return: yields the A-number of each sequence, without the 'A', and a tuple of the outcomes of the predictors on it
+    """
+    with open(path, 'rb') as f:
+        record_struct = get_record_struct(read_header(f))
+        position = HEADER_SIZE
+        while size is None or position + record_struct.size <= size:
+            record = f.read(record_struct.size)
+            if len(record) < record_struct.size:
+                return
+            position += record_struct.size
+
+            name_number, *outcomes = record_struct.unpack(record)
+            yield name_number, outcomes
+
+
+def load_scores(path, number_of_predictors, size=None):
+    """
+    :return: the PredictionErrors of each predictor, from the outcomes in the results file
+    """
+    scores = [PredictionErrors() for _ in range(number_of_predictors)]
+    for _, outcomes in iterate_results(path, size):
+        for prediction_errors, outcome in zip(scores, outcomes):
+            prediction_errors.add_outcome(outcome)
+    return scores
+
+
+def get_hash_of_names(names_to_load):
+    """
+    :return: a short text that identifies the set of names, None if it is None
+    """
+    if names_to_load is None:
+        return None
+    return hashlib.sha256('\n'.join(sorted(names_to_load)).encode()).hexdigest()
+
+
+def create_checkpoint(list_of_predictors, corpus_arguments, number_of_seqs_scored, results_size, scores):
+    """
+    :param list_of_predictors:
+    :param corpus_arguments: a dict of the arguments that select the sequences of the run, it has to be the same when
+    the run is resumed
+    :param number_of_seqs_scored:
+    :param results_size: the size of the results file once the outcomes of those sequences are synced to it
+    :param scores: the PredictionErrors of each predictor
+    :return: the checkpoint, a dict
+    """
+    return {'predictors': [predictor.get_name() for predictor in list_of_predictors],
+            'corpus': corpus_arguments,
+            'number of sequences scored': number_of_seqs_scored,
+            'results size': results_size,
+            'counters': [prediction_errors.get_counters() for prediction_errors in scores]}
+
+
+def save_checkpoint(checkpoint_directory, checkpoint):
+    path_to_checkpoint = os.path.join(checkpoint_directory, CHECKPOINT_FILE_NAME)
+    temporary_path = path_to_checkpoint + '.tmp'
+    with open(temporary_path, 'w') as f:
+        json.dump(checkpoint, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary_path, path_to_checkpoint)
+
+
+def load_checkpoint(checkpoint_directory):
+    """
+    :return: the last checkpoint saved in the directory, None if there is none
+    """
+    path_to_checkpoint = os.path.join(checkpoint_directory, CHECKPOINT_FILE_NAME)
+    if not os.path.exists(path_to_checkpoint):
+        return None
+    with open(path_to_checkpoint, 'r') as f:
+        return json.load(f)
+
+
+def resume_from_checkpoint(checkpoint_directory, list_of_predictors, corpus_arguments):
+    """
+    :param checkpoint_directory:
+    :param list_of_predictors:
+    :param corpus_arguments: see create_checkpoint
+    :return: the number of sequences that were already scored, the size of the results file at the last checkpoint and
+    the PredictionErrors of each predictor on those sequences. 0, None and empty PredictionErrors if the run starts now
+    """
+    checkpoint = load_checkpoint(checkpoint_directory)
+    if checkpoint is None:
+        return 0, None, [PredictionErrors() for _ in list_of_predictors]
+
+    if checkpoint['predictors'] != [predictor.get_name() for predictor in list_of_predictors] \
+            or checkpoint['corpus'] != corpus_arguments:
+        raise ValueError(f'{checkpoint_directory} has the checkpoint of a different run')
+
+    results_size = checkpoint['results size']
+    scores = load_scores(os.path.join(checkpoint_directory, RESULTS_FILE_NAME), len(list_of_predictors), results_size)
+    if [prediction_errors.get_counters() for prediction_errors in scores] != checkpoint['counters']:
+        raise ValueError(f'the results file in {checkpoint_directory} does not match its checkpoint')
+
+    return checkpoint['number of sequences scored'], results_size, scores
@@ -1,5 +1,28 @@
+import gzip
 import os
 from ast import literal_eval
+from testing_on_oeis.oeis_cache import OEISCache, create_oeis_cache, is_oeis_cache
+
+STRIPPED_FILE_NAME = 'stripped'
+GZIPPED_STRIPPED_FILE_NAME = 'stripped.gz'
+CACHE_FILE_NAME = 'stripped.cache'
+
+
+def parse_series(series):
+    """
+    :param series: of the form ',0,1,1,1,2,1,2,1,5,2,2,1,5,1,2,1,14,1,5,1,5,\n'
+    :return: the list of numbers in it
+    """
+    series = series.strip().strip(',')
+    if series == '':
+        return []
+
+    # the stripped file contains only integers, so int is enough for almost every line, and much faster than
+    # literal_eval
+    try:
+        return list(map(int, series.split(',')))
+    except ValueError:
+        return literal_eval('[' + series + ']')
 
 
 def extract_sequence_from_line(line):
@@ -9,42 +32,168 @@ def extract_sequence_from_line(line):
     :return: the name and the series in the
     """
     separator_between_name_and_series = ' '
-    name, series = line.split(separator_between_name_and_series)
-
-    # to prevent compilation errors
-    if series[0] == ',':
-        series = series[1:]
-
-    series = literal_eval('[' + series + ']')
-    return name, series
+    name, series = line.split(separator_between_name_and_series, 1)
+    return name, parse_series(series)
 
 
 def line_is_comment_line(line):
     return line.startswith('#')
 
 
+def open_oeis_file(path_to_oeis_file):
+    """
+    :param path_to_oeis_file: the stripped file, or the gzip file that contains it, which is read without unpacking it
+    :return: the file opened for reading text
+    """
+    if path_to_oeis_file.endswith('.gz'):
+        return gzip.open(path_to_oeis_file, 'rt')
+    return open(path_to_oeis_file, 'r')
+
+
+def iterate_sequences_in_stripped_file(path_to_stripped_file,
+                                       limit_number_of_seqs_to_load=float('inf'),
+                                       number_of_seqs_to_skip=0,
+                                       names_to_load=None):
+    """
+    a generator over the sequences in the file, which reads and parses a single line at a time
+
+    :param path_to_stripped_file: the stripped file or stripped.gz
+    :param limit_number_of_seqs_to_load:
+    :param number_of_seqs_to_skip: the number of sequences to skip from the start of the file, after filtering by names
+    :param names_to_load: if not None, only the sequences whose A-number is in it are loaded
+    :return: yields the A-number and the sequence of each line
+    """
+    if limit_number_of_seqs_to_load <= 0:
+        return
+
+    with open_oeis_file(path_to_stripped_file) as f:
+        for line in f:
+            if line_is_comment_line(line):
+                continue
+
+            # the name is checked before the line is parsed, so filtered out lines cost almost nothing
+            if names_to_load is not None and line[: line.find(' ')] not in names_to_load:
+                continue
+
+            if number_of_seqs_to_skip > 0:
+                number_of_seqs_to_skip -= 1
+                continue
+
+            yield extract_sequence_from_line(line)
+
+            limit_number_of_seqs_to_load -= 1
+            if limit_number_of_seqs_to_load == 0:
+                break
+
+
 def extract_all_sequences_from_stripped_file(path_to_stripped_file, limit_number_of_seqs_to_load=float('inf')):
     """
     currently there are about 333-334 thousand sequences in the file
-    it takes about 25 seconds to load them all
     :param path_to_stripped_file:
     :return:
     """
-    seqs = []
+    return [series for _, series in iterate_sequences_in_stripped_file(path_to_stripped_file,
+                                                                       limit_number_of_seqs_to_load)]
+
+
+def get_path_to_oeis_file(directory_containing_oeis_file=''):
+    """
+    :return: the path to the stripped file in the directory if it was unpacked, otherwise the path to stripped.gz
+    """
+    path_to_stripped_file = os.path.join(directory_containing_oeis_file, STRIPPED_FILE_NAME)
+    if os.path.exists(path_to_stripped_file):
+        return path_to_stripped_file
+    return os.path.join(directory_containing_oeis_file, GZIPPED_STRIPPED_FILE_NAME)
+
+
+def get_path_to_oeis_cache(directory_containing_oeis_file=''):
+    return os.path.join(directory_containing_oeis_file, CACHE_FILE_NAME)
+
+
+def load_oeis_cache(directory_containing_oeis_file=''):
+    """
+    the cache is created from the stripped file the first time, and again whenever the stripped file is newer than it
+    or the cache was created in an older format
+
+    :param directory_containing_oeis_file:
+    :return: an OEISCache of all the sequences
+    """
+    path_to_oeis_file = get_path_to_oeis_file(directory_containing_oeis_file)
+    path_to_cache = get_path_to_oeis_cache(directory_containing_oeis_file)
+
+    if not os.path.exists(path_to_cache) \
+            or os.path.getmtime(path_to_cache) < os.path.getmtime(path_to_oeis_file) \
+            or not is_oeis_cache(path_to_cache):
+        create_oeis_cache(iterate_sequences_in_stripped_file(path_to_oeis_file), path_to_cache)
+    return OEISCache(path_to_cache)
+
+
+def iterate_sequences_in_oeis_cache(cache,
+                                    limit_number_of_seqs_to_load=float('inf'),
+                                    number_of_seqs_to_skip=0,
+                                    names_to_load=None):
+    """
+    the same as iterate_sequences_in_stripped_file, over the sequences in an OEISCache
+    """
+    if names_to_load is None:
+        indices = range(len(cache))
+    else:
+        indices = sorted(i for i in map(cache.get_index, names_to_load) if i is not None)
+
+    for i in indices:
+        if limit_number_of_seqs_to_load <= 0:
+            break
+
+        if number_of_seqs_to_skip > 0:
+            number_of_seqs_to_skip -= 1
+            continue
+
+        yield cache.get_name(i), cache[i]
+        limit_number_of_seqs_to_load -= 1
+
+
+def iterate_oeis_sequences(directory_containing_oeis_file='',
+                           limit_number_of_seqs_to_load=float('inf'),
+                           number_of_seqs_to_skip=0,
+                           names_to_load=None,
+                           use_cache=False):
+    """
+    :param use_cache: whether to load the sequences from the binary cache of the stripped file, see load_oeis_cache
+    :return: a generator over the A-numbers and the sequences, see iterate_sequences_in_stripped_file
+    """
+    if use_cache:
+        with load_oeis_cache(directory_containing_oeis_file) as cache:
+            yield from iterate_sequences_in_oeis_cache(cache,
+                                                       limit_number_of_seqs_to_load,
+                                                       number_of_seqs_to_skip,
+                                                       names_to_load)
+        return
 
-    with open(path_to_stripped_file, 'r') as f:
-        for line in f.readlines():
-            if not line_is_comment_line(line):
-                _, series = extract_sequence_from_line(line)
-                seqs.append(series)
+    yield from iterate_sequences_in_stripped_file(get_path_to_oeis_file(directory_containing_oeis_file),
+                                                  limit_number_of_seqs_to_load,
+                                                  number_of_seqs_to_skip,
+                                                  names_to_load)
 
-                limit_number_of_seqs_to_load -= 1
-                if limit_number_of_seqs_to_load == 0:
-                    break
 
-    return seqs
+def get_oeis_names(directory_containing_oeis_file='', use_cache=False):
+    """
+    :return: the A-numbers of all the sequences, in the order of the file. the sequences themselves are not parsed
+    """
+    if use_cache:
+        with load_oeis_cache(directory_containing_oeis_file) as cache:
+            return [cache.get_name(i) for i in range(len(cache))]
+
+    with open_oeis_file(get_path_to_oeis_file(directory_containing_oeis_file)) as f:
+        return [line[: line.find(' ')] for line in f if not line_is_comment_line(line)]
 
 
-def get_oeis_sequences(directory_containing_oeis_file='', limit_number_of_seqs_to_load=float('inf')):
-    path_to_stripped_file = os.path.join(directory_containing_oeis_file, 'stripped')
-    return extract_all_sequences_from_stripped_file(path_to_stripped_file, limit_number_of_seqs_to_load)
+def get_oeis_sequences(directory_containing_oeis_file='',
+                       limit_number_of_seqs_to_load=float('inf'),
+                       number_of_seqs_to_skip=0,
+                       names_to_load=None,
+                       use_cache=False):
+    return [series for _, series in iterate_oeis_sequences(directory_containing_oeis_file,
+                                                           limit_number_of_seqs_to_load,
+                                                           number_of_seqs_to_skip,
+                                                           names_to_load,
+                                                           use_cache)]
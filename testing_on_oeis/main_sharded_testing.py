@@ -0,0 +1,97 @@
+from testing_on_oeis.sharding import *
+from testing_on_oeis.testing_functions import print_scores
+from definitions import ROOT_DIR
+import argparse
+import sys
+
+
+def parse_error_margin(text):
+    # integral error margins are printed like those of t_prediction_function
+    error_margin = float(text)
+    return int(error_margin) if error_margin.is_integer() else error_margin
+
+
+if __name__ == "__main__":
+    """
+    instructions
+
+    run from the project folder, the shared directory is any directory that all the machines can access
+
+    1) once, split the corpus into shards
+    python -m testing_on_oeis.main_sharded_testing plan shared_directory --shards 16 --predictors SlopeAndBias
+
+    2) on each machine, as many times as needed. each run claims a shard and scores it, and prints nothing once all
+    the shards were claimed. --shard scores a given shard, which also resumes a shard whose machine was stopped
+    python -m testing_on_oeis.main_sharded_testing score shared_directory
+
+    3) at any point, print the scores of the shards that were scored so far
+    python -m testing_on_oeis.main_sharded_testing merge shared_directory
+    """
+    parser = argparse.ArgumentParser(description='score the predictors on the OEIS sequences across several machines')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    plan_parser = subparsers.add_parser('plan', help='split the corpus into shards and write the manifest')
+    plan_parser.add_argument('shared_directory')
+    plan_parser.add_argument('--shards', type=int, required=True)
+    plan_parser.add_argument('--predictors', nargs='+', required=True,
+                             help='names of predictor classes, such as SlopeAndBias, '
+                                  'ImprovedDivisionWithTruncation:3 or WindowedPredictor:20:Subtraction, '
+                                  'see predictor_registry.py')
+    plan_parser.add_argument('--error-margins', type=parse_error_margin, nargs='+',
+                             default=[5, 2, 1.1, 1.01, 1.001, 1.0000001, 1])
+
+    score_parser = subparsers.add_parser('score', help='score a single shard')
+    score_parser.add_argument('shared_directory')
+    score_parser.add_argument('--shard', type=int, default=None,
+                              help='the shard to score, by default the first shard that was not claimed yet')
+    score_parser.add_argument('--workers', type=int, default=None,
+                              help='the number of processes, all the cpus by default')
+    score_parser.add_argument('--chunk-size', type=int, default=1000)
+    score_parser.add_argument('--checkpoint-interval', type=float, default=60)
+
+    merge_parser = subparsers.add_parser('merge', help='print the scores of the shards')
+    merge_parser.add_argument('shared_directory')
+    merge_parser.add_argument('--shards', type=int, nargs='+', default=None,
+                              help='the shards to merge, all of them by default')
+
+    for subparser in [plan_parser, score_parser]:
+        subparser.add_argument('--oeis-directory', default=ROOT_DIR,
+                               help='the directory of the stripped file on this machine')
+        subparser.add_argument('--use-cache', action='store_true',
+                               help='load the sequences from the binary cache of the stripped file')
+
+    args = parser.parse_args()
+
+    if args.command == 'plan':
+        manifest = plan_shards(args.shared_directory,
+                               args.predictors,
+                               args.error_margins,
+                               args.shards,
+                               args.oeis_directory,
+                               args.use_cache)
+        for i, shard in enumerate(manifest['shards']):
+            print(f'shard {i}: A-numbers {shard["first"]} to {shard["last"] or "the end"}, '
+                  f'{shard["number of sequences"]} sequences')
+
+    elif args.command == 'score':
+        shard_index = score_shard(args.shared_directory,
+                                  args.shard,
+                                  args.oeis_directory,
+                                  args.workers,
+                                  args.chunk_size,
+                                  args.use_cache,
+                                  args.checkpoint_interval)
+        if shard_index is not None:
+            print(f'scored shard {shard_index}')
+
+    else:
+        manifest = load_manifest(args.shared_directory)
+        scores, incomplete_shards = merge_shards(args.shared_directory, args.shards)
+        for predictor_name, prediction_errors in zip(manifest['predictors'], scores):
+            print()
+            print_scores(create_predictor(predictor_name), prediction_errors, manifest['error margins'])
+
+        if len(incomplete_shards) > 0:
+            print()
+            print(f'shards that were not scored completely: {", ".join(map(str, incomplete_shards))}')
+            sys.exit(1)
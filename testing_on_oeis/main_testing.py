@@ -10,7 +10,7 @@ if __name__ == "__main__":
     https://oeis.org/wiki/Welcome#Compressed_Versions
     "There is a gzipped file containing just the sequences and their A-numbers"
 
-    2) extract the stripped file from it and place it in the project folder
+    2) place it in the project folder, there is no need to extract the stripped file from it
     
     3) run
     """
@@ -22,7 +22,21 @@ if __name__ == "__main__":
     limit_number_of_seqs_to_load = float('inf')
     # limit_number_of_seqs_to_load = 100
 
+    # None uses all the cpus, 1 scores the sequences serially
+    number_of_workers = None
+
+    # the sequences are parsed once into stripped.cache, and later runs load them from it
+    use_cache = True
+
+    # the outcome of each prediction is saved in this directory along with checkpoints, and a run that was stopped
+    # resumes from its last checkpoint. None to only print the scores
+    checkpoint_directory = None
+    # checkpoint_directory = os.path.join(ROOT_DIR, 'run')
+
     t_prediction_function(list_of_predictors,
                           list_of_error_margins,
                           directory_containing_oeis_file=ROOT_DIR,
-                          limit_number_of_seqs_to_load=limit_number_of_seqs_to_load)
+                          limit_number_of_seqs_to_load=limit_number_of_seqs_to_load,
+                          number_of_workers=number_of_workers,
+                          use_cache=use_cache,
+                          checkpoint_directory=checkpoint_directory)
@@ -0,0 +1,216 @@
+"""
+this file contains a compact binary cache of the parsed OEIS sequences, which is created once from the stripped file
+and then loaded with mmap, so loading it is almost instant, and processes that load it share its pages.
+
+the cache is a single file, all the numbers in it are int64 in the byte order of the machine that created it:
+- a header: MAGIC, then the number 1 (to detect a different byte order), the number of sequences, the number of terms,
+  the number of big terms and the length of the big terms text
+- names - the A-number of each sequence, without the 'A'
+- offsets - the terms of the i'th sequence are values[offsets[i]: offsets[i + 1]]
+- values - the terms of all the sequences one after the other, a term which does not fit in 64 bits is 0 here
+- big terms positions - the sorted positions in values of the terms which do not fit in 64 bits
+- big terms ends - the j'th big term is big terms text[big terms ends[j - 1]: big terms ends[j]], so each big term is
+  parsed only when its sequence is read
+- big terms text - those terms in decimal, one after the other
+"""
+from sequence_view import SequenceView
+import array
+import bisect
+import mmap
+import os
+
+MAGIC = b'OEISCAC2'
+HEADER_NUMBERS = 5
+HEADER_SIZE = len(MAGIC) + HEADER_NUMBERS * 8
+
+MINIMAL_INT64 = -2 ** 63
+MAXIMAL_INT64 = 2 ** 63 - 1
+
+
+def get_name_number(name):
+    """
+    :param name: an A-number, such as 'A000045'
+    :return: the number in it, such as 45
+    """
+    return int(name[1:])
+
+
+def get_name_from_number(number):
+    return 'A%06d' % number
+
+
+def get_oeis_cache_sections(names_and_sequences):
+    """
+    :param names_and_sequences: an iterable over A-numbers and sequences, as iterate_oeis_sequences returns,
+    sorted by the A-numbers
+    :return: the cache as a list of bytes-like sections, which are written one after the other
+    """
+    names = array.array('q')
+    offsets = array.array('q', [0])
+    values = array.array('q')
+    big_terms_positions = array.array('q')
+    big_terms_ends = array.array('q')
+    big_terms = []
+
+    for name, seq in names_and_sequences:
+        names.append(get_name_number(name))
+        if len(names) > 1 and names[-2] >= names[-1]:
+            raise ValueError(f'the sequences are not sorted by their A-numbers, {name} is out of order')
+        for term in seq:
+            if not MINIMAL_INT64 <= term <= MAXIMAL_INT64:
+                big_terms_positions.append(len(values))
+                big_terms.append(str(term))
+                big_terms_ends.append((big_terms_ends[-1] if len(big_terms_ends) > 0 else 0) + len(big_terms[-1]))
+                term = 0
+            values.append(term)
+        offsets.append(len(values))
+
+    big_terms_text = ''.join(big_terms).encode()
+    header = array.array('q', [1, len(names), len(values), len(big_terms_positions), len(big_terms_text)])
+    return [MAGIC, header, names, offsets, values, big_terms_positions, big_terms_ends, big_terms_text]
+
+
+def create_oeis_cache(names_and_sequences, path_to_cache):
+    """
+    :param names_and_sequences: see get_oeis_cache_sections
+    :param path_to_cache:
+    :return:
+    """
+    sections = get_oeis_cache_sections(names_and_sequences)
+
+    # the cache is written to a temporary file first, so a cache which was not written completely is never loaded
+    path_to_temporary_file = path_to_cache + '.tmp'
+    with open(path_to_temporary_file, 'wb') as f:
+        for section in sections:
+            f.write(section)
+    os.replace(path_to_temporary_file, path_to_cache)
+
+
+def is_oeis_cache(path_to_cache):
+    """
+    :return: whether the file is a cache in the current format
+    """
+    with open(path_to_cache, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class OEISCache:
+    """
+    the sequences in a cache file created by create_oeis_cache.
+    cache[i] is the i'th sequence, and iterating over the cache gives the A-numbers and the sequences,
+    like iterate_oeis_sequences
+    """
+
+    def __init__(self, path_to_cache):
+        self.path = path_to_cache
+        with open(path_to_cache, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.read_sections(memoryview(self.mmap), path_to_cache)
+
+    def read_sections(self, buffer, description):
+        """
+        :param buffer: a memoryview of the bytes of the cache, it is not copied
+        :param description: the name of the buffer in the errors
+        :return:
+        """
+        self.buffer = buffer
+        if bytes(buffer[: len(MAGIC)]) != MAGIC:
+            raise ValueError(f'{description} is not an OEIS cache')
+
+        header = buffer[len(MAGIC): HEADER_SIZE].cast('q').tolist()
+        if header[0] != 1:
+            raise ValueError(f'{description} was created on a machine with a different byte order')
+        number_of_sequences, number_of_values, number_of_big_terms, big_terms_text_length = header[1:]
+
+        position = HEADER_SIZE
+        sections = []
+        for section_length in [number_of_sequences,
+                               number_of_sequences + 1,
+                               number_of_values,
+                               number_of_big_terms,
+                               number_of_big_terms]:
+            sections.append(buffer[position: position + 8 * section_length].cast('q'))
+            position += 8 * section_length
+        self.names, self.offsets, self.values, self.big_terms_positions, self.big_terms_ends = sections
+        self.big_terms_text = buffer[position: position + big_terms_text_length]
+
+    def __len__(self):
+        return len(self.names)
+
+    def get_big_terms_range(self, i):
+        """
+        :return: the range of the indices of the big terms of the i'th sequence
+        """
+        return range(bisect.bisect_left(self.big_terms_positions, self.offsets[i]),
+                     bisect.bisect_left(self.big_terms_positions, self.offsets[i + 1]))
+
+    def get_big_term(self, j):
+        start = self.big_terms_ends[j - 1] if j > 0 else 0
+        return int(bytes(self.big_terms_text[start: self.big_terms_ends[j]]))
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError('OEIS cache index out of range')
+
+        start, end = self.offsets[i], self.offsets[i + 1]
+        seq = self.values[start: end].tolist()
+        for j in self.get_big_terms_range(i):
+            seq[self.big_terms_positions[j] - start] = self.get_big_term(j)
+        return seq
+
+    def get_view(self, i):
+        """
+        :return: the i'th sequence as a SequenceView of the values in the cache, which is not copied.
+        a sequence with terms that do not fit in 64 bits is returned as a list, like cache[i]
+        """
+        if not 0 <= i < len(self):
+            raise IndexError('OEIS cache index out of range')
+
+        if len(self.get_big_terms_range(i)) > 0:
+            return self[i]
+        return SequenceView(self.values, self.offsets[i], self.offsets[i + 1])
+
+    def get_name(self, i):
+        return get_name_from_number(self.names[i])
+
+    def get_index(self, name):
+        """
+        :param name: an A-number
+        :return: the index of the sequence with this A-number, or None if it is not in the cache
+        """
+        number = get_name_number(name)
+        i = bisect.bisect_left(self.names, number)
+        if i < len(self) and self.names[i] == number:
+            return i
+        return None
+
+    def get_sequence(self, name):
+        i = self.get_index(name)
+        if i is None:
+            raise KeyError(name)
+        return self[i]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.get_name(i), self[i]
+
+    def release_sections(self):
+        # the buffer can not be closed while there are views of it
+        for view in [self.names,
+                     self.offsets,
+                     self.values,
+                     self.big_terms_positions,
+                     self.big_terms_ends,
+                     self.big_terms_text,
+                     self.buffer]:
+            view.release()
+
+    def close(self):
+        self.release_sections()
+        self.mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
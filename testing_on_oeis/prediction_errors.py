@@ -0,0 +1,200 @@
+"""
+this file contains the scores of a predictor on the OEIS sequences.
+instead of checking each prediction against each error margin, the relative error of each prediction is recorded
+once, and the number of predictions that pass any error margin is counted afterwards by bisection
+"""
+import array
+import bisect
+import math
+
+# the outcome of a prediction, as the results file of a checkpointed run keeps it, is its relative error, or one of
+# these. relative errors are never nan and never below 1
+OUTCOME_SKIPPED = float('nan')
+OUTCOME_EXACT_NEGATIVE = -1.0
+OUTCOME_INEXACT_NEGATIVE = -2.0
+
+# the most floats the rounded ratio of a prediction is from the smallest error margin it is up to, see
+# get_relative_error
+MAXIMAL_NUMBER_OF_ROUNDING_STEPS = 8
+
+
+def is_up_to_error_margin(prediction, correct_element, error_margin):
+    """
+    the check every prediction is scored with. the bounds are rounded to floats, and are compared to the prediction
+    exactly
+    :param prediction:
+    :param correct_element:
+    :param error_margin: should be >= 1, an integral error margin is checked as an int, as t_prediction_function is
+    given them
+    :return: whether the prediction is up to the error margin
+    """
+    if isinstance(error_margin, float) and error_margin.is_integer():
+        error_margin = int(error_margin)
+    try:
+        return correct_element / error_margin <= prediction <= correct_element * error_margin
+    except OverflowError:
+        return False
+
+
+def get_relative_error(prediction, correct_element):
+    """
+    :param prediction:
+    :param correct_element:
+    :return: the smallest error margin e which the prediction is up to, see is_up_to_error_margin, so the prediction
+    is up to any error margin which is at least the returned error. it is the ratio between the prediction and the
+    correct element, the one which is at least 1, up to the rounding of the check.
+    inf if the prediction is not up to any error margin, and None if correct_element is negative, in which case the
+    prediction is only up to the error margin of 1, and only if it is exact. as the bounds are rounded, an exact
+    prediction of a big element fails the error margin of 1 if the element rounds to a float above it
+    """
+    if correct_element < 0:
+        return None
+
+    if correct_element == 0:
+        return 1.0 if prediction == 0 else float('inf')
+
+    # this also catches nan predictions and predictions of the opposite sign
+    if not prediction > 0:
+        return float('inf')
+
+    # the ratio itself is compared and not its log, since the log of a ratio such as 16 / 8 might round to just above
+    # the log of the error margin 2. the ratio of ints is rounded once, and the ratio of a Fraction is a Fraction
+    try:
+        if prediction > correct_element:
+            relative_error = float(prediction / correct_element)
+        else:
+            relative_error = float(correct_element / prediction)
+    except OverflowError:
+        return float('inf')
+    if relative_error == float('inf'):
+        return relative_error
+
+    # the rounded ratio can be a float or 2 away from the smallest error margin the check passes. for example the ratio
+    # of 200126180395998841 to 100063090197999413 rounds to 2.0, which the check fails, and the ratio of an inexact
+    # prediction of a big element, such as the float 3.647299637717079e+19 of 36472996377170786403, rounds to 1.
+    # the check of a float just below an integral error margin, which rounds its bounds, can pass where the check of
+    # the integral error margin fails, and the returned error is above the integral error margin then
+    if is_up_to_error_margin(prediction, correct_element, relative_error):
+        for _ in range(MAXIMAL_NUMBER_OF_ROUNDING_STEPS):
+            smaller_error = math.nextafter(relative_error, 0)
+            if smaller_error < 1 or not is_up_to_error_margin(prediction, correct_element, smaller_error):
+                break
+            relative_error = smaller_error
+        return relative_error
+
+    for _ in range(MAXIMAL_NUMBER_OF_ROUNDING_STEPS):
+        relative_error = math.nextafter(relative_error, math.inf)
+        if is_up_to_error_margin(prediction, correct_element, relative_error):
+            return relative_error
+    # the bounds of the check overflow
+    return float('inf')
+
+
+def get_outcome(prediction, correct_element):
+    """
+    :param prediction: the prediction, None if the predictor skipped the sequence
+    :param correct_element:
+    :return: a float that keeps everything PredictionErrors records about the prediction, see OUTCOME_SKIPPED
+    """
+    if prediction is None:
+        return OUTCOME_SKIPPED
+
+    relative_error = get_relative_error(prediction, correct_element)
+    if relative_error is not None:
+        return relative_error
+
+    if is_up_to_error_margin(prediction, correct_element, 1):
+        return OUTCOME_EXACT_NEGATIVE
+    return OUTCOME_INEXACT_NEGATIVE
+
+
+class PredictionErrors:
+    """
+    the relative errors of all the predictions of a predictor, in a compact array
+    """
+
+    def __init__(self):
+        self.relative_errors = array.array('d')
+        self.sorted_relative_errors = None
+
+        # the predictions of negative elements which were up to the error margin of 1, see get_relative_error
+        self.number_of_exact_negative_predictions = 0
+        self.number_of_negative_predictions = 0
+
+        self.count_skipped = 0
+
+    def __len__(self):
+        """
+        :return: the number of predictions made, without the skipped sequences
+        """
+        return len(self.relative_errors) + self.number_of_negative_predictions
+
+    def add_prediction(self, prediction, correct_element):
+        """
+        :param prediction: the prediction, None if the predictor skipped the sequence
+        :param correct_element:
+        :return:
+        """
+        self.add_outcome(get_outcome(prediction, correct_element))
+
+    def add_outcome(self, outcome):
+        """
+        :param outcome: as returned from get_outcome
+        :return:
+        """
+        self.sorted_relative_errors = None
+
+        if outcome != outcome:
+            self.count_skipped += 1
+        elif outcome >= 1:
+            self.relative_errors.append(outcome)
+        else:
+            self.number_of_negative_predictions += 1
+            if outcome == OUTCOME_EXACT_NEGATIVE:
+                self.number_of_exact_negative_predictions += 1
+
+    def get_counters(self):
+        """
+        :return: a dict with the number of predictions of each kind, which is enough to tell whether 2 PredictionErrors
+        recorded the same number of predictions
+        """
+        return {'predictions': len(self),
+                'skipped': self.count_skipped,
+                'negative predictions': self.number_of_negative_predictions,
+                'exact negative predictions': self.number_of_exact_negative_predictions}
+
+    def merge(self, other):
+        """
+        adds the predictions of other to self
+        :param other: PredictionErrors of the same predictor on other sequences
+        :return:
+        """
+        self.sorted_relative_errors = None
+        self.relative_errors.extend(other.relative_errors)
+        self.number_of_exact_negative_predictions += other.number_of_exact_negative_predictions
+        self.number_of_negative_predictions += other.number_of_negative_predictions
+        self.count_skipped += other.count_skipped
+
+    def count_passed(self, error_margin):
+        """
+        :param error_margin: should be >= 1
+        :return: the number of predictions that are up to the error margin
+        """
+        if self.sorted_relative_errors is None:
+            self.sorted_relative_errors = sorted(self.relative_errors)
+
+        passed = bisect.bisect_right(self.sorted_relative_errors, error_margin)
+        if error_margin == 1:
+            passed += self.number_of_exact_negative_predictions
+        return passed
+
+    def get_error_margins_map(self, list_of_error_margins):
+        """
+        :param list_of_error_margins:
+        :return: a map from each error margin to the number of predictions that passed and failed it
+        """
+        error_margins_map = {}
+        for e in list_of_error_margins:
+            passed = self.count_passed(e)
+            error_margins_map[e] = {'passed': passed, 'failed': len(self) - passed}
+        return error_margins_map
@@ -0,0 +1,203 @@
+"""
+this file contains the scoring of the OEIS sequences split across several machines, which only share a directory:
+- plan_shards splits the corpus into shards, each is a range of A-numbers with about the same number of sequences,
+  and writes them to the manifest in the shared directory along with the predictors and the error margins
+- score_shard scores the sequences of one shard, as a checkpointed run of t_prediction_function in a directory of the
+  shard, see checkpoints.py. a machine that was stopped resumes its shard by scoring it again.
+  a machine that is not given a shard claims the first shard that no machine claimed yet
+- merge_shards combines the results of any set of shards into the scores of each predictor
+
+    shared directory/
+        manifest.json
+        shard_0/claim, checkpoint.json, results
+        shard_1/...
+"""
+from testing_on_oeis.checkpoints import RESULTS_FILE_NAME, load_checkpoint, load_scores
+from testing_on_oeis.load_oeis_series_helper import get_oeis_names
+from testing_on_oeis.oeis_cache import get_name_from_number, get_name_number
+from testing_on_oeis.prediction_errors import PredictionErrors
+from testing_on_oeis.testing_functions import merge_scores, score_predictors_with_checkpoints
+from predictor_registry import create_predictor, parse_predictor_name
+import json
+import os
+import socket
+
+MANIFEST_FILE_NAME = 'manifest.json'
+CLAIM_FILE_NAME = 'claim'
+
+
+def split_names_to_shards(names, number_of_shards):
+    """
+    :param names: the A-numbers of the corpus
+    :param number_of_shards:
+    :return: the shards, each is a dict with the first and the last A-number of the shard, without the 'A', and the
+    number of sequences in it. the shards cover all the A-numbers from 1 on, the last one has no end
+    """
+    name_numbers = sorted(map(get_name_number, names))
+    number_of_shards = max(1, min(number_of_shards, len(name_numbers)))
+
+    shards = []
+    first = 1
+    for i in range(number_of_shards):
+        end = len(name_numbers) * (i + 1) // number_of_shards
+        last = name_numbers[end - 1] if i < number_of_shards - 1 else None
+        number_of_sequences = end - len(name_numbers) * i // number_of_shards
+        shards.append({'first': first, 'last': last, 'number of sequences': number_of_sequences})
+        if last is not None:
+            first = last + 1
+    return shards
+
+
+def get_path_to_manifest(shared_directory):
+    return os.path.join(shared_directory, MANIFEST_FILE_NAME)
+
+
+def get_shard_directory(shared_directory, shard_index):
+    return os.path.join(shared_directory, f'shard_{shard_index}')
+
+
+def plan_shards(shared_directory,
+                predictor_names,
+                list_of_error_margins,
+                number_of_shards,
+                directory_containing_oeis_file='',
+                use_cache=False):
+    """
+    writes the manifest of a sharded run to the shared directory
+    :param shared_directory:
+    :param predictor_names: see parse_predictor_name in predictor_registry.py
+    :param list_of_error_margins:
+    :param number_of_shards:
+    :param directory_containing_oeis_file:
+    :param use_cache:
+    :return: the manifest
+    """
+    if os.path.exists(get_path_to_manifest(shared_directory)):
+        raise ValueError(f'{shared_directory} already has a manifest')
+
+    # fail before the shards are planned, and not on each machine
+    for predictor_name in predictor_names:
+        parse_predictor_name(predictor_name)
+
+    manifest = {'predictors': list(predictor_names),
+                'error margins': list(list_of_error_margins),
+                'shards': split_names_to_shards(get_oeis_names(directory_containing_oeis_file, use_cache),
+                                                number_of_shards)}
+
+    os.makedirs(shared_directory, exist_ok=True)
+    temporary_path = get_path_to_manifest(shared_directory) + '.tmp'
+    with open(temporary_path, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(temporary_path, get_path_to_manifest(shared_directory))
+    return manifest
+
+
+def load_manifest(shared_directory):
+    with open(get_path_to_manifest(shared_directory), 'r') as f:
+        return json.load(f)
+
+
+def claim_shard(shared_directory, number_of_shards):
+    """
+    :return: the index of the first shard that was not claimed yet, which is now claimed. None if all of them are.
+    the claim file of a shard is created only if it does not exist, which is atomic even on most network file systems,
+    so 2 machines never claim the same shard
+    """
+    for shard_index in range(number_of_shards):
+        shard_directory = get_shard_directory(shared_directory, shard_index)
+        os.makedirs(shard_directory, exist_ok=True)
+        try:
+            fd = os.open(os.path.join(shard_directory, CLAIM_FILE_NAME), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            continue
+
+        with os.fdopen(fd, 'w') as f:
+            f.write(f'{socket.gethostname()} {os.getpid()}\n')
+        return shard_index
+    return None
+
+
+def get_names_of_shard(shard, name_numbers):
+    """
+    :param shard: one of the shards of the manifest
+    :param name_numbers: the A-numbers of the corpus, without the 'A'
+    :return: the set of the A-numbers of the corpus that are in the shard
+    """
+    return {get_name_from_number(number) for number in name_numbers
+            if shard['first'] <= number and (shard['last'] is None or number <= shard['last'])}
+
+
+def score_shard(shared_directory,
+                shard_index=None,
+                directory_containing_oeis_file='',
+                number_of_workers=1,
+                chunk_size=1000,
+                use_cache=False,
+                checkpoint_interval=60,
+                use_shared_memory=True):
+    """
+    scores the sequences of a shard with the predictors of the manifest, and keeps the outcomes in the directory of
+    the shard. scoring a shard again resumes it from its last checkpoint
+    :param shared_directory:
+    :param shard_index: None to claim the first shard that was not claimed yet
+    :param directory_containing_oeis_file:
+    :param number_of_workers: see t_prediction_function
+    :param chunk_size:
+    :param use_cache:
+    :param checkpoint_interval:
+    :param use_shared_memory:
+    :return: the index of the shard that was scored, None if all the shards were claimed
+    """
+    manifest = load_manifest(shared_directory)
+    if shard_index is None:
+        shard_index = claim_shard(shared_directory, len(manifest['shards']))
+        if shard_index is None:
+            return None
+
+    name_numbers = map(get_name_number, get_oeis_names(directory_containing_oeis_file, use_cache))
+    names_of_shard = get_names_of_shard(manifest['shards'][shard_index], name_numbers)
+
+    score_predictors_with_checkpoints([create_predictor(predictor_name) for predictor_name in manifest['predictors']],
+                                      get_shard_directory(shared_directory, shard_index),
+                                      checkpoint_interval,
+                                      directory_containing_oeis_file,
+                                      float('inf'),
+                                      number_of_workers,
+                                      chunk_size,
+                                      0,
+                                      names_of_shard,
+                                      use_cache,
+                                      use_shared_memory)
+    return shard_index
+
+
+def merge_shards(shared_directory, shard_indices=None):
+    """
+    :param shared_directory:
+    :param shard_indices: the shards to merge, None for all of them
+    :return: a list with the PredictionErrors of each predictor on the sequences scored in those shards so far, and
+    the indices of the shards among them that were not scored completely
+    """
+    manifest = load_manifest(shared_directory)
+    if shard_indices is None:
+        shard_indices = range(len(manifest['shards']))
+    predictor_names = [create_predictor(predictor_name).get_name() for predictor_name in manifest['predictors']]
+
+    scores = [PredictionErrors() for _ in predictor_names]
+    incomplete_shards = []
+    for shard_index in shard_indices:
+        shard_directory = get_shard_directory(shared_directory, shard_index)
+        checkpoint = load_checkpoint(shard_directory) if os.path.isdir(shard_directory) else None
+        if checkpoint is None:
+            incomplete_shards.append(shard_index)
+            continue
+
+        if checkpoint['predictors'] != predictor_names:
+            raise ValueError(f'{shard_directory} was scored with other predictors than those of the manifest')
+        if checkpoint['number of sequences scored'] < manifest['shards'][shard_index]['number of sequences']:
+            incomplete_shards.append(shard_index)
+
+        merge_scores(scores, load_scores(os.path.join(shard_directory, RESULTS_FILE_NAME),
+                                         len(predictor_names),
+                                         checkpoint['results size']))
+    return scores, incomplete_shards
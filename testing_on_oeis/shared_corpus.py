@@ -0,0 +1,59 @@
+"""
+this file contains a corpus of OEIS sequences which is placed once in shared memory, in the layout of the OEIS cache
+(see oeis_cache.py), so worker processes attach to it by its name instead of receiving the sequences pickled.
+the workers read the sequences as SequenceViews of the values in the shared memory, which predict takes as they are,
+so the memory in use does not grow with the number of workers
+"""
+from testing_on_oeis.oeis_cache import OEISCache, get_oeis_cache_sections
+from multiprocessing import shared_memory
+
+
+class SharedOEISCorpus(OEISCache):
+    """
+    an OEISCache whose bytes are in a block of shared memory instead of a file
+    """
+
+    def __init__(self, name, is_owner=False):
+        """
+        :param name: the name of the shared memory block
+        :param is_owner: whether closing the corpus also frees the shared memory, which only the process that created
+        it should do
+        """
+        self.shared_memory = shared_memory.SharedMemory(name=name)
+        self.is_owner = is_owner
+        self.read_sections(self.shared_memory.buf, f'the shared memory {name}')
+
+    @property
+    def name(self):
+        return self.shared_memory.name
+
+    def close(self):
+        self.release_sections()
+        self.shared_memory.close()
+        if self.is_owner:
+            self.shared_memory.unlink()
+
+
+def create_shared_corpus(names_and_sequences):
+    """
+    :param names_and_sequences: an iterable over A-numbers and sequences, as iterate_oeis_sequences returns,
+    sorted by the A-numbers
+    :return: a SharedOEISCorpus of the sequences, which frees the shared memory when it is closed
+    """
+    sections = get_oeis_cache_sections(names_and_sequences)
+    sizes = [memoryview(section).nbytes for section in sections]
+
+    created_memory = shared_memory.SharedMemory(create=True, size=sum(sizes))
+    try:
+        position = 0
+        for section, size in zip(sections, sizes):
+            created_memory.buf[position: position + size] = memoryview(section).cast('B')
+            position += size
+        # the sections are freed before the corpus is read, so the sequences are in memory only once
+        del sections
+        return SharedOEISCorpus(created_memory.name, is_owner=True)
+    except BaseException:
+        created_memory.unlink()
+        raise
+    finally:
+        created_memory.close()
@@ -1,57 +1,564 @@
-from testing_on_oeis.load_oeis_series_helper import get_oeis_sequences
+from testing_on_oeis.load_oeis_series_helper import iterate_oeis_sequences, load_oeis_cache
+from testing_on_oeis.oeis_cache import OEISCache
+from testing_on_oeis.prediction_errors import OUTCOME_SKIPPED, PredictionErrors, get_outcome
+from testing_on_oeis.checkpoints import RESULTS_FILE_NAME, ResultsFile, create_checkpoint, get_hash_of_names, \
+    resume_from_checkpoint, save_checkpoint
+from testing_on_oeis.oeis_cache import get_name_number
+from testing_on_oeis.shared_corpus import SharedOEISCorpus, create_shared_corpus
+from abstract_prediction_methods import ReductionTable, SharedRows
+from sequence_view import SequenceView, to_list
 from prettytable import PrettyTable
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import array
+import collections
+import contextlib
+import itertools
+import os
+import time
 
 
-def test_if_prediction_is_correct(predictor, lis, list_of_error_margins):
+def predict_last_element(predictor, lis, shared_rows=None):
     """
+    :param predictor:
     :param lis:
-    :param list_of_error_margins: each error margin should be >= 1
-    :return:
-    if the predictor can not be used to predict the next element in the list it returns None
+    :param shared_rows: optional SharedRows of lis[: -1], shared by all the predictors tested on lis
+    :return: the prediction of the last element of lis from the rest of it, None if the predictor can not predict it
+    """
+    if shared_rows is None:
+        # the predictor converts only the sublist it predicts to a list
+        return predictor.predict(SequenceView(lis, 0, len(lis) - 1))
+    return predictor.predict(shared_rows.lis, shared_rows)
+
+
+def score_predictors_on_chunk(list_of_predictors, sequences):
+    """
+    visits each sequence once and tests all the predictors on it, the rows they have in common, such as the ratios of
+    the sequence, are computed once and shared between them.
+    this is also the work of a single worker process in the parallel mode of t_prediction_function
+
+    :param list_of_predictors:
+    :param sequences: lists, or SequenceViews of a cache or of a shared corpus
+    :return: a list with the PredictionErrors of each predictor
+    """
+    scores = [PredictionErrors() for _ in list_of_predictors]
 
-    otherwise,
-    for each error margin in the list given,
-    check if the predictions of the last element are up to to the error margin
-    it returns a list of booleans indicating whether this is the case
+    for seq in sequences:
+        # a view of a shared corpus is copied once for all the predictors, which is faster than slicing the view
+        # for each of them, and only one sequence is copied at a time
+        seq = to_list(seq)
+        if len(seq) == 0:
+            # there is no last element to predict, predict skips the empty list
+            for prediction_errors in scores:
+                prediction_errors.add_prediction(None, None)
+            continue
+        shared_rows = SharedRows(seq[: -1])
+        last_element = seq[-1]
+        for predictor, prediction_errors in zip(list_of_predictors, scores):
+            prediction_errors.add_prediction(predict_last_element(predictor, seq, shared_rows), last_element)
+
+    return scores
+
+
+# pushing an element to a stream costs about as much as reducing this many elements as part of a whole list
+RELATIVE_COST_OF_PUSHING_AN_ELEMENT = 8
+
+
+def get_outcomes_of_chunk(list_of_predictors, named_sequences):
+    """
+    the same as score_predictors_on_chunk, but the outcome of each prediction is kept, see get_outcome
+    :param list_of_predictors:
+    :param named_sequences: a list of the A-number and the sequence of each sequence
+    :return: the A-numbers without the 'A', and an array with the outcomes of all the predictors on the first sequence,
+    then on the second and so on
     """
-    res = predictor.predict(lis[: -1])
-    if res is None:
+    name_numbers = []
+    outcomes = array.array('d')
+
+    for name, seq in named_sequences:
+        name_numbers.append(get_name_number(name))
+        seq = to_list(seq)
+        if len(seq) == 0:
+            outcomes.extend([OUTCOME_SKIPPED] * len(list_of_predictors))
+            continue
+        shared_rows = SharedRows(seq[: -1])
+        last_element = seq[-1]
+        for predictor in list_of_predictors:
+            outcomes.append(get_outcome(predict_last_element(predictor, seq, shared_rows), last_element))
+
+    return name_numbers, outcomes
+
+
+def get_length_of_common_prefix(lis, other_lis, maximal_length):
+    """
+    :return: the length of the longest common prefix of lis[: maximal_length] and other_lis[: maximal_length]
+    """
+    length = 0
+    maximal_length = min(maximal_length, len(lis), len(other_lis))
+    while length < maximal_length and lis[length] == other_lis[length]:
+        length += 1
+    return length
+
+
+def create_prefix_stream(predictor):
+    """
+    :return: a stream of the predictor if it extends a reduction table one element at a time, None otherwise.
+    the stream of the rest of the predictors keeps the whole list and predicts it from scratch, so it shares nothing.
+    the streams of windowed predictors slide their tables, and a window is cheap to predict from scratch anyway
+    """
+    stream = predictor.stream()
+    if not isinstance(getattr(stream, 'table', None), ReductionTable):
         return None
+    return stream
+
+
+def copy_streams(streams):
+    return [None if stream is None else stream.copy() for stream in streams]
+
+
+def push_to_streams(streams, element):
+    """
+    pushes element to each of the streams. a stream that raises, such as a division stream whose ratio is too big for a
+    float, is replaced with None, and its predictions are made by predict instead
+    """
+    for i, stream in enumerate(streams):
+        if stream is None:
+            continue
+        try:
+            stream.push(element)
+        except ArithmeticError:
+            streams[i] = None
+
+
+def score_predictors_on_sorted_chunk(list_of_predictors, sequences):
+    """
+    the same as score_predictors_on_chunk, for sequences that are sorted, so sequences that share a prefix are next to
+    each other.
+    the sorted sequences are the leaves of a trie of their prefixes in depth first order, and the trie is walked with a
+    stream of each predictor. each edge of the trie pushes one element to the streams, which extends their reduction
+    tables by one diagonal, so a prefix which is shared by several sequences is reduced once.
+    the streams are copied at the depths where the walk leaves the shared part of the trie, and the walk backs out to
+    those copies when it returns up the trie.
+
+    pushing an element costs more than reducing it as part of a whole list, so only the prefixes that are shared by
+    at least RELATIVE_COST_OF_PUSHING_AN_ELEMENT sequences are pushed. the rest of each prefix is pushed only if it is
+    short enough, otherwise the sequence is predicted from scratch.
+
+    the predictions of the streams are the same as those of predict except for the rounding of the predictors with
+    kernels. the predictors that can not extend a reduction table one element at a time are scored as in
+    score_predictors_on_chunk
+
+    :param list_of_predictors:
+    :param sequences: sorted sequences
+    :return: a list with the PredictionErrors of each predictor
+    """
+    scores = [PredictionErrors() for _ in list_of_predictors]
+
+    # the length of the common prefix of each sequence and the one after it
+    common_lengths = [get_length_of_common_prefix(seq, next_seq, len(seq))
+                      for seq, next_seq in zip(sequences, sequences[1:])]
+
+    # the streams of the prefixes of the walk that later sequences might branch off from, as (depth, streams)
+    checkpoints = [(0, [create_prefix_stream(predictor) for predictor in list_of_predictors])]
+    streams = copy_streams(checkpoints[0][1])
+    depth = 0
+
+    for i, seq in enumerate(sequences):
+        if len(seq) == 0:
+            # the empty sequences are sorted first, and there is no last element to predict
+            for prediction_errors in scores:
+                prediction_errors.add_prediction(None, None)
+            continue
+
+        # the prefix to predict the last element from
+        prefix_length = len(seq) - 1
+
+        if i > 0 and min(common_lengths[i - 1], prefix_length) < depth:
+            # back out to the deepest copy of the streams on the common prefix
+            while checkpoints[-1][0] > min(common_lengths[i - 1], prefix_length):
+                checkpoints.pop()
+            depth, checkpoint_streams = checkpoints[-1]
+            streams = copy_streams(checkpoint_streams)
+
+        # the prefix this sequence shares with the sequences after it, up to the one that makes them enough
+        following_common_lengths = common_lengths[i: i + RELATIVE_COST_OF_PUSHING_AN_ELEMENT - 1]
+        length_of_shared_prefix = 0
+        if len(following_common_lengths) == RELATIVE_COST_OF_PUSHING_AN_ELEMENT - 1:
+            length_of_shared_prefix = min(following_common_lengths + [prefix_length])
+
+        while depth < length_of_shared_prefix:
+            push_to_streams(streams, seq[depth])
+            depth += 1
+
+        # the rest of the prefix belongs to fewer sequences, so it is only pushed if that is cheaper than predicting
+        # the prefix from scratch
+        if depth < prefix_length and (prefix_length - depth) * RELATIVE_COST_OF_PUSHING_AN_ELEMENT <= prefix_length:
+            if depth > checkpoints[-1][0]:
+                checkpoints.append((depth, copy_streams(streams)))
+            while depth < prefix_length:
+                push_to_streams(streams, seq[depth])
+                depth += 1
+
+        shared_rows = SharedRows(seq[: -1])
+        for j, (predictor, prediction_errors) in enumerate(zip(list_of_predictors, scores)):
+            prediction = None
+            if depth == prefix_length and streams[j] is not None:
+                try:
+                    prediction = streams[j].peek_next()
+                except ArithmeticError:
+                    streams[j] = None
+            if depth < prefix_length or streams[j] is None:
+                prediction = predict_last_element(predictor, seq, shared_rows)
+            prediction_errors.add_prediction(prediction, seq[-1])
+
+    return scores
+
+
+def score_predictors_on_cache_chunk(list_of_predictors, cache_chunk):
+    """
+    the same as score_predictors_on_chunk, but the chunk is the path to an OEIS cache and a range of indices in it,
+    so the worker reads the sequences from the pages of the cache that all the workers share, instead of unpickling
+    them
+    """
+    path_to_cache, start, end = cache_chunk
+    with OEISCache(path_to_cache) as cache:
+        # the views are gone by the time the cache is closed
+        return score_predictors_on_chunk(list_of_predictors, [cache.get_view(i) for i in range(start, end)])
+
+
+def score_predictors_on_shared_corpus_chunk(list_of_predictors, shared_corpus_chunk):
+    """
+    the same as score_predictors_on_chunk, but the chunk is the name of a SharedOEISCorpus and a range of indices in
+    it, so the worker predicts from views of the shared memory instead of unpickling the sequences
+    """
+    name, start, end = shared_corpus_chunk
+    with SharedOEISCorpus(name) as corpus:
+        return score_predictors_on_chunk(list_of_predictors, [corpus.get_view(i) for i in range(start, end)])
+
+
+def get_outcomes_of_shared_corpus_chunk(list_of_predictors, shared_corpus_chunk):
+    """
+    the same as get_outcomes_of_chunk, for a chunk of a SharedOEISCorpus, see score_predictors_on_shared_corpus_chunk
+    """
+    name, start, end = shared_corpus_chunk
+    with SharedOEISCorpus(name) as corpus:
+        return get_outcomes_of_chunk(list_of_predictors,
+                                     [(corpus.get_name(i), corpus.get_view(i)) for i in range(start, end)])
+
+
+def merge_scores(scores, other_scores):
+    """
+    adds the PredictionErrors in other_scores to those in scores, predictor by predictor
+    :param scores:
+    :param other_scores:
+    :return: scores
+    """
+    for prediction_errors, other_prediction_errors in zip(scores, other_scores):
+        prediction_errors.merge(other_prediction_errors)
+    return scores
 
-    to_return = []
-    for error_margin in list_of_error_margins:
-        to_return.append(lis[-1] / error_margin <= res <= lis[-1] * error_margin)
-    return to_return
+
+def split_to_chunks(sequences, chunk_size):
+    """
+    :param sequences: any iterable, it is consumed lazily
+    :param chunk_size:
+    :return: a generator over lists of chunk_size consecutive sequences
+    """
+    sequences = iter(sequences)
+    while True:
+        chunk = list(itertools.islice(sequences, chunk_size))
+        if len(chunk) == 0:
+            return
+        yield chunk
+
+
+def split_cache_to_chunks(path_to_cache, start, end, chunk_size):
+    """
+    :param path_to_cache: the path to an OEIS cache, or the name of a SharedOEISCorpus
+    :return: chunks for score_predictors_on_cache_chunk (or score_predictors_on_shared_corpus_chunk) of the sequences
+    in range(start, end) in the cache
+    """
+    return [(path_to_cache, i, min(i + chunk_size, end)) for i in range(start, end, chunk_size)]
+
+
+def score_predictors_serially(list_of_predictors, chunks, score_chunk=score_predictors_on_chunk):
+    """
+    :param list_of_predictors:
+    :param chunks: an iterable over chunks of sequences
+    :param score_chunk: score_predictors_on_chunk, or score_predictors_on_cache_chunk if the chunks are cache chunks
+    :return: a list with the PredictionErrors of each predictor
+    """
+    scores = [PredictionErrors() for _ in list_of_predictors]
+    for chunk in chunks:
+        merge_scores(scores, score_chunk(list_of_predictors, chunk))
+    return scores
+
+
+def score_predictors_in_parallel(list_of_predictors, chunks, number_of_workers, score_chunk=score_predictors_on_chunk):
+    """
+    shards the chunks across a process pool, each worker scores all the predictors on its chunk.
+    only a few chunks per worker are loaded at a time, so the sequences are never all in memory
+
+    :return: a list with the PredictionErrors of each predictor
+    """
+    scores = [PredictionErrors() for _ in list_of_predictors]
+    with ProcessPoolExecutor(max_workers=number_of_workers) as executor:
+        maximal_number_of_pending_chunks = 2 * (number_of_workers or os.cpu_count())
+        pending = set()
+        for chunk in chunks:
+            if len(pending) >= maximal_number_of_pending_chunks:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    merge_scores(scores, future.result())
+            pending.add(executor.submit(score_chunk, list_of_predictors, chunk))
+
+        for future in pending:
+            merge_scores(scores, future.result())
+    return scores
+
+
+def get_outcomes_of_chunks(list_of_predictors, chunks, number_of_workers, get_outcomes=get_outcomes_of_chunk):
+    """
+    :param list_of_predictors:
+    :param chunks: an iterable over chunks of named sequences
+    :param number_of_workers: see t_prediction_function
+    :param get_outcomes: get_outcomes_of_chunk, or get_outcomes_of_shared_corpus_chunk if the chunks are chunks of a
+    SharedOEISCorpus
+    :return: yields the result of get_outcomes on each chunk, in the order of the chunks
+    """
+    if number_of_workers == 1:
+        for chunk in chunks:
+            yield get_outcomes(list_of_predictors, chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=number_of_workers) as executor:
+        maximal_number_of_pending_chunks = 2 * (number_of_workers or os.cpu_count())
+        # in the order the chunks were submitted, so the results are yielded in order even though the workers finish
+        # out of order
+        pending = collections.deque()
+        for chunk in chunks:
+            if len(pending) >= maximal_number_of_pending_chunks:
+                yield pending.popleft().result()
+            pending.append(executor.submit(get_outcomes, list_of_predictors, chunk))
+
+        while len(pending) > 0:
+            yield pending.popleft().result()
+
+
+def score_predictors_on_oeis_sequences(list_of_predictors,
+                                       directory_containing_oeis_file,
+                                       limit_number_of_seqs_to_load,
+                                       number_of_workers,
+                                       chunk_size,
+                                       number_of_seqs_to_skip,
+                                       names_to_load,
+                                       use_cache,
+                                       share_prefixes,
+                                       use_shared_memory):
+    """
+    see t_prediction_function
+    :return: a list with the PredictionErrors of each predictor
+    """
+    score_chunk = score_predictors_on_chunk
+    if share_prefixes:
+        sequences = sorted(series for _, series in iterate_oeis_sequences(directory_containing_oeis_file,
+                                                                          limit_number_of_seqs_to_load,
+                                                                          number_of_seqs_to_skip,
+                                                                          names_to_load,
+                                                                          use_cache))
+        chunks = split_to_chunks(sequences, chunk_size)
+        score_chunk = score_predictors_on_sorted_chunk
+    elif use_cache and names_to_load is None and number_of_workers != 1:
+        # the workers read their chunks from the cache themselves
+        with load_oeis_cache(directory_containing_oeis_file) as cache:
+            path_to_cache, number_of_seqs = cache.path, len(cache)
+        end = min(number_of_seqs, number_of_seqs_to_skip + limit_number_of_seqs_to_load)
+        chunks = split_cache_to_chunks(path_to_cache, number_of_seqs_to_skip, end, chunk_size)
+        score_chunk = score_predictors_on_cache_chunk
+    elif use_shared_memory and number_of_workers != 1:
+        # the corpus is parsed once into shared memory, and the workers read their chunks from it
+        with create_shared_corpus(iterate_oeis_sequences(directory_containing_oeis_file,
+                                                         limit_number_of_seqs_to_load,
+                                                         number_of_seqs_to_skip,
+                                                         names_to_load,
+                                                         use_cache)) as shared_corpus:
+            return score_predictors_in_parallel(list_of_predictors,
+                                                split_cache_to_chunks(shared_corpus.name,
+                                                                      0,
+                                                                      len(shared_corpus),
+                                                                      chunk_size),
+                                                number_of_workers,
+                                                score_predictors_on_shared_corpus_chunk)
+    else:
+        sequences = (series for _, series in iterate_oeis_sequences(directory_containing_oeis_file,
+                                                                    limit_number_of_seqs_to_load,
+                                                                    number_of_seqs_to_skip,
+                                                                    names_to_load,
+                                                                    use_cache))
+        chunks = split_to_chunks(sequences, chunk_size)
+
+    if number_of_workers == 1:
+        return score_predictors_serially(list_of_predictors, chunks, score_chunk)
+    return score_predictors_in_parallel(list_of_predictors, chunks, number_of_workers, score_chunk)
+
+
+def score_predictors_with_checkpoints(list_of_predictors,
+                                      checkpoint_directory,
+                                      checkpoint_interval,
+                                      directory_containing_oeis_file,
+                                      limit_number_of_seqs_to_load,
+                                      number_of_workers,
+                                      chunk_size,
+                                      number_of_seqs_to_skip,
+                                      names_to_load,
+                                      use_cache,
+                                      use_shared_memory):
+    """
+    scores the sequences in the order of the corpus, appends the outcome of each prediction to the results file in
+    checkpoint_directory and saves a checkpoint every checkpoint_interval seconds, see checkpoints.py.
+    if the directory has a checkpoint of the same run, the run resumes from it
+
+    :return: a list with the PredictionErrors of each predictor on all the sequences of the run
+    """
+    os.makedirs(checkpoint_directory, exist_ok=True)
+    # the directory of the OEIS file is not one of them, so the run can resume on another machine
+    corpus_arguments = {'limit number of seqs to load': None if limit_number_of_seqs_to_load == float('inf')
+                        else limit_number_of_seqs_to_load,
+                        'number of seqs to skip': number_of_seqs_to_skip,
+                        'names to load': get_hash_of_names(names_to_load)}
+    number_of_seqs_scored, results_size, scores = resume_from_checkpoint(checkpoint_directory,
+                                                                         list_of_predictors,
+                                                                         corpus_arguments)
+
+    named_sequences = iterate_oeis_sequences(directory_containing_oeis_file,
+                                             limit_number_of_seqs_to_load - number_of_seqs_scored,
+                                             number_of_seqs_to_skip + number_of_seqs_scored,
+                                             names_to_load,
+                                             use_cache)
+    with contextlib.ExitStack() as stack:
+        if use_shared_memory and number_of_workers != 1:
+            # the sequences left to score are parsed once into shared memory, see score_predictors_on_oeis_sequences
+            shared_corpus = stack.enter_context(create_shared_corpus(named_sequences))
+            outcomes_of_chunks = get_outcomes_of_chunks(list_of_predictors,
+                                                        split_cache_to_chunks(shared_corpus.name,
+                                                                              0,
+                                                                              len(shared_corpus),
+                                                                              chunk_size),
+                                                        number_of_workers,
+                                                        get_outcomes_of_shared_corpus_chunk)
+        else:
+            outcomes_of_chunks = get_outcomes_of_chunks(list_of_predictors,
+                                                        split_to_chunks(named_sequences, chunk_size),
+                                                        number_of_workers)
+        results_file = stack.enter_context(ResultsFile(os.path.join(checkpoint_directory, RESULTS_FILE_NAME),
+                                                       len(list_of_predictors),
+                                                       results_size))
+        time_of_last_checkpoint = time.monotonic()
+        for name_numbers, outcomes in outcomes_of_chunks:
+            results_file.append(name_numbers, outcomes)
+            for i, outcome in enumerate(outcomes):
+                scores[i % len(list_of_predictors)].add_outcome(outcome)
+            number_of_seqs_scored += len(name_numbers)
+
+            if time.monotonic() - time_of_last_checkpoint >= checkpoint_interval:
+                save_checkpoint(checkpoint_directory, create_checkpoint(list_of_predictors,
+                                                                        corpus_arguments,
+                                                                        number_of_seqs_scored,
+                                                                        results_file.sync(),
+                                                                        scores))
+                time_of_last_checkpoint = time.monotonic()
+
+        save_checkpoint(checkpoint_directory, create_checkpoint(list_of_predictors,
+                                                                corpus_arguments,
+                                                                number_of_seqs_scored,
+                                                                results_file.sync(),
+                                                                scores))
+    return scores
+
+
+def print_scores(predictor, prediction_errors, list_of_error_margins):
+    """
+    :param predictor:
+    :param prediction_errors: the PredictionErrors of the predictor
+    :param list_of_error_margins: any error margins, they are counted from the errors recorded in prediction_errors
+    :return:
+    """
+    error_margins_map = prediction_errors.get_error_margins_map(list_of_error_margins)
+
+    print(predictor.get_name())
+    # print the results in a pretty table
+    print(f'skipped {prediction_errors.count_skipped}')
+    column_names = ['error margin', 'passed', 'failed']
+    results_table = PrettyTable(column_names)
+    for e in list_of_error_margins:
+        results_table.add_row([e, error_margins_map[e]["passed"], error_margins_map[e]["failed"]])
+    print(results_table)
 
 
 def t_prediction_function(list_of_predictors,
                           list_of_error_margins,
                           directory_containing_oeis_file='',
-                          limit_number_of_seqs_to_load=float('inf')):
-    sequences = get_oeis_sequences(directory_containing_oeis_file=directory_containing_oeis_file,
-                                   limit_number_of_seqs_to_load=limit_number_of_seqs_to_load)
+                          limit_number_of_seqs_to_load=float('inf'),
+                          number_of_workers=1,
+                          chunk_size=1000,
+                          number_of_seqs_to_skip=0,
+                          names_to_load=None,
+                          use_cache=False,
+                          share_prefixes=False,
+                          checkpoint_directory=None,
+                          checkpoint_interval=60,
+                          use_shared_memory=True):
+    """
+    :param list_of_predictors:
+    :param list_of_error_margins:
+    :param directory_containing_oeis_file:
+    :param limit_number_of_seqs_to_load:
+    :param number_of_workers: the number of processes to score the sequences with, None for the number of cpus.
+    with 1 worker the sequences are scored serially in the current process
+    :param chunk_size: the number of sequences sent to a worker at a time
+    :param number_of_seqs_to_skip: the number of sequences to skip from the start of the file
+    :param names_to_load: if not None, only the sequences whose A-number is in it are scored
+    :param use_cache: whether to load the sequences from the binary cache of the OEIS file, see load_oeis_cache
+    :param share_prefixes: whether to reduce the prefixes that sequences share once, see
+    score_predictors_on_sorted_chunk. the sequences are all loaded and sorted first, and each chunk is a run of the
+    sorted sequences
+    :param checkpoint_directory: if given, the outcome of each prediction is written to a results file in this
+    directory, and the run saves checkpoints there and resumes from the last one, see score_predictors_with_checkpoints
+    :param checkpoint_interval: the seconds between checkpoints
+    :param use_shared_memory: whether a parallel run parses the sequences once into shared memory, see
+    shared_corpus.py, instead of sending chunks of them to the workers. the workers then predict from views of the
+    shared memory, so adding workers does not add copies of the sequences.
+    not needed with use_cache, whose workers already share the pages of the cache
+    :return: a list with the PredictionErrors of each predictor, print_scores can print them for other error margins
+    without scoring the sequences again
+    """
+    if checkpoint_directory is None:
+        scores = score_predictors_on_oeis_sequences(list_of_predictors,
+                                                    directory_containing_oeis_file,
+                                                    limit_number_of_seqs_to_load,
+                                                    number_of_workers,
+                                                    chunk_size,
+                                                    number_of_seqs_to_skip,
+                                                    names_to_load,
+                                                    use_cache,
+                                                    share_prefixes,
+                                                    use_shared_memory)
+    elif share_prefixes:
+        raise ValueError('a run with checkpoints scores the sequences in the order of the corpus, '
+                         'so it can not share prefixes')
+    else:
+        scores = score_predictors_with_checkpoints(list_of_predictors,
+                                                   checkpoint_directory,
+                                                   checkpoint_interval,
+                                                   directory_containing_oeis_file,
+                                                   limit_number_of_seqs_to_load,
+                                                   number_of_workers,
+                                                   chunk_size,
+                                                   number_of_seqs_to_skip,
+                                                   names_to_load,
+                                                   use_cache,
+                                                   use_shared_memory)
 
-    for predictor in list_of_predictors:
+    for predictor, prediction_errors in zip(list_of_predictors, scores):
         print()
-        error_margins_map = {e: {'passed': 0, 'failed': 0} for e in list_of_error_margins}
-
-        count_skipped = 0
-        for seq in sequences:
-            test_correctness = test_if_prediction_is_correct(predictor, seq, list_of_error_margins)
-            if test_correctness is None:
-                count_skipped += 1
-                continue
-            for i in range(len(test_correctness)):
-                if test_correctness[i]:
-                    error_margins_map[list_of_error_margins[i]]["passed"] += 1
-                else:
-                    error_margins_map[list_of_error_margins[i]]["failed"] += 1
-
-        print(predictor.get_name())
-        # print the results in a pretty table
-        print(f'skipped {count_skipped}')
-        column_names = ['error margin', 'passed', 'failed']
-        results_table = PrettyTable(column_names)
-        for e in list_of_error_margins:
-            results_table.add_row([e, error_margins_map[e]["passed"], error_margins_map[e]["failed"]])
-        print(results_table)
+        print_scores(predictor, prediction_errors, list_of_error_margins)
+    return scores
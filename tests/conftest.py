@@ -0,0 +1,16 @@
+from oeis_corpus import create_oeis_sequences, write_stripped_file
+import pytest
+
+
+@pytest.fixture
+def oeis_sequences():
+    return create_oeis_sequences()
+
+
+@pytest.fixture
+def oeis_directory(tmp_path, oeis_sequences):
+    """
+    :return: a directory with a stripped file of oeis_sequences
+    """
+    write_stripped_file(tmp_path / 'stripped', oeis_sequences)
+    return str(tmp_path)
@@ -0,0 +1,47 @@
+"""
+the small corpus in the format of the OEIS which the tests of the corpus scoring run on
+"""
+import random
+
+
+def create_oeis_sequences(number_of_sequences=120, seed=0):
+    """
+    :return: the names and sequences of a small corpus in the shape of the OEIS: polynomials, powers, sequences with
+    zeros and negative elements, big ints, and runs of sequences that share long prefixes
+    """
+    rng = random.Random(seed)
+    sequences = [[],
+                 [5],
+                 [3 ** i for i in range(60)],
+                 [2 ** 100 + i ** 2 for i in range(20)],
+                 [0, 1, 0, 2, 0, 4, 0, 8, 1, 16, 2],
+                 # the ratio of the last element to twice the one before it rounds to 1
+                 [25015772549499853, 50031545098999707, 100063090197999413, 200126180395998841],
+                 [7 * 3 ** i + 1 for i in range(45)],
+                 # the elements round to the float above them, so even their exact predictions fail the error margin
+                 # of 1
+                 [2 ** 90 - i ** 3 for i in range(15)]]
+    shared_prefix = [i ** 2 + 1 for i in range(25)]
+    while len(sequences) < number_of_sequences:
+        kind = rng.randrange(4)
+        if kind == 0:
+            suffix = [rng.randint(-3, 700) for _ in range(rng.randint(0, 4))]
+            sequences.append(shared_prefix[: rng.randint(15, 25)] + suffix)
+        elif kind == 1:
+            coefficients = [rng.randint(-5, 5) for _ in range(rng.randint(1, 4))]
+            sequences.append([sum(c * i ** k for k, c in enumerate(coefficients)) for i in range(rng.randint(2, 40))])
+        elif kind == 2:
+            # the noisy powers go above 2 ** 53, where the bounds of the error margins are rounded, and the ratio of
+            # a prediction at the edge of an error margin rounds to it
+            ratio = rng.choice([2, 3, -2, 10])
+            sequences.append([rng.randint(1, 3) * ratio ** i + rng.randint(-1, 1) for i in range(rng.randint(2, 40))])
+        else:
+            sequences.append([rng.randint(-5, 60) for _ in range(rng.randint(1, 30))])
+    return [(f'A{i + 1:06d}', seq) for i, seq in enumerate(sequences)]
+
+
+def write_stripped_file(path, names_and_sequences):
+    with open(path, 'w') as f:
+        f.write('# the OEIS in the format of the stripped file\n')
+        for name, seq in names_and_sequences:
+            f.write(f'{name} ,{",".join(map(str, seq))},\n')
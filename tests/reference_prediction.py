@@ -0,0 +1,69 @@
+"""
+the scalar prediction the predictors made before the engines that speed it up, which the tests compare the engines to
+"""
+from abstract_prediction_methods import predict_next_element_recursive
+import random
+
+
+def predict_by_recursion(predictor, lis):
+    """
+    :return: the prediction of predict, made by reducing the whole sublist which can be predicted recursively
+    """
+    sublist_to_predict = list(predictor.get_sublist_which_can_be_predicted(list(lis)))
+    if len(sublist_to_predict) == 0:
+        return None
+    return predict_next_element_recursive(sublist_to_predict,
+                                          predictor.base_case,
+                                          predictor.reduce_function,
+                                          predictor.inference_function)
+
+
+def predict_or_error(predict, *args):
+    # some lists make the predictors raise, and the engines should raise the same
+    try:
+        return predict(*args)
+    except (ZeroDivisionError, OverflowError, ValueError, TypeError) as e:
+        return type(e)
+
+
+def get_random_lists(number_of_lists, minimal_element=-5, maximal_element=20, maximal_length=14, seed=0):
+    rng = random.Random(seed)
+    return [[rng.randint(minimal_element, maximal_element) for _ in range(rng.randint(1, maximal_length))]
+            for _ in range(number_of_lists)]
+
+
+ERROR_MARGINS = [5, 2, 1.1, 1.01, 1.001, 1.0000001, 1]
+
+
+def score_by_predict(list_of_predictors, sequences, list_of_error_margins=ERROR_MARGINS):
+    """
+    scores the predictors as t_prediction_function did before the engines, predicting each sequence without its last
+    element by predict and checking the prediction against each error margin
+    :return: for each predictor, a dict of the number of skipped sequences and of the number of predictions that
+    passed each error margin
+    """
+    scores = []
+    for predictor in list_of_predictors:
+        score = dict.fromkeys(list_of_error_margins, 0)
+        score['skipped'] = 0
+        for seq in sequences:
+            prediction = predictor.predict(list(seq[: -1]))
+            if prediction is None:
+                score['skipped'] += 1
+                continue
+            for error_margin in list_of_error_margins:
+                score[error_margin] += seq[-1] / error_margin <= prediction <= seq[-1] * error_margin
+        scores.append(score)
+    return scores
+
+
+def get_score_of_prediction_errors(list_of_prediction_errors, list_of_error_margins=ERROR_MARGINS):
+    """
+    :return: the PredictionErrors of each predictor in the form of score_by_predict
+    """
+    scores = []
+    for prediction_errors in list_of_prediction_errors:
+        score = {error_margin: prediction_errors.count_passed(error_margin) for error_margin in list_of_error_margins}
+        score['skipped'] = prediction_errors.count_skipped
+        scores.append(score)
+    return scores
@@ -0,0 +1,59 @@
+from abstract_prediction_methods import multiply_by_ratio, predict_next_element
+from predictors import *
+from reference_prediction import get_random_lists, predict_by_recursion, predict_or_error
+from fractions import Fraction
+import math
+import pytest
+
+PREDICTORS = [Division(), ImprovedDivision(), DivisionCanDealWithZero(), ImprovedDivisionCanDealWithZero(),
+              DivisionFrac(), Subtraction(), SlopeAndBias(), DivisionWithTruncation(3),
+              ImprovedDivisionWithTruncation(2)]
+
+LISTS = [[i ** 3 - 4 * i for i in range(1, 14)], [3 ** i for i in range(14)], [1, 1, 2, 3, 5, 8, 13, 21, 34],
+         [5, 0, 0, 3, 7, 0, 11, 13, 0, 2]] + get_random_lists(40)
+
+
+@pytest.mark.parametrize('predictor', PREDICTORS, ids=lambda predictor: predictor.get_name())
+def test_predicting_from_the_tails_is_predicting_from_the_whole_lists(predictor):
+    for lis in LISTS:
+        sublist_to_predict = list(predictor.get_sublist_which_can_be_predicted(lis))
+        if len(sublist_to_predict) == 0:
+            continue
+        assert predict_or_error(predict_next_element,
+                                sublist_to_predict,
+                                predictor.base_case,
+                                predictor.reduce_function,
+                                predictor.inference_function,
+                                predictor.get_inference_tail) == predict_or_error(predict_by_recursion, predictor, lis)
+
+
+def test_only_the_tails_are_given_to_the_inference():
+    lengths_given_to_inference = []
+
+    def inference_function(lis, predicted_next_element_of_reduced_lis):
+        lengths_given_to_inference.append(len(lis))
+        return lis[-1] + predicted_next_element_of_reduced_lis
+
+    lis = [i ** 4 for i in range(50)]
+    prediction = predict_next_element(lis,
+                                      Subtraction().base_case,
+                                      Subtraction().reduce_function,
+                                      inference_function,
+                                      lambda current_gen: current_gen[-1:])
+
+    assert prediction == 50 ** 4
+    # the list given to inference_function of the base case is the base case number itself
+    assert set(lengths_given_to_inference) == {1}
+
+
+def test_ints_too_big_for_a_float_are_multiplied_by_ratios_exactly():
+    element = 3 ** 1000
+    assert multiply_by_ratio(element, 1.5) == round(element * Fraction(3, 2))
+    assert multiply_by_ratio(-element, 0.25) == round(-element / Fraction(4))
+    assert multiply_by_ratio(-element, math.inf) == -math.inf
+    assert multiply_by_ratio(7, 1.5) == 10.5
+
+
+def test_division_predicts_the_next_element_of_ints_too_big_for_a_float():
+    lis = [3 ** (1000 + i) for i in range(4)]
+    assert Division().predict(lis) == 3 ** 1004
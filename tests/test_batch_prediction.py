@@ -0,0 +1,119 @@
+from predictors import *
+from reference_prediction import get_random_lists, predict_by_recursion, predict_or_error
+from fractions import Fraction
+import pytest
+import random
+
+np = pytest.importorskip('numpy')
+import batch_prediction
+
+MAXIMAL_INT64 = 2 ** 63 - 1
+
+LISTS = [[i ** 3 - 4 * i for i in range(1, 30)],
+         [3 ** i for i in range(30)],
+         [1.5, 2.25, 3.375, 5.0625],
+         [Fraction(1, 2), Fraction(1, 3), Fraction(1, 4)],
+         # the differences of these overflow int64
+         [MAXIMAL_INT64, -MAXIMAL_INT64, MAXIMAL_INT64],
+         [-MAXIMAL_INT64, 0, MAXIMAL_INT64, 0],
+         [MAXIMAL_INT64 - 2, MAXIMAL_INT64 - 1, MAXIMAL_INT64],
+         # too big for int64 and float64
+         [2 ** 70 + i ** 2 for i in range(10)],
+         [2 ** 53 + 1, 2 ** 53 + 3, 2 ** 53 + 7],
+         [5, 0, 0, 3, 7, 0, 11, 13, 0, 2],
+         [0, 0, 0],
+         [0.0, -0.0, 0.0, 1.0],
+         [7],
+         []] + get_random_lists(60) + get_random_lists(20, -2, 2, maximal_length=30, seed=1)
+
+
+@pytest.mark.parametrize('predictor', [Division(), ImprovedDivision(), DivisionCanDealWithZero(),
+                                       ImprovedDivisionCanDealWithZero(), Subtraction()],
+                         ids=lambda predictor: predictor.get_name())
+def test_predict_batch_predicts_like_predict(predictor):
+    assert predictor.batch_reduction is not None
+    predictions = predict_or_error(predictor.predict_batch, LISTS)
+    if not isinstance(predictions, list):
+        # a list that raises makes the whole batch raise, so the lists are predicted one by one as well
+        predictions = [predict_or_error(predictor.predict_batch, [lis])[0] for lis in LISTS]
+    for lis, prediction in zip(LISTS, predictions):
+        expected_prediction = predict_or_error(predict_by_recursion, predictor, lis)
+        assert type(prediction) is type(expected_prediction)
+        if prediction != prediction:
+            # nan is not equal to itself
+            assert expected_prediction != expected_prediction
+        else:
+            assert prediction == expected_prediction
+
+
+@pytest.mark.parametrize('lis, operation, dtype', [([1, 2, 3], batch_prediction.SUBTRACTION, np.int64),
+                                                   ([MAXIMAL_INT64, -MAXIMAL_INT64], batch_prediction.SUBTRACTION,
+                                                    np.int64),
+                                                   ([MAXIMAL_INT64 + 1], batch_prediction.SUBTRACTION, None),
+                                                   ([1, 2, 3], batch_prediction.DIVISION, np.float64),
+                                                   ([2 ** 53, -2 ** 53], batch_prediction.DIVISION, np.float64),
+                                                   ([2 ** 53 + 1], batch_prediction.DIVISION, None),
+                                                   ([1.5, 2.0], batch_prediction.SUBTRACTION, np.float64),
+                                                   ([1, 2.0], batch_prediction.DIVISION, None),
+                                                   ([Fraction(1, 2)], batch_prediction.DIVISION, None)])
+def test_batch_dtype_is_exact_for_the_numbers_of_the_list(lis, operation, dtype):
+    assert batch_prediction.get_batch_dtype(lis, operation) is dtype
+
+
+def test_int64_overflow_is_detected_per_row():
+    left = np.array([[MAXIMAL_INT64, 1], [-MAXIMAL_INT64, 1], [3, 4]], dtype=np.int64)
+    right = np.array([[-1, 1], [2, 1], [1, 1]], dtype=np.int64)
+    with np.errstate(all='ignore'):
+        result = left - right
+
+    assert list(batch_prediction.subtraction_overflows(left, right, result, False)) == [True, True, False]
+    # the overflow of the first row is outside its valid elements
+    valid = np.array([[False, True], [True, True], [True, True]])
+    assert list(batch_prediction.subtraction_overflows(left, right, result, False, valid)) == [False, True, False]
+
+
+def test_overflowing_rows_are_predicted_with_python_ints():
+    lis = [MAXIMAL_INT64 - 10, 0, MAXIMAL_INT64 - 10]
+    prediction = Subtraction().predict_batch([lis, [1, 2, 3]])
+
+    assert prediction == [predict_by_recursion(Subtraction(), lis), 4]
+    assert prediction[0] > MAXIMAL_INT64
+
+
+def test_lists_of_different_lengths_are_packed_in_their_own_rows():
+    lists = [[1, 2], [5, 6, 7, 8], [9]]
+    values, lengths = batch_prediction.pack_lists(lists, np.int64)
+
+    assert values.tolist() == [[1, 2, 0, 0], [5, 6, 7, 8], [9, 0, 0, 0]]
+    assert lengths.tolist() == [2, 4, 1]
+
+
+def get_long_lists():
+    rng = random.Random(0)
+    length = MINIMAL_LENGTH_TO_PREDICT_WITH_FIXED_WIDTH
+    return [[i ** 3 - 7 * i for i in range(length)],
+            [i ** 3 % 1000 - 500 for i in range(length)],
+            [rng.randint(-3, 3) for _ in range(length + 10)],
+            [rng.choice([0, 1, 2]) for _ in range(length)],
+            [rng.uniform(0.5, 2) for _ in range(length)],
+            # the differences of these overflow int64 part way
+            [rng.randint(-2 ** 40, 2 ** 40) for _ in range(length)],
+            # too big for int64
+            [2 ** 70 + rng.randint(0, 9) for _ in range(length)]]
+
+
+@pytest.mark.parametrize('predictor', [Division(), ImprovedDivision(), DivisionCanDealWithZero(),
+                                       ImprovedDivisionCanDealWithZero(), Subtraction()],
+                         ids=lambda predictor: predictor.get_name())
+def test_long_lists_are_predicted_with_fixed_width_like_python_numbers(predictor):
+    for lis in get_long_lists():
+        sublist_to_predict = list(predictor.get_sublist_which_can_be_predicted(lis))
+        if len(sublist_to_predict) == 0:
+            continue
+        expected_prediction = predict_or_error(predictor.predict_sublist_by_reduction, sublist_to_predict)
+        prediction = predict_or_error(predictor.predict, lis)
+        assert type(prediction) is type(expected_prediction)
+        if prediction != prediction:
+            assert expected_prediction != expected_prediction
+        else:
+            assert prediction == expected_prediction
@@ -0,0 +1,67 @@
+from benchmarks.benchmark_functions import compare_results, get_result_key, run_benchmarks, select_results
+from predictors import Subtraction
+
+
+def create_result(length, seconds=None, error=None):
+    result = {'function': 'predict', 'predictor': 'Subtraction', 'sequence': 'polynomial', 'length': length}
+    if seconds is not None:
+        result['seconds'] = seconds
+    else:
+        result['error'] = error
+    return result
+
+
+def test_slower_cases_regressed():
+    baseline_results = [create_result(10, 1.0), create_result(100, 1.0)]
+    results = [create_result(10, 1.05), create_result(100, 1.5)]
+
+    assert compare_results(results, baseline_results, 0.1) == [(get_result_key(results[1]), 1.0, 1.5, None)]
+
+
+def test_cases_the_baseline_timed_regressed_if_they_are_not_timed_now():
+    baseline_results = [create_result(10, 1.0), create_result(100, 1.0), create_result(1000, 1.0),
+                        create_result(10000, 1.0), create_result(100000, error='skipped')]
+    results = [create_result(10, error='timeout'), create_result(100, error='ValueError'),
+               create_result(1000, error='skipped'), create_result(100000, 1.0)]
+
+    regressions = compare_results(results, baseline_results, 0.1)
+    assert [(key[-1], error) for key, _, _, error in regressions] == [(10, 'timeout'),
+                                                                      (100, 'ValueError'),
+                                                                      (1000, 'skipped'),
+                                                                      (10000, 'missing')]
+
+
+def test_every_length_has_a_result():
+    results = run_benchmarks([Subtraction()],
+                             [10, 100, 1000],
+                             sequence_kinds=['polynomial'],
+                             function_names=['predict'],
+                             minimal_total_time=0,
+                             maximal_time_per_call=0)
+
+    assert [(result['length'], 'seconds' in result) for result in results] == [(10, True),
+                                                                              (100, False),
+                                                                              (1000, False)]
+    assert all(result['error'] == 'skipped' for result in results[1:])
+
+
+def test_lengths_the_baseline_timed_are_not_skipped():
+    baseline_results = [create_result(1000, 1.0)]
+    results = run_benchmarks([Subtraction()],
+                             [10, 100, 1000],
+                             sequence_kinds=['polynomial'],
+                             function_names=['predict'],
+                             minimal_total_time=0,
+                             maximal_time_per_call=0,
+                             baseline_results=baseline_results)
+
+    assert [(result['length'], 'seconds' in result) for result in results] == [(10, True),
+                                                                              (100, False),
+                                                                              (1000, True)]
+    assert compare_results(results, baseline_results, 0.1) == []
+
+
+def test_a_run_of_some_of_the_cases_is_compared_against_the_same_cases():
+    baseline_results = [create_result(10, 1.0), create_result(100, 1.0), dict(create_result(10, 1.0), function='x')]
+
+    assert select_results(baseline_results, [Subtraction()], [10], function_names=['predict']) == baseline_results[:1]
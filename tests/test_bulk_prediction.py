@@ -0,0 +1,106 @@
+from service.bulk_prediction import predict_in_bulk
+from service.request_prediction import predict_or_none, to_json_number
+from predictor_registry import create_predictor
+from definitions import ROOT_DIR
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import pytest
+
+PREDICTOR_NAMES = ['Division', 'ImprovedDivisionCanDealWithZero', 'Subtraction', 'SlopeAndBias',
+                   'DivisionWithTruncation:3', 'WindowedPredictor:6:Subtraction']
+
+
+def get_expected_predictions(sequence):
+    """
+    :return: the prediction of predict of each predictor on the sequence, as the output has it
+    """
+    return [to_json_number(predict_or_none(create_predictor(predictor_name), sequence))
+            for predictor_name in PREDICTOR_NAMES]
+
+
+def check_csv_output(text, oeis_sequences):
+    rows = list(csv.reader(io.StringIO(text)))
+    assert rows[0] == ['name'] + PREDICTOR_NAMES
+    assert [row[0] for row in rows[1:]] == [name for name, _ in oeis_sequences]
+    for row, (_, seq) in zip(rows[1:], oeis_sequences):
+        assert row[1:] == ['' if prediction is None else str(prediction)
+                           for prediction in get_expected_predictions(seq)]
+
+
+def check_jsonl_output(text, oeis_sequences):
+    rows = [json.loads(line) for line in text.splitlines()]
+    assert rows == [{'name': name, 'predictions': dict(zip(PREDICTOR_NAMES, get_expected_predictions(seq)))}
+                    for name, seq in oeis_sequences]
+
+
+@pytest.mark.parametrize('number_of_workers, chunk_size', [(1, 1000), (1, 7), (2, 7)])
+@pytest.mark.parametrize('output_format', ['csv', 'jsonl'])
+def test_output_has_the_predictions_of_predict(oeis_directory, oeis_sequences, number_of_workers, chunk_size,
+                                               output_format):
+    output = io.StringIO()
+
+    number_of_lines = predict_in_bulk(PREDICTOR_NAMES,
+                                      [os.path.join(oeis_directory, 'stripped')],
+                                      output,
+                                      output_format,
+                                      number_of_workers,
+                                      chunk_size)
+
+    assert number_of_lines == len(oeis_sequences)
+    if output_format == 'csv':
+        check_csv_output(output.getvalue(), oeis_sequences)
+    else:
+        check_jsonl_output(output.getvalue(), oeis_sequences)
+
+
+def test_gzip_files_are_read_one_after_the_other(oeis_directory, oeis_sequences, tmp_path):
+    path_to_stripped_file = os.path.join(oeis_directory, 'stripped')
+    with open(path_to_stripped_file, 'rb') as f, gzip.open(tmp_path / 'stripped.gz', 'wb') as gzip_file:
+        shutil.copyfileobj(f, gzip_file)
+    output = io.StringIO()
+
+    predict_in_bulk(PREDICTOR_NAMES, [str(tmp_path / 'stripped.gz'), path_to_stripped_file], output, 'jsonl', 1)
+
+    check_jsonl_output(output.getvalue(), oeis_sequences + oeis_sequences)
+
+
+def test_lines_that_are_not_sequences_are_not_predicted(tmp_path):
+    (tmp_path / 'stripped').write_text('# a comment\nA000001 ,1,2,3,\n\nA000002 ,1,x,3,\nA000003 ,5,\n')
+    output = io.StringIO()
+
+    predict_in_bulk(PREDICTOR_NAMES, [str(tmp_path / 'stripped')], output, 'jsonl', 1)
+
+    rows = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [row['name'] for row in rows] == ['A000001', 'A000002', 'A000003']
+    assert rows[0]['predictions'] == dict(zip(PREDICTOR_NAMES, get_expected_predictions([1, 2, 3])))
+    assert rows[1]['predictions'] == dict.fromkeys(PREDICTOR_NAMES)
+    assert 'error' in rows[1] and 'error' not in rows[0]
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_command_line_reads_the_standard_input(oeis_directory, oeis_sequences, compress):
+    with open(os.path.join(oeis_directory, 'stripped'), 'rb') as f:
+        stripped_file = f.read()
+
+    output = subprocess.run([sys.executable, '-m', 'service.main_bulk_prediction', '--predictors', *PREDICTOR_NAMES,
+                             '--workers', '2', '--chunk-size', '13'],
+                            cwd=ROOT_DIR,
+                            input=gzip.compress(stripped_file) if compress else stripped_file,
+                            capture_output=True,
+                            check=True).stdout
+
+    check_csv_output(output.decode(), oeis_sequences)
+
+
+def test_command_line_rejects_unknown_predictors():
+    process = subprocess.run([sys.executable, '-m', 'service.main_bulk_prediction', '--predictors', 'NotAPredictor'],
+                             cwd=ROOT_DIR, input=b'', capture_output=True)
+
+    assert process.returncode == 2
+    assert b'NotAPredictor' in process.stderr
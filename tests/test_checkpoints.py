@@ -0,0 +1,127 @@
+from testing_on_oeis.checkpoints import RESULTS_FILE_NAME, ResultsFile, iterate_results, load_checkpoint, load_scores
+from testing_on_oeis import testing_functions
+from testing_on_oeis.testing_functions import t_prediction_function
+from predictors import *
+from reference_prediction import ERROR_MARGINS, get_score_of_prediction_errors, score_by_predict
+import os
+import pytest
+
+PREDICTORS = [Division(), ImprovedDivisionCanDealWithZero(), Subtraction(), SlopeAndBias(),
+              ImprovedDivisionWithTruncation(3), WindowedPredictor(Subtraction(), 6)]
+
+
+def score_with_checkpoints(oeis_directory, checkpoint_directory, number_of_workers=1, **kwargs):
+    return t_prediction_function(PREDICTORS,
+                                 ERROR_MARGINS,
+                                 oeis_directory,
+                                 number_of_workers=number_of_workers,
+                                 chunk_size=7,
+                                 checkpoint_directory=checkpoint_directory,
+                                 checkpoint_interval=0,
+                                 use_shared_memory=False,
+                                 **kwargs)
+
+
+class Interrupted(Exception):
+    pass
+
+
+def interrupt_after(number_of_chunks, monkeypatch):
+    """
+    makes the runs with checkpoints stop with Interrupted when they score more than number_of_chunks chunks
+    """
+    get_outcomes_of_chunks = testing_functions.get_outcomes_of_chunks
+
+    def get_outcomes_of_some_chunks(*args):
+        for i, outcomes_of_chunk in enumerate(get_outcomes_of_chunks(*args)):
+            if i == number_of_chunks:
+                raise Interrupted
+            yield outcomes_of_chunk
+
+    monkeypatch.setattr(testing_functions, 'get_outcomes_of_chunks', get_outcomes_of_some_chunks)
+
+
+@pytest.mark.parametrize('number_of_workers', [1, 2])
+def test_scores_and_results_are_the_scores_of_predict(oeis_directory, oeis_sequences, tmp_path, number_of_workers):
+    checkpoint_directory = str(tmp_path / 'run')
+    expected_score = score_by_predict(PREDICTORS, [seq for _, seq in oeis_sequences[5: 95]])
+
+    scores = score_with_checkpoints(oeis_directory, checkpoint_directory, number_of_workers,
+                                    limit_number_of_seqs_to_load=90, number_of_seqs_to_skip=5)
+
+    assert get_score_of_prediction_errors(scores) == expected_score
+    path_to_results = os.path.join(checkpoint_directory, RESULTS_FILE_NAME)
+    assert [name_number for name_number, _ in iterate_results(path_to_results)] == list(range(6, 96))
+    assert get_score_of_prediction_errors(load_scores(path_to_results, len(PREDICTORS))) == expected_score
+    assert load_checkpoint(checkpoint_directory)['number of sequences scored'] == 90
+
+
+@pytest.mark.parametrize('number_of_chunks', [0, 1, 6])
+def test_interrupted_run_resumes_to_the_scores_of_predict(oeis_directory, oeis_sequences, tmp_path, monkeypatch,
+                                                          number_of_chunks):
+    checkpoint_directory = str(tmp_path / 'run')
+    interrupt_after(number_of_chunks, monkeypatch)
+    with pytest.raises(Interrupted):
+        score_with_checkpoints(oeis_directory, checkpoint_directory)
+    assert load_checkpoint(checkpoint_directory) is None or \
+           load_checkpoint(checkpoint_directory)['number of sequences scored'] == 7 * number_of_chunks
+    monkeypatch.undo()
+
+    scores = score_with_checkpoints(oeis_directory, checkpoint_directory)
+
+    assert get_score_of_prediction_errors(scores) == score_by_predict(PREDICTORS, [seq for _, seq in oeis_sequences])
+    path_to_results = os.path.join(checkpoint_directory, RESULTS_FILE_NAME)
+    assert [name_number for name_number, _ in iterate_results(path_to_results)] == \
+           list(range(1, len(oeis_sequences) + 1))
+
+
+def test_records_after_the_last_checkpoint_are_truncated(oeis_directory, oeis_sequences, tmp_path):
+    checkpoint_directory = str(tmp_path / 'run')
+    score_with_checkpoints(oeis_directory, checkpoint_directory, limit_number_of_seqs_to_load=40)
+    path_to_results = os.path.join(checkpoint_directory, RESULTS_FILE_NAME)
+    # records that were written after the last checkpoint, by a run that stopped before its next one
+    with ResultsFile(path_to_results, len(PREDICTORS), os.path.getsize(path_to_results)) as results_file:
+        results_file.append([41, 42], [0.0] * 2 * len(PREDICTORS))
+
+    scores = score_with_checkpoints(oeis_directory, checkpoint_directory, limit_number_of_seqs_to_load=40)
+
+    assert get_score_of_prediction_errors(scores) == \
+           score_by_predict(PREDICTORS, [seq for _, seq in oeis_sequences[:40]])
+    assert [name_number for name_number, _ in iterate_results(path_to_results)] == list(range(1, 41))
+
+
+def test_finished_run_is_not_scored_again(oeis_directory, oeis_sequences, tmp_path, monkeypatch):
+    checkpoint_directory = str(tmp_path / 'run')
+    score_with_checkpoints(oeis_directory, checkpoint_directory)
+    interrupt_after(0, monkeypatch)
+
+    scores = score_with_checkpoints(oeis_directory, checkpoint_directory)
+
+    assert get_score_of_prediction_errors(scores) == score_by_predict(PREDICTORS, [seq for _, seq in oeis_sequences])
+
+
+def test_checkpoint_of_a_different_run_is_not_resumed(oeis_directory, tmp_path):
+    checkpoint_directory = str(tmp_path / 'run')
+    score_with_checkpoints(oeis_directory, checkpoint_directory, limit_number_of_seqs_to_load=40)
+
+    with pytest.raises(ValueError):
+        score_with_checkpoints(oeis_directory, checkpoint_directory, limit_number_of_seqs_to_load=50)
+    with pytest.raises(ValueError):
+        t_prediction_function(PREDICTORS[1:], ERROR_MARGINS, oeis_directory, limit_number_of_seqs_to_load=40,
+                              checkpoint_directory=checkpoint_directory)
+
+
+def test_results_file_of_a_different_number_of_predictors_is_rejected(tmp_path):
+    path_to_results = str(tmp_path / RESULTS_FILE_NAME)
+    with ResultsFile(path_to_results, 3) as results_file:
+        results_file.append([7], [1.0, 2.0, float('nan')])
+
+    with pytest.raises(ValueError):
+        ResultsFile(path_to_results, 2, os.path.getsize(path_to_results))
+    outcomes = [outcomes for _, outcomes in iterate_results(path_to_results)]
+    assert outcomes[0][:2] == [1.0, 2.0] and outcomes[0][2] != outcomes[0][2]
+
+
+def test_checkpoints_can_not_share_prefixes(oeis_directory, tmp_path):
+    with pytest.raises(ValueError):
+        score_with_checkpoints(oeis_directory, str(tmp_path / 'run'), share_prefixes=True)
@@ -0,0 +1,32 @@
+from abstract_prediction_methods import predict_next_element_by_exact_ratios
+from predictors import *
+from reference_prediction import get_random_lists, predict_by_recursion, predict_or_error
+from fractions import Fraction
+import pytest
+
+LISTS = [[1, 2, 4, 8], [1, 3, 7, 15, 31], [i ** 3 + 1 for i in range(12)], [3 ** i for i in range(10)],
+         [2 ** 200 + i for i in range(6)], [5, 0, 0, 3, 7, 0, 11, 13], [-3, 4, -5, 6, -7], [6], [0, 5]] \
+        + get_random_lists(60, maximal_length=9) + get_random_lists(20, 1, 10 ** 20, maximal_length=6, seed=1)
+
+
+@pytest.mark.parametrize('predictor', [DivisionFrac(), ImprovedDivisionFrac()],
+                         ids=lambda predictor: predictor.get_name())
+def test_exact_ratios_predict_like_the_fractions(predictor):
+    for lis in LISTS:
+        prediction = predict_or_error(predictor.predict, lis)
+        expected_prediction = predict_or_error(predict_by_recursion, predictor, lis)
+        assert prediction == expected_prediction
+        assert type(prediction) is type(expected_prediction)
+
+
+def test_exact_ratios_of_the_whole_list_are_the_ratios_of_its_fractions():
+    for lis in LISTS:
+        if 0 in lis:
+            continue
+        assert predict_next_element_by_exact_ratios(lis) == \
+               predict_by_recursion(DivisionFrac(), [Fraction(element) for element in lis])
+
+
+def test_lists_with_fractions_are_reduced_as_fractions():
+    lis = [Fraction(1, 2), Fraction(1, 3), Fraction(1, 4), 5]
+    assert DivisionFrac().predict(lis) == predict_by_recursion(DivisionFrac(), lis)
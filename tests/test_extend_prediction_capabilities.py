@@ -0,0 +1,43 @@
+from extend_prediction_capabilities import create_prediction_series, get_lists_of_predictions
+from predictors import *
+import pytest
+
+LISTS = [[1, 2, 4, 8], [1, 3, 7, 15, 31], [5, 3, 2, 7], [3, 6, 9, 2, 11], [1.5, 3.0], [2.5, 1], [1, 2.5]]
+
+
+def get_lists_of_predictions_by_predict(lis, predictor):
+    # the lists of predictions as they were made before the streams, predicting each prefix from scratch
+    predicted_lists = []
+    for i in range(1, len(lis)):
+        current_list = lis[: i]
+        while len(current_list) < len(lis):
+            current_list.append(predictor.predict(current_list))
+        predicted_lists.append(current_list)
+    return predicted_lists
+
+
+def predict_or_error(function, *args):
+    try:
+        return function(*args)
+    except (TypeError, ZeroDivisionError) as e:
+        return type(e)
+
+
+@pytest.mark.parametrize('predictor', [DivisionFrac(), ImprovedDivisionFrac(), Division(), Subtraction(),
+                                       DivisionCanDealWithZero()], ids=lambda predictor: type(predictor).__name__)
+@pytest.mark.parametrize('lis', LISTS, ids=str)
+def test_lists_of_predictions_are_predicted_like_predict(predictor, lis):
+    assert predict_or_error(get_lists_of_predictions, lis, predictor) == \
+           predict_or_error(get_lists_of_predictions_by_predict, lis, predictor)
+
+
+def test_lists_of_predictions_of_floats_by_fractions_end_with_the_base_case():
+    # predicting [1.5] is its base case, 1.5 is never divided as a Fraction
+    assert get_lists_of_predictions([1.5, 3.0], DivisionFrac()) == [[1.5, 1.5]]
+
+
+def test_lists_of_predictions_do_not_modify_lis():
+    lis = [1, 3, 7, 15]
+    get_lists_of_predictions(lis, Subtraction())
+    create_prediction_series(lis, Subtraction())
+    assert lis == [1, 3, 7, 15]
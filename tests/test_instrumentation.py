@@ -0,0 +1,97 @@
+from instrumentation import *
+from predictors import *
+import pytest
+
+
+def predict_recorded(predict, *args):
+    """
+    :return: what predict returns while it is recorded, and the recorder
+    """
+    with PredictionRecorder() as recorder:
+        predicted_next_element = predict(*args)
+    return predicted_next_element, recorder
+
+
+def test_reduction_table_records_its_rows():
+    lis = [i ** 3 for i in range(10)]
+    predicted_next_element, recorder = predict_recorded(Subtraction().predict, lis)
+
+    assert predicted_next_element == Subtraction().predict(lis)
+    assert recorder.engines == {ENGINE_REDUCTION_TABLE: 1}
+    assert recorder.get_slowest_records()[0].row_lengths == list(range(10, 0, -1))
+    assert recorder.end_reasons == {END_SINGLE_ELEMENT: 1}
+
+
+@pytest.mark.parametrize('predictor, engines, fallbacks', [
+    (SubtractionWithKernel(), {ENGINE_KERNEL: 1}, 0),
+    (DivisionWithKernel(), {ENGINE_KERNEL: 1}, 0),
+    (DivisionCanDealWithZeroWithKernel(), {ENGINE_KERNEL: 1, ENGINE_REDUCTION_TABLE: 1}, 1),
+])
+def test_kernels_are_recorded(predictor, engines, fallbacks):
+    lis = [3, 0, 5, 9, 16, 30] if fallbacks else [3, 5, 9, 16, 30]
+    predicted_next_element, recorder = predict_recorded(predictor.predict, lis)
+
+    assert predicted_next_element == predictor.predict(lis)
+    assert recorder.engines == engines
+    assert recorder.fallbacks[ENGINE_KERNEL] == fallbacks
+
+
+@pytest.mark.parametrize('predictor', [DivisionFrac(), ImprovedDivisionFrac()])
+def test_exact_ratios_record_their_rows(predictor):
+    lis = [2, 6, 24, 120, 720]
+    predicted_next_element, recorder = predict_recorded(predictor.predict, lis)
+
+    assert predicted_next_element == predictor.predict(lis)
+    assert recorder.engines == {ENGINE_EXACT_RATIOS: 1}
+    assert recorder.get_slowest_records()[0].row_lengths == [5, 4, 3, 2, 1]
+    assert recorder.end_reasons == {END_SINGLE_ELEMENT: 1}
+
+
+def test_long_lists_are_recorded_by_the_fixed_width_engine():
+    pytest.importorskip('numpy')
+    lis = [i ** 2 for i in range(MINIMAL_LENGTH_TO_PREDICT_WITH_FIXED_WIDTH)]
+    predicted_next_element, recorder = predict_recorded(Subtraction().predict, lis)
+
+    assert predicted_next_element == Subtraction().predict_sublist_by_reduction(lis)
+    assert recorder.engines == {ENGINE_FIXED_WIDTH: 1}
+
+
+def test_batches_are_recorded_with_their_fallbacks():
+    pytest.importorskip('numpy')
+    # the last list does not fit in int64, so it is predicted with python numbers
+    list_of_lists = [[1, 4, 9, 16], [2, 4, 6], [10 ** 30, 2 * 10 ** 30, 3 * 10 ** 30]]
+    predictions, recorder = predict_recorded(Subtraction().predict_batch, list_of_lists)
+
+    assert predictions == [Subtraction().predict(lis) for lis in list_of_lists]
+    assert recorder.engines == {ENGINE_FIXED_WIDTH: 3, ENGINE_REDUCTION_TABLE: 1}
+    assert recorder.fallbacks == {ENGINE_FIXED_WIDTH: 1, ENGINE_REDUCTION_TABLE: 0}
+    assert recorder.counters['predictions'] == 4
+
+
+@pytest.mark.parametrize('predictor', [Subtraction(), ImprovedDivision(), SlopeAndBias(),
+                                       WindowedPredictor(Subtraction(), 5),
+                                       WindowedPredictor(DivisionCanDealWithZero(), 5)])
+def test_streams_are_recorded_once_per_prediction(predictor):
+    lis = [3, 5, 9, 16, 30, 57, 110]
+    stream = predictor.stream(lis)
+    predicted_next_element, recorder = predict_recorded(stream.peek_next)
+
+    assert predicted_next_element == predictor.predict(lis)
+    assert recorder.counters['predictions'] == 1
+    assert sum(recorder.engines.values()) == 1
+
+
+def test_side_by_side_is_recorded():
+    lis = [3, 5, 9, 16, 30, 57, 110]
+    predicted_next_element, recorder = predict_recorded(SlopeAndBias().predict, lis)
+
+    assert predicted_next_element == SlopeAndBias().predict(lis)
+    assert recorder.engines == {ENGINE_SIDE_BY_SIDE: 1}
+
+
+def test_nothing_is_recorded_outside_of_a_recorder():
+    with PredictionRecorder() as recorder:
+        pass
+    Subtraction().predict([1, 2, 3])
+
+    assert recorder.counters['predictions'] == 0
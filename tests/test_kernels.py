@@ -0,0 +1,47 @@
+from abstract_prediction_methods import get_prediction_weights, predict_next_element_by_weights
+from predictors import *
+from reference_prediction import get_random_lists, predict_by_recursion
+import math
+import pytest
+
+POSITIVE_LISTS = [[2 ** i for i in range(10)],
+                  [3 ** i + i for i in range(20)],
+                  [i ** 3 + 1 for i in range(1, 15)],
+                  [7],
+                  [1.5, 2.25, 3.375, 5.0625]] + get_random_lists(40, minimal_element=1)
+
+
+def test_weights_are_the_reduction_of_the_unit_lists():
+    for length in range(1, 12):
+        unit_lists = [[int(i == j) for i in range(length)] for j in range(length)]
+        assert list(get_prediction_weights(length)) == [predict_by_recursion(Subtraction(), lis) for lis in unit_lists]
+
+
+@pytest.mark.parametrize('lis', [[i ** 5 for i in range(30)],
+                                 [2 ** 100 + i for i in range(12)],
+                                 [-(3 ** i) for i in range(40)]] + get_random_lists(40), ids=str)
+def test_subtraction_kernel_predicts_integers_exactly_like_subtraction(lis):
+    assert SubtractionWithKernel().predict(lis) == predict_by_recursion(Subtraction(), lis)
+    assert predict_next_element_by_weights(lis) == predict_by_recursion(Subtraction(), lis)
+
+
+@pytest.mark.parametrize('lis', POSITIVE_LISTS, ids=str)
+def test_division_kernel_predicts_like_division_up_to_rounding(lis):
+    assert DivisionWithKernel().predict(lis) == pytest.approx(predict_by_recursion(Division(), lis), rel=1e-9)
+
+
+@pytest.mark.parametrize('lis', [[-2, 4, -8, 16, -32], [-1, -2, -4, -8], [3, -1, 2, -5, 4, 1]], ids=str)
+def test_division_kernel_keeps_the_sign_of_the_prediction(lis):
+    prediction = predict_by_recursion(Division(), lis)
+
+    assert DivisionWithKernel().predict(lis) == pytest.approx(prediction, rel=1e-9)
+    assert math.copysign(1, DivisionWithKernel().predict(lis)) == math.copysign(1, prediction)
+
+
+@pytest.mark.parametrize('lis', [[1, 0, 2, 4, 8], [3, 0, 0, 5, 10, 0, 7], [0, 1, 2]] + get_random_lists(40, 0, 4),
+                         ids=str)
+def test_division_kernel_falls_back_to_the_reduction_table_on_zeros(lis):
+    assert DivisionCanDealWithZeroWithKernel().predict(lis) == \
+           pytest.approx(predict_by_recursion(DivisionCanDealWithZero(), lis), rel=1e-9)
+    if 0 in lis:
+        assert DivisionCanDealWithZeroWithKernel().predict(lis) == predict_by_recursion(DivisionCanDealWithZero(), lis)
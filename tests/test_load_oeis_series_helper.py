@@ -0,0 +1,36 @@
+from testing_on_oeis.load_oeis_series_helper import GZIPPED_STRIPPED_FILE_NAME, STRIPPED_FILE_NAME, get_oeis_names, \
+    get_oeis_sequences, iterate_oeis_sequences, parse_series
+import gzip
+import os
+import pytest
+import shutil
+
+
+def test_series_are_parsed_with_big_and_negative_terms():
+    assert parse_series(',0,1,-1,123456789012345678901234567890,\n') == [0, 1, -1, 123456789012345678901234567890]
+    assert parse_series(',\n') == []
+
+
+@pytest.mark.parametrize('use_cache', [False, True])
+def test_sequences_are_loaded_as_in_the_file(oeis_directory, oeis_sequences, use_cache):
+    assert list(iterate_oeis_sequences(oeis_directory, use_cache=use_cache)) == oeis_sequences
+    assert get_oeis_names(oeis_directory, use_cache=use_cache) == [name for name, _ in oeis_sequences]
+
+
+@pytest.mark.parametrize('use_cache', [False, True])
+def test_sequences_are_limited_skipped_and_filtered_by_name(oeis_directory, oeis_sequences, use_cache):
+    names_to_load = {name for name, _ in oeis_sequences[::3]} | {'A999999'}
+    filtered_sequences = [seq for name, seq in oeis_sequences if name in names_to_load]
+
+    assert get_oeis_sequences(oeis_directory, 10, 5, names_to_load, use_cache) == filtered_sequences[5: 15]
+    assert get_oeis_sequences(oeis_directory, 0, use_cache=use_cache) == []
+
+
+def test_gzipped_file_is_read_without_unpacking_it(oeis_directory, oeis_sequences):
+    path_to_stripped_file = os.path.join(oeis_directory, STRIPPED_FILE_NAME)
+    with open(path_to_stripped_file, 'rb') as f, gzip.open(os.path.join(oeis_directory, GZIPPED_STRIPPED_FILE_NAME),
+                                                          'wb') as gzipped_file:
+        shutil.copyfileobj(f, gzipped_file)
+    os.remove(path_to_stripped_file)
+
+    assert list(iterate_oeis_sequences(oeis_directory)) == oeis_sequences
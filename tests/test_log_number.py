@@ -0,0 +1,83 @@
+from log_number import NUMBER_OF_SIGNIFICANT_DIGITS, LogNumber
+from predictors import *
+from reference_prediction import predict_by_recursion
+from fractions import Fraction
+import math
+import pytest
+import sys
+
+NUMBERS = [0, 1, -1, 2, -3, 0.5, -0.25, 7.5, 10 ** 400, -(10 ** 400), 3 ** 1000]
+
+NUMBER_IDS = ['0', '1', '-1', '2', '-3', '0.5', '-0.25', '7.5', '10**400', '-10**400', '3**1000']
+
+# the ratios of these lists are too big for a float
+LISTS_OF_HUGE_RATIOS = [[1, 10 ** 400, 10 ** 800],
+                        [3, 10 ** 350, -(10 ** 700), 10 ** 1050],
+                        [10 ** 400, 1, 10 ** 400],
+                        [2, 10 ** 309 + 1, 10 ** 618, 5 * 10 ** 927],
+                        [7, 0, 1, 10 ** 320, 10 ** 640]]
+
+
+def is_close(number, exact_number, relative_tolerance=Fraction(1, 10 ** 12)):
+    # the numbers may be too big for pytest.approx, which compares floats
+    if abs(exact_number) < sys.float_info.min:
+        # as python floats, a LogNumber too small for a float is converted to 0
+        return number == 0
+    return abs(Fraction(number) - exact_number) <= abs(exact_number) * relative_tolerance
+
+
+@pytest.mark.parametrize('number', NUMBERS, ids=NUMBER_IDS)
+def test_numbers_are_converted_back(number):
+    log_number = LogNumber.from_number(number)
+
+    assert is_close(log_number.to_number(), number)
+    if abs(number) < 1e300:
+        assert float(log_number) == pytest.approx(number, rel=1e-12)
+    else:
+        assert float(log_number) == (math.inf if number > 0 else -math.inf)
+
+
+@pytest.mark.parametrize('number', NUMBERS, ids=NUMBER_IDS)
+@pytest.mark.parametrize('other_number', NUMBERS, ids=NUMBER_IDS)
+def test_products_quotients_and_order_are_those_of_the_numbers(number, other_number):
+    log_number, other_log_number = LogNumber.from_number(number), LogNumber.from_number(other_number)
+
+    assert is_close((log_number * other_log_number).to_number(), Fraction(number) * Fraction(other_number))
+    assert is_close((log_number * other_number).to_number(), Fraction(number) * Fraction(other_number))
+    if other_number != 0:
+        assert is_close((log_number / other_log_number).to_number(), Fraction(number) / Fraction(other_number))
+    else:
+        with pytest.raises(ZeroDivisionError):
+            log_number / other_log_number
+
+    assert (log_number < other_log_number) == (number < other_number)
+    assert (log_number <= other_number) == (number <= other_number)
+    assert (log_number == other_log_number) == (number == other_number)
+    assert (abs(log_number) > abs(other_log_number)) == (abs(number) > abs(other_number))
+    assert (-log_number >= other_number) == (-number >= other_number)
+
+
+def test_numbers_too_big_for_a_float_are_converted_to_ints_of_15_significant_digits():
+    number = 123456789012345678 * 10 ** 400
+    converted_number = LogNumber.from_number(number).to_number()
+
+    assert type(converted_number) is int
+    assert converted_number % 10 ** (len(str(number)) - NUMBER_OF_SIGNIFICANT_DIGITS) == 0
+    # the log keeps about as many significant digits as a float, the last of the 15 digits are rounding errors
+    assert is_close(converted_number, number)
+
+
+@pytest.mark.parametrize('predictor', [Division(), ImprovedDivision(), DivisionCanDealWithZero(),
+                                       ImprovedDivisionCanDealWithZero()], ids=lambda predictor: predictor.get_name())
+@pytest.mark.parametrize('lis', LISTS_OF_HUGE_RATIOS, ids=lambda lis: str(len(lis)))
+def test_huge_ratios_are_predicted_as_log_numbers_like_the_exact_ratios(predictor, lis):
+    with pytest.raises(OverflowError):
+        predict_by_recursion(predictor, lis)
+
+    exact_prediction = predict_by_recursion(predictor, [Fraction(element) for element in lis])
+    assert is_close(predictor.predict(lis), exact_prediction, Fraction(1, 10 ** 9))
+
+
+def test_truncated_predictors_do_not_predict_huge_ratios_as_log_numbers():
+    with pytest.raises(OverflowError):
+        DivisionWithTruncation(3).predict([1, 10 ** 400, 10 ** 800])
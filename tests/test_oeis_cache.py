@@ -0,0 +1,64 @@
+from testing_on_oeis.load_oeis_series_helper import STRIPPED_FILE_NAME, get_path_to_oeis_cache, load_oeis_cache
+from testing_on_oeis.oeis_cache import MAXIMAL_INT64, MINIMAL_INT64, OEISCache, create_oeis_cache
+from oeis_corpus import write_stripped_file
+from sequence_view import SequenceView
+import os
+import pytest
+
+NAMES_AND_SEQUENCES = [('A000001', [1, 2, 3]),
+                       ('A000007', []),
+                       ('A000010', [MAXIMAL_INT64, MINIMAL_INT64, MAXIMAL_INT64 + 1, MINIMAL_INT64 - 1, 0]),
+                       ('A000045', [0, 1, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233, 377, 610, 987]),
+                       ('A000244', [3 ** i for i in range(60)])]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    path_to_cache = str(tmp_path / 'stripped.cache')
+    create_oeis_cache(NAMES_AND_SEQUENCES, path_to_cache)
+    with OEISCache(path_to_cache) as cache:
+        yield cache
+
+
+def test_cache_has_the_sequences_it_was_created_from(cache):
+    assert len(cache) == len(NAMES_AND_SEQUENCES)
+    assert list(cache) == NAMES_AND_SEQUENCES
+    assert [cache[i] for i in range(len(cache))] == [seq for _, seq in NAMES_AND_SEQUENCES]
+
+
+def test_views_of_cache_are_the_sequences(cache):
+    for i, (name, seq) in enumerate(NAMES_AND_SEQUENCES):
+        view = cache.get_view(i)
+        assert list(view) == seq
+        # the sequences of big terms are parsed, the rest are views of the values of the cache
+        assert isinstance(view, SequenceView) == all(MINIMAL_INT64 <= term <= MAXIMAL_INT64 for term in seq)
+
+
+def test_sequences_are_found_by_name(cache):
+    assert cache.get_index('A000045') == 3
+    assert cache.get_sequence('A000010') == NAMES_AND_SEQUENCES[2][1]
+    assert cache.get_index('A000002') is None
+    assert cache.get_index('A999999') is None
+
+
+def test_unsorted_sequences_are_not_cached(tmp_path):
+    with pytest.raises(ValueError):
+        create_oeis_cache(list(reversed(NAMES_AND_SEQUENCES)), str(tmp_path / 'stripped.cache'))
+
+
+def test_cache_is_created_again_when_the_stripped_file_is_newer(oeis_directory, oeis_sequences):
+    with load_oeis_cache(oeis_directory) as cache:
+        assert list(cache) == oeis_sequences
+
+    write_stripped_file(os.path.join(oeis_directory, STRIPPED_FILE_NAME), oeis_sequences[: 10])
+    # the modification times may be in the same tick
+    os.utime(get_path_to_oeis_cache(oeis_directory), (0, 0))
+    with load_oeis_cache(oeis_directory) as cache:
+        assert list(cache) == oeis_sequences[: 10]
+
+
+def test_file_that_is_not_a_cache_is_not_loaded(tmp_path):
+    path = tmp_path / 'stripped.cache'
+    path.write_bytes(b'not a cache at all, but long enough to have a header')
+    with pytest.raises(ValueError):
+        OEISCache(str(path))
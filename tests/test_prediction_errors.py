@@ -0,0 +1,132 @@
+from testing_on_oeis.prediction_errors import PredictionErrors, get_relative_error
+from predictors import DivisionWithTruncation, ImprovedDivision, ImprovedDivisionCanDealWithZero, SlopeAndBias
+from fractions import Fraction
+import math
+import pytest
+import random
+
+ERROR_MARGINS = [5, 2, 1.1, 1.01, 1.001, 1.0000001, 1]
+
+
+def is_up_to_error_margin(prediction, correct_element, error_margin):
+    # the check every prediction was scored with before the relative errors were recorded
+    return correct_element / error_margin <= prediction <= correct_element * error_margin
+
+
+def test_inexact_float_prediction_of_big_element_is_not_exact():
+    correct_element = 3 ** 41
+    prediction = 3.647299637717079e+19
+    assert prediction / correct_element == 1.0
+
+    assert get_relative_error(prediction, correct_element) > 1
+    assert get_relative_error(correct_element, prediction) > 1
+    assert get_relative_error(prediction, prediction) == 1
+    # the element rounds to the float above it, so even its exact prediction fails the check of the error margin of 1
+    assert correct_element / 1 > correct_element
+    assert get_relative_error(correct_element, correct_element) == math.nextafter(1, 2)
+
+
+def test_ratio_that_rounds_to_an_error_margin_is_not_up_to_it():
+    prediction, correct_element = 200126180395998841, 100063090197999413
+    assert prediction / correct_element == 2.0
+    assert not is_up_to_error_margin(prediction, correct_element, 2)
+
+    prediction_errors = PredictionErrors()
+    prediction_errors.add_prediction(prediction, correct_element)
+    prediction_errors.add_prediction(correct_element, prediction)
+    assert prediction_errors.count_passed(2) == 0
+    assert prediction_errors.count_passed(2.0000000000001) == 2
+
+
+def test_fraction_predictions_too_big_for_a_float_are_not_up_to_any_error_margin():
+    prediction_errors = PredictionErrors()
+    prediction_errors.add_prediction(Fraction(10 ** 400, 3), 1)
+    prediction_errors.add_prediction(Fraction(1, 10 ** 400), 1)
+    prediction_errors.add_prediction(Fraction(7, 2), 3)
+
+    assert list(prediction_errors.relative_errors) == [math.inf, math.inf, 7 / 6]
+    assert prediction_errors.get_error_margins_map([1.1, 2]) == {1.1: {'passed': 0, 'failed': 3},
+                                                                 2: {'passed': 1, 'failed': 2}}
+
+
+@pytest.mark.parametrize('predictor', [SlopeAndBias(),
+                                       ImprovedDivision(),
+                                       ImprovedDivisionCanDealWithZero(),
+                                       DivisionWithTruncation(3)])
+def test_powers_of_3_are_counted_as_the_error_margins_check_them(predictor):
+    prediction_errors = PredictionErrors()
+    passed = {e: 0 for e in ERROR_MARGINS}
+    for length in range(2, 80):
+        seq = [3 ** i for i in range(length)]
+        prediction = predictor.predict(seq[:-1])
+        prediction_errors.add_prediction(prediction, seq[-1])
+        for e in ERROR_MARGINS:
+            passed[e] += is_up_to_error_margin(prediction, seq[-1], e)
+
+    assert {e: prediction_errors.count_passed(e) for e in ERROR_MARGINS} == passed
+
+
+def test_negative_elements_pass_only_the_error_margin_of_1_when_exact():
+    prediction_errors = PredictionErrors()
+    prediction_errors.add_prediction(-8, -8)
+    prediction_errors.add_prediction(-7, -8)
+    prediction_errors.add_prediction(None, 4)
+
+    assert prediction_errors.get_counters() == {'predictions': 2,
+                                                'skipped': 1,
+                                                'negative predictions': 2,
+                                                'exact negative predictions': 1}
+    assert prediction_errors.count_passed(1) == 1
+    assert prediction_errors.count_passed(2) == 0
+
+
+def get_random_predictions(number_of_predictions, seed):
+    rng = random.Random(seed)
+    predictions = []
+    for _ in range(number_of_predictions):
+        correct_element = rng.choice([rng.randint(-50, 50),
+                                      rng.randint(1, 10 ** 30),
+                                      rng.randint(2 ** 53, 2 ** 60),
+                                      rng.uniform(-10, 10)])
+        prediction = rng.choice([None,
+                                 correct_element,
+                                 correct_element + rng.randint(-3, 3),
+                                 correct_element * rng.uniform(0.5, 2),
+                                 -correct_element,
+                                 # predictions at the edges of the error margins, whose ratios round to them
+                                 int(correct_element) * rng.choice([2, 5]) + rng.randint(-40, 40),
+                                 int(correct_element) // rng.choice([2, 5]) + rng.randint(-40, 40),
+                                 Fraction(int(correct_element) * 11 + rng.randint(-3, 3), 10)])
+        predictions.append((prediction, correct_element))
+    return predictions
+
+
+def test_error_margins_counted_by_bisection_are_the_error_margins_checked_one_by_one():
+    error_margins = ERROR_MARGINS + [1.5, 3, 1.0001]
+    predictions = get_random_predictions(3000, 0)
+    prediction_errors = PredictionErrors()
+    for prediction, correct_element in predictions:
+        prediction_errors.add_prediction(prediction, correct_element)
+
+    predictions = [(prediction, correct_element) for prediction, correct_element in predictions
+                   if prediction is not None]
+    assert prediction_errors.count_skipped == 3000 - len(predictions)
+    assert len(prediction_errors) == len(predictions)
+    for e in error_margins:
+        passed = sum(is_up_to_error_margin(prediction, correct_element, e)
+                     for prediction, correct_element in predictions)
+        assert prediction_errors.get_error_margins_map([e])[e] == {'passed': passed,
+                                                                   'failed': len(predictions) - passed}
+
+
+def test_merged_prediction_errors_count_all_the_predictions():
+    predictions = get_random_predictions(1000, 1)
+    prediction_errors, first_half, second_half = PredictionErrors(), PredictionErrors(), PredictionErrors()
+    for i, (prediction, correct_element) in enumerate(predictions):
+        prediction_errors.add_prediction(prediction, correct_element)
+        (first_half if i < 500 else second_half).add_prediction(prediction, correct_element)
+    first_half.count_passed(2)
+    first_half.merge(second_half)
+
+    assert first_half.get_counters() == prediction_errors.get_counters()
+    assert first_half.get_error_margins_map(ERROR_MARGINS) == prediction_errors.get_error_margins_map(ERROR_MARGINS)
@@ -0,0 +1,145 @@
+from service.prediction_service import PredictionService, parse_request
+from service.request_prediction import predict_or_none, predict_requests, to_json_number
+from predictor_registry import create_predictor
+from reference_prediction import get_random_lists
+from fractions import Fraction
+import asyncio
+import json
+import pytest
+import threading
+
+PREDICTOR_NAMES = ['Division', 'DivisionFrac', 'ImprovedDivisionCanDealWithZero', 'Subtraction', 'SlopeAndBias',
+                   'ImprovedDivisionWithTruncation:3', 'WindowedPredictor:5:DivisionCanDealWithZero']
+
+SEQUENCES = [[1, 2, 4, 8], [5], [], [0, 0, 0], [3, 0, 6, 9], [7, 7, 7, 7], [2 ** 80, 2 ** 81, 2 ** 82],
+             [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12], [1.5, 3.0, 6.0], [10 ** 200, 10 ** 300, 10 ** 400],
+             [-(2 ** 63), 2 ** 63 - 1, -(2 ** 63)]] + get_random_lists(40)
+
+REQUESTS = [(PREDICTOR_NAMES[i % len(PREDICTOR_NAMES)], seq) for i, seq in enumerate(SEQUENCES * 3)]
+
+
+def get_expected_prediction(predictor_name, sequence):
+    """
+    :return: the prediction of predict on the sequence, as the service answers it
+    """
+    return to_json_number(predict_or_none(create_predictor(predictor_name), sequence))
+
+
+def test_json_numbers():
+    assert to_json_number(None) is None
+    assert to_json_number(5) == 5
+    assert to_json_number(2 ** 100) == 2 ** 100
+    assert to_json_number(Fraction(6, 3)) == 2 and isinstance(to_json_number(Fraction(6, 3)), int)
+    assert to_json_number(Fraction(1, 4)) == 0.25
+    assert to_json_number(1.5) == 1.5
+    assert to_json_number(float('nan')) == 'nan'
+    assert to_json_number(float('inf')) == 'inf'
+    assert to_json_number(Fraction(10 ** 400, 3)) == str(Fraction(10 ** 400, 3))
+
+
+def test_requests_are_predicted_like_predict():
+    predictions, seconds = predict_requests(REQUESTS)
+
+    assert predictions == [get_expected_prediction(predictor_name, seq) for predictor_name, seq in REQUESTS]
+    assert seconds >= 0
+    # the predictions are numbers json holds as they are
+    assert json.loads(json.dumps(predictions)) == predictions
+
+
+def test_requests_are_parsed():
+    assert parse_request(b'{"id": 3, "predictor": "SlopeAndBias", "sequence": [1, 2.5]}') == \
+           ({'id': 3, 'predictor': 'SlopeAndBias', 'sequence': [1, 2.5]}, None)
+    assert parse_request(b'{"statistics": true}') == ({'statistics': True}, None)
+    assert parse_request(b'[1, 2') == (None, {'id': None, 'error': 'the line is not json'})
+    assert parse_request(b'[1, 2]')[1] == {'id': None, 'error': 'a request is a json object'}
+    for line in [b'{"id": 4, "sequence": [1]}',
+                 b'{"id": 4, "predictor": "SlopeAndBias", "sequence": [1, true]}',
+                 b'{"id": 4, "predictor": "SlopeAndBias", "sequence": "1, 2"}',
+                 b'{"id": 4, "predictor": "NotAPredictor", "sequence": [1]}',
+                 b'{"id": 4, "predictor": "DivisionWithTruncation", "sequence": [1]}']:
+        request, error_response = parse_request(line)
+        assert error_response['id'] == 4
+        assert isinstance(error_response['error'], str)
+
+
+def run_service(coroutine_function, **kwargs):
+    """
+    :return: what coroutine_function returns when it is awaited with a started PredictionService
+    """
+    async def run():
+        service = PredictionService(**kwargs)
+        await service.start()
+        try:
+            return await coroutine_function(service)
+        finally:
+            await service.stop()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('max_batch_size', [1, 8, 1000])
+def test_micro_batches_are_predicted_like_predict(max_batch_size):
+    async def predict_all(service):
+        results = await asyncio.gather(*(service.predict(predictor_name, seq) for predictor_name, seq in REQUESTS))
+        return results, service.get_statistics()
+
+    results, statistics = run_service(predict_all, number_of_workers=2, max_batch_size=max_batch_size,
+                                      max_batch_delay=0.05)
+
+    assert [prediction for prediction, _, _ in results] == \
+           [get_expected_prediction(predictor_name, seq) for predictor_name, seq in REQUESTS]
+    batch_sizes = [batch_size for _, _, batch_size in results]
+    assert max(batch_sizes) <= max_batch_size
+    # the requests that arrive together are predicted together
+    assert max(batch_sizes) == min(max_batch_size, len(REQUESTS)) or statistics['batches'] < len(REQUESTS)
+    assert statistics['requests'] == len(REQUESTS)
+    assert statistics['batches'] >= len(REQUESTS) / max_batch_size
+    assert all(0 <= latency['queued'] <= latency['total'] for _, latency, _ in results)
+
+
+def test_connection_answers_each_request():
+    lines = [json.dumps({'id': i, 'predictor': predictor_name, 'sequence': seq}).encode() + b'\n'
+             for i, (predictor_name, seq) in enumerate(REQUESTS)]
+    lines[5: 5] = [b'not json\n', b'\n', json.dumps({'id': 'bad', 'predictor': 'SlopeAndBias'}).encode() + b'\n']
+
+    async def send_requests(service):
+        server = await asyncio.start_server(service.handle_connection, '127.0.0.1', 0)
+        async with server:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            writer.writelines(lines)
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in range(len(REQUESTS) + 2)]
+
+            writer.write(b'{"id": "statistics", "statistics": true}\n')
+            await writer.drain()
+            statistics_response = json.loads(await reader.readline())
+            writer.close()
+            await writer.wait_closed()
+        return responses, statistics_response
+
+    responses, statistics_response = run_service(send_requests, number_of_workers=2, max_batch_size=16)
+
+    responses_by_id = {response['id']: response for response in responses}
+    assert len(responses_by_id) == len(REQUESTS) + 2
+    assert 'error' in responses_by_id[None] and 'error' in responses_by_id['bad']
+    for i, (predictor_name, seq) in enumerate(REQUESTS):
+        assert responses_by_id[i]['prediction'] == get_expected_prediction(predictor_name, seq)
+    assert statistics_response['id'] == 'statistics'
+    assert statistics_response['statistics']['requests'] == len(REQUESTS)
+
+
+def test_stop_does_not_block_the_event_loop():
+    shutdown_threads = []
+
+    async def stop_after_predicting(service):
+        shutdown = service.executor.shutdown
+
+        def record_shutdown(*args, **kwargs):
+            shutdown_threads.append(threading.current_thread())
+            shutdown(*args, **kwargs)
+
+        service.executor.shutdown = record_shutdown
+        return await service.predict('Subtraction', [1, 4, 9, 16])
+
+    assert run_service(stop_after_predicting, number_of_workers=1)[0] == 25
+    assert len(shutdown_threads) == 1 and shutdown_threads[0] is not threading.main_thread()
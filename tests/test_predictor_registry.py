@@ -0,0 +1,53 @@
+from predictor_registry import create_predictor, get_predictor_names, parse_predictor_name
+import inspect
+import predictors
+import pytest
+
+
+def get_predictor_classes():
+    """
+    :return: the names of the predictor classes in predictors.py, the classes with predict and get_name, the abstract
+    base class aside
+    """
+    return {name for name, value in vars(predictors).items()
+            if inspect.isclass(value) and value.__module__ == predictors.__name__
+            and value is not predictors.AbstractStaticPredictor
+            and hasattr(value, 'predict') and hasattr(value, 'get_name')}
+
+
+def test_every_predictor_class_is_registered():
+    assert get_predictor_classes() == set(get_predictor_names())
+
+
+@pytest.mark.parametrize('predictor_name', [name for name in get_predictor_names()
+                                            if name != 'WindowedPredictor'])
+def test_every_predictor_is_created_by_its_name(predictor_name):
+    if isinstance(getattr(predictors, predictor_name), predictors.TruncationWrapperCreator):
+        predictor_name += ':3'
+    predictor = create_predictor(predictor_name)
+
+    assert type(predictor).__name__ == predictor_name.split(':')[0]
+    assert predictor.predict([1, 2, 4, 8, 16]) is not None
+
+
+def test_windowed_predictor_is_created_with_the_predictor_it_wraps():
+    predictor = create_predictor('WindowedPredictor:3:ImprovedDivisionWithTruncation:2')
+
+    assert isinstance(predictor, predictors.WindowedPredictor)
+    assert predictor.window_size == 3
+    assert predictor.predictor.truncation_value == 2
+    lis = [5, 1, 2, 4, 8]
+    assert predictor.predict(lis) == predictors.ImprovedDivisionWithTruncation(2).predict(lis[-3:])
+
+
+@pytest.mark.parametrize('predictor_name', ['Foo',
+                                            'SlopeAndBias:3',
+                                            'DivisionWithTruncation',
+                                            'DivisionWithTruncation:x',
+                                            'WindowedPredictor',
+                                            'WindowedPredictor:20',
+                                            'WindowedPredictor:0:Subtraction',
+                                            'WindowedPredictor:20:Foo'])
+def test_invalid_names_are_rejected(predictor_name):
+    with pytest.raises(ValueError):
+        parse_predictor_name(predictor_name)
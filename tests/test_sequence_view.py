@@ -0,0 +1,79 @@
+from sequence_view import SequenceView, get_index_of_last_occurrence, get_view, to_list
+from predictor_registry import create_predictor, get_predictor_names
+from reference_prediction import get_random_lists, predict_or_error
+import array
+import pytest
+
+LISTS = [[i ** 3 - 4 * i for i in range(1, 20)], [3 ** i for i in range(20)], [5, 0, 0, 3, 7, 0, 11, 13, 0, 2],
+         [0, 0, 0], [7], []] + get_random_lists(30)
+
+
+def get_views(lis):
+    """
+    :return: lis in each of the forms predict takes, and a view of it in the middle of a longer list
+    """
+    views = [tuple(lis), array.array('q', lis), memoryview(array.array('q', lis)), SequenceView(lis),
+             SequenceView([11, 12] + lis + [13], 2, 2 + len(lis)), SequenceView(SequenceView([11] + lis), 1)]
+    try:
+        import numpy as np
+        views.append(np.array(lis, dtype=np.int64))
+    except ImportError:
+        pass
+    return views
+
+
+def get_predictors():
+    predictors = []
+    for predictor_name in get_predictor_names():
+        if predictor_name.endswith('WithTruncation'):
+            predictor_name += ':3'
+        elif predictor_name == 'WindowedPredictor':
+            predictor_name += ':4:Subtraction'
+        predictors.append(create_predictor(predictor_name))
+    return predictors
+
+
+@pytest.mark.parametrize('predictor', get_predictors(), ids=lambda predictor: predictor.get_name())
+def test_views_are_predicted_like_lists(predictor):
+    for lis in LISTS:
+        expected_prediction = predict_or_error(predictor.predict, lis)
+        for view in get_views(lis):
+            prediction = predict_or_error(predictor.predict, view)
+            assert prediction == expected_prediction
+            # numpy numbers are converted to python numbers, which do not overflow
+            assert type(prediction) is type(expected_prediction)
+
+
+@pytest.mark.parametrize('lis', LISTS, ids=str)
+def test_views_behave_like_lists(lis):
+    for view in get_views(lis):
+        view = SequenceView(view)
+        assert len(view) == len(lis)
+        assert list(view) == lis
+        assert to_list(view) == lis
+        assert view[1: -1].to_list() == lis[1: -1]
+        assert view[::-1] == lis[::-1]
+        assert view[-3:][:2].to_list() == lis[-3:][:2]
+        assert (0 in view) == (0 in lis)
+        assert get_index_of_last_occurrence(view, 0) == get_index_of_last_occurrence(lis, 0)
+        if len(lis) > 0:
+            assert view[-1] == lis[-1]
+            assert type(view[0]) is int
+
+
+def test_index_of_last_occurrence():
+    assert get_index_of_last_occurrence([0, 1, 0, 2], 0) == 2
+    assert get_index_of_last_occurrence([1, 2], 0) is None
+    assert get_index_of_last_occurrence([0], 0) == 0
+
+
+def test_views_of_lists_are_not_copied():
+    lis = [5, 0, 1, 2, 0, 3, 4]
+    view = get_view(lis)
+
+    assert isinstance(view, SequenceView)
+    assert view.to_list() is lis
+    assert view[2:].base is lis
+    assert view[2:].to_list() == [1, 2, 0, 3, 4]
+    assert get_index_of_last_occurrence(view[1:], 0) == 3
+    assert get_index_of_last_occurrence(view[:4], 0) == 1
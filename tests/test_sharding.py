@@ -0,0 +1,117 @@
+from testing_on_oeis.sharding import CLAIM_FILE_NAME, claim_shard, get_names_of_shard, get_shard_directory, \
+    merge_shards, plan_shards, score_shard, split_names_to_shards
+from testing_on_oeis.oeis_cache import get_name_number
+from predictor_registry import create_predictor
+from reference_prediction import ERROR_MARGINS, get_score_of_prediction_errors, score_by_predict
+from definitions import ROOT_DIR
+from concurrent.futures import ProcessPoolExecutor
+import os
+import subprocess
+import sys
+import pytest
+
+PREDICTOR_NAMES = ['Division', 'ImprovedDivisionCanDealWithZero', 'SlopeAndBias', 'DivisionWithTruncation:3',
+                   'WindowedPredictor:6:Subtraction']
+PREDICTORS = [create_predictor(predictor_name) for predictor_name in PREDICTOR_NAMES]
+
+
+def plan(oeis_directory, shared_directory, number_of_shards):
+    return plan_shards(shared_directory, PREDICTOR_NAMES, ERROR_MARGINS, number_of_shards, oeis_directory)
+
+
+@pytest.mark.parametrize('number_of_shards', [1, 3, 7, 1000])
+def test_shards_split_the_names(number_of_shards):
+    names = [f'A{number:06d}' for number in [4, 1, 2, 9, 10, 11, 30, 31, 32, 33]]
+
+    shards = split_names_to_shards(names, number_of_shards)
+
+    assert len(shards) == min(number_of_shards, len(names))
+    assert sum(shard['number of sequences'] for shard in shards) == len(names)
+    assert max(shard['number of sequences'] for shard in shards) - \
+           min(shard['number of sequences'] for shard in shards) <= 1
+    name_numbers = list(map(get_name_number, names)) + [100, 123456]
+    names_of_shards = [get_names_of_shard(shard, name_numbers) for shard in shards]
+    # every A-number, even one that is not in the corpus yet, is in exactly one shard
+    assert sorted(name for names_of_shard in names_of_shards for name in names_of_shard) == \
+           sorted(f'A{number:06d}' for number in name_numbers)
+    assert [len(names_of_shard) for names_of_shard in names_of_shards[:-1]] == \
+           [shard['number of sequences'] for shard in shards[:-1]]
+
+
+@pytest.mark.parametrize('number_of_shards', [1, 4])
+def test_merged_shards_are_the_scores_of_predict(oeis_directory, oeis_sequences, tmp_path, number_of_shards):
+    shared_directory = str(tmp_path / 'shared')
+    plan(oeis_directory, shared_directory, number_of_shards)
+
+    scored_shards = []
+    while (shard_index := score_shard(shared_directory, None, oeis_directory, chunk_size=9,
+                                      checkpoint_interval=0)) is not None:
+        scored_shards.append(shard_index)
+    scores, incomplete_shards = merge_shards(shared_directory)
+
+    assert scored_shards == list(range(number_of_shards))
+    assert incomplete_shards == []
+    assert get_score_of_prediction_errors(scores) == score_by_predict(PREDICTORS, [seq for _, seq in oeis_sequences])
+
+
+def test_merge_of_some_shards_is_the_scores_of_predict_on_them(oeis_directory, oeis_sequences, tmp_path):
+    shared_directory = str(tmp_path / 'shared')
+    manifest = plan(oeis_directory, shared_directory, 4)
+    score_shard(shared_directory, 1, oeis_directory, number_of_workers=2, chunk_size=9, use_shared_memory=False)
+    score_shard(shared_directory, 3, oeis_directory, chunk_size=9)
+
+    scores, incomplete_shards = merge_shards(shared_directory)
+
+    names = get_names_of_shard(manifest['shards'][1], range(1, len(oeis_sequences) + 1)) | \
+        get_names_of_shard(manifest['shards'][3], range(1, len(oeis_sequences) + 1))
+    assert incomplete_shards == [0, 2]
+    assert get_score_of_prediction_errors(scores) == \
+           score_by_predict(PREDICTORS, [seq for name, seq in oeis_sequences if name in names])
+    assert merge_shards(shared_directory, [3])[1] == []
+    # scoring a shard again resumes it, and adds nothing to it
+    score_shard(shared_directory, 1, oeis_directory, chunk_size=9)
+    assert get_score_of_prediction_errors(merge_shards(shared_directory)[0]) == get_score_of_prediction_errors(scores)
+
+
+def claim(shared_directory):
+    return claim_shard(shared_directory, 12)
+
+
+def test_shards_are_claimed_once(tmp_path):
+    shared_directory = str(tmp_path / 'shared')
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        claims = list(executor.map(claim, [shared_directory] * 20))
+
+    assert sorted(claim for claim in claims if claim is not None) == list(range(12))
+    assert claims.count(None) == 8
+    assert all(os.path.exists(os.path.join(get_shard_directory(shared_directory, shard_index), CLAIM_FILE_NAME))
+               for shard_index in range(12))
+
+
+def test_shards_are_planned_once(oeis_directory, tmp_path):
+    shared_directory = str(tmp_path / 'shared')
+    plan(oeis_directory, shared_directory, 2)
+
+    with pytest.raises(ValueError):
+        plan(oeis_directory, shared_directory, 3)
+    with pytest.raises(ValueError):
+        plan_shards(str(tmp_path / 'other'), ['NotAPredictor'], ERROR_MARGINS, 2, oeis_directory)
+
+
+def test_command_line(oeis_directory, tmp_path):
+    shared_directory = str(tmp_path / 'shared')
+
+    def run(*arguments):
+        return subprocess.run([sys.executable, '-m', 'testing_on_oeis.main_sharded_testing', *arguments],
+                              cwd=ROOT_DIR, capture_output=True, text=True)
+
+    assert run('plan', shared_directory, '--shards', '2', '--predictors', *PREDICTOR_NAMES,
+               '--oeis-directory', oeis_directory).returncode == 0
+    assert run('score', shared_directory, '--workers', '1', '--oeis-directory', oeis_directory).stdout == \
+           'scored shard 0\n'
+    assert run('merge', shared_directory).returncode == 1
+    assert run('score', shared_directory, '--workers', '1', '--oeis-directory', oeis_directory).returncode == 0
+    assert run('score', shared_directory, '--workers', '1', '--oeis-directory', oeis_directory).stdout == ''
+    merge = run('merge', shared_directory)
+    assert merge.returncode == 0
+    assert 'SlopeAndBias' in merge.stdout
@@ -0,0 +1,82 @@
+from testing_on_oeis.shared_corpus import SharedOEISCorpus, create_shared_corpus
+from testing_on_oeis.testing_functions import get_outcomes_of_shared_corpus_chunk, \
+    score_predictors_on_shared_corpus_chunk, t_prediction_function
+from testing_on_oeis.oeis_cache import MAXIMAL_INT64, MINIMAL_INT64
+from predictors import *
+from reference_prediction import ERROR_MARGINS, get_score_of_prediction_errors, score_by_predict
+import pytest
+
+PREDICTORS = [Division(), ImprovedDivision(), DivisionCanDealWithZero(), ImprovedDivisionCanDealWithZero(),
+              Subtraction(), SlopeAndBias(), DivisionWithTruncation(3), WindowedPredictor(Subtraction(), 6)]
+
+
+def test_shared_corpus_has_the_sequences(oeis_sequences):
+    with create_shared_corpus(oeis_sequences) as shared_corpus:
+        assert len(shared_corpus) == len(oeis_sequences)
+        assert list(shared_corpus) == oeis_sequences
+        # another process attaches to it by its name
+        with SharedOEISCorpus(shared_corpus.name) as attached_corpus:
+            assert [(attached_corpus.get_name(i), list(attached_corpus.get_view(i)))
+                    for i in range(len(attached_corpus))] == oeis_sequences
+            assert attached_corpus.get_index('A000003') == 2
+
+
+def test_shared_memory_is_freed_by_its_owner(oeis_sequences):
+    with create_shared_corpus(oeis_sequences) as shared_corpus:
+        name = shared_corpus.name
+        # a worker that closes the corpus does not free it
+        SharedOEISCorpus(name).close()
+        SharedOEISCorpus(name).close()
+
+    with pytest.raises(FileNotFoundError):
+        SharedOEISCorpus(name)
+
+
+def test_views_of_shared_corpus_are_predicted_like_lists():
+    names_and_sequences = [('A000001', [1, 2, 3]),
+                           ('A000002', []),
+                           ('A000003', [MAXIMAL_INT64 - 10, MAXIMAL_INT64 - 5, MAXIMAL_INT64]),
+                           ('A000004', [MINIMAL_INT64, MINIMAL_INT64 // 2, MINIMAL_INT64 // 4]),
+                           ('A000005', [2 ** 70, 2 ** 71, 2 ** 72]),
+                           ('A000006', [0, 0, 3, 0, 9, 0, 27])]
+    sequences = [seq for _, seq in names_and_sequences]
+
+    with create_shared_corpus(names_and_sequences) as shared_corpus:
+        chunk = (shared_corpus.name, 0, len(shared_corpus))
+        assert get_score_of_prediction_errors(score_predictors_on_shared_corpus_chunk(PREDICTORS, chunk)) == \
+               score_by_predict(PREDICTORS, sequences)
+        name_numbers, _ = get_outcomes_of_shared_corpus_chunk(PREDICTORS, chunk)
+        assert name_numbers == [1, 2, 3, 4, 5, 6]
+        for i, seq in enumerate(sequences):
+            for predictor in PREDICTORS:
+                assert predictor.predict(shared_corpus.get_view(i)) == predictor.predict(seq)
+
+
+@pytest.mark.parametrize('number_of_workers, chunk_size', [(2, 7), (3, 1000)])
+def test_scores_of_shared_corpus_are_the_scores_of_predict(oeis_directory, oeis_sequences, number_of_workers,
+                                                          chunk_size):
+    scores = t_prediction_function(PREDICTORS,
+                                   ERROR_MARGINS,
+                                   oeis_directory,
+                                   limit_number_of_seqs_to_load=100,
+                                   number_of_workers=number_of_workers,
+                                   chunk_size=chunk_size,
+                                   number_of_seqs_to_skip=4,
+                                   use_shared_memory=True)
+
+    assert get_score_of_prediction_errors(scores) == \
+           score_by_predict(PREDICTORS, [seq for _, seq in oeis_sequences[4: 104]])
+
+
+def test_checkpointed_scores_of_shared_corpus_are_the_scores_of_predict(oeis_directory, oeis_sequences, tmp_path):
+    scores = t_prediction_function(PREDICTORS,
+                                   ERROR_MARGINS,
+                                   oeis_directory,
+                                   number_of_workers=2,
+                                   chunk_size=7,
+                                   checkpoint_directory=str(tmp_path / 'run'),
+                                   checkpoint_interval=0,
+                                   use_shared_memory=True)
+
+    assert get_score_of_prediction_errors(scores) == score_by_predict(PREDICTORS, [seq for _, seq in oeis_sequences])
+    assert (tmp_path / 'run' / 'checkpoint.json').exists()
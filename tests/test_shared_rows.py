@@ -0,0 +1,51 @@
+from abstract_prediction_methods import SharedRows
+from predictor_registry import create_predictor, get_predictor_names
+from predictors import *
+from reference_prediction import get_random_lists, predict_by_recursion, predict_or_error
+import pytest
+
+LISTS = [[i ** 3 - 4 * i for i in range(1, 20)], [3 ** i for i in range(20)], [2 ** 100 + i for i in range(8)],
+         [5, 0, 0, 3, 7, 0, 11, 13, 0, 2], [0, 0, 0], [0, 1], [7], []] + get_random_lists(40)
+
+
+def get_predictors():
+    predictors = []
+    for predictor_name in get_predictor_names():
+        if predictor_name.endswith('WithTruncation'):
+            predictor_name += ':3'
+        elif predictor_name == 'WindowedPredictor':
+            predictor_name += ':5:ImprovedDivision'
+        predictors.append(create_predictor(predictor_name))
+    return predictors
+
+
+def test_predictors_sharing_rows_predict_like_each_alone():
+    predictors = get_predictors()
+    for lis in LISTS:
+        # the predictors share the rows in both orders, each one takes the rows another created
+        for ordered_predictors in [predictors, predictors[::-1]]:
+            shared_rows = SharedRows(lis)
+            for predictor in ordered_predictors:
+                expected_prediction = predict_or_error(predictor.predict, lis)
+                assert predict_or_error(predictor.predict, lis, shared_rows) == expected_prediction
+
+
+@pytest.mark.parametrize('predictor', [Division(), ImprovedDivision(), DivisionCanDealWithZero(),
+                                       ImprovedDivisionCanDealWithZero(), Subtraction(), SlopeAndBias()],
+                         ids=lambda predictor: predictor.get_name())
+def test_predictions_from_shared_rows_are_the_predictions_of_the_recursion(predictor):
+    for lis in LISTS:
+        assert predict_or_error(predictor.predict, lis, SharedRows(lis)) == \
+               predict_or_error(predict_by_recursion, predictor, lis)
+
+
+def test_rows_are_computed_once():
+    lis = [1, 2, 4, 8, 16]
+    shared_rows = SharedRows(lis)
+    Division().predict(lis, shared_rows)
+    rows = dict(shared_rows.rows)
+    ImprovedDivision().predict(lis, shared_rows)
+    DivisionCanDealWithZero().predict(lis, shared_rows)
+
+    assert len(rows) > 0
+    assert all(shared_rows.rows[name] is row for name, row in rows.items())
@@ -0,0 +1,26 @@
+from abstract_prediction_methods import predict_next_element, predict_next_elements_side_by_side
+from predictors import *
+from reference_prediction import get_random_lists, predict_by_recursion, predict_or_error
+import pytest
+
+LISTS = [[1, 3, 7, 15, 31, 63, 127], [2 ** i + i for i in range(30)], [1.5, 2.5, 4.5, 8.5], [5, 0, 0, 3, 7, 0, 11],
+         [0, 1, 0, 2, 0, 4], [-3, 4, -5, 6, 0, -7, 8], [4, 4, 4, 4], [2, 3], [9]] + get_random_lists(80)
+
+
+@pytest.mark.parametrize('lis', LISTS, ids=str)
+def test_slopes_and_biases_reduced_side_by_side_predict_like_the_pairs(lis):
+    assert predict_or_error(SlopeAndBias().predict, lis) == predict_or_error(predict_by_recursion, SlopeAndBias(), lis)
+
+
+def test_lists_reduced_side_by_side_stop_at_the_first_base_case():
+    lists = [[1, 4, 9, 16, 25], [1, 2, 4, 8, 0, 1]]
+    predictors = [Subtraction(), Division()]
+
+    # the second list contains a zero, which is the base case of Division, so the first list is not reduced either
+    expected_predictions = [Subtraction().inference_function(lists[0], Subtraction().get_base_case_number([])),
+                            predict_next_element(lists[1],
+                                                 Division().base_case,
+                                                 Division().reduce_function,
+                                                 Division().inference_function)]
+
+    assert predict_next_elements_side_by_side(lists, predictors) == expected_predictions
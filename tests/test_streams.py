@@ -0,0 +1,101 @@
+from abstract_prediction_methods import RebuildingReductionTable, ReductionTable, HistoryReductionTable
+from predictor_registry import create_predictor, get_predictor_names
+from extend_prediction_capabilities import create_prediction_series
+from predictors import *
+import pytest
+import random
+
+
+def get_lists():
+    rng = random.Random(0)
+    lists = [[i ** 3 - 4 * i for i in range(12)],
+             [3 ** i for i in range(12)],
+             [0, 1, 0, 2, 0, 4, 0, 8, 1, 16, 2],
+             [5, 0, 0, 3, 7, 0, 11, 13, 0, 2],
+             [1, 1, 2, 3, 5, 8, 13, 21, 34, 55],
+             [-3, 4, -5, 6, 0, -7, 8, 10, 2]]
+    lists += [[rng.randint(-5, 20) for _ in range(rng.randint(1, 14))] for _ in range(30)]
+    return lists
+
+
+def get_predictors():
+    predictors = []
+    for predictor_name in get_predictor_names():
+        if predictor_name == 'WindowedPredictor' or predictor_name.endswith('WithKernel'):
+            continue
+        if predictor_name.endswith('WithTruncation'):
+            predictor_name += ':3'
+        predictors.append(create_predictor(predictor_name))
+    return predictors + [WindowedPredictor(Subtraction(), 4), WindowedPredictor(ImprovedDivision(), 5),
+                         WindowedPredictor(DivisionCanDealWithZero(), 5)]
+
+
+def predict_or_error(predict, *args):
+    # the predictors raise on some lists, such as lists with zeros, and so should their streams
+    try:
+        return predict(*args)
+    except (ZeroDivisionError, OverflowError, ValueError) as e:
+        return type(e)
+
+
+@pytest.mark.parametrize('predictor', get_predictors(), ids=lambda predictor: type(predictor).__name__)
+def test_stream_predicts_every_prefix_like_predict(predictor):
+    for lis in get_lists():
+        stream = predictor.stream()
+        for i, element in enumerate(lis):
+            stream.push(element)
+            assert predict_or_error(stream.peek_next) == predict_or_error(predictor.predict, lis[: i + 1])
+
+
+@pytest.mark.parametrize('predictor', [DivisionWithKernel(), DivisionCanDealWithZeroWithKernel(),
+                                       SubtractionWithKernel()], ids=lambda predictor: type(predictor).__name__)
+def test_stream_of_kernel_predicts_like_the_reduction_table(predictor):
+    # the stream extends the reduction table, which rounds differently from the kernel, and overflows differently
+    table_predictor = type(predictor).__mro__[1]()
+    for lis in get_lists():
+        stream = predictor.stream()
+        for i, element in enumerate(lis):
+            stream.push(element)
+            assert predict_or_error(stream.peek_next) == predict_or_error(table_predictor.predict, lis[: i + 1])
+
+
+@pytest.mark.parametrize('predictor_class, table_class', [(Subtraction, ReductionTable),
+                                                          (Division, ReductionTable),
+                                                          (DivisionCanDealWithZero, RebuildingReductionTable),
+                                                          (ImprovedDivisionCanDealWithZero, RebuildingReductionTable)])
+def test_only_the_predictors_with_undefined_steps_keep_their_list(predictor_class, table_class):
+    table = predictor_class().create_reduction_table([2, 0, 3, 5])
+
+    assert type(table) is table_class
+    assert hasattr(table, 'history') == (table_class is RebuildingReductionTable)
+
+
+def test_truncated_predictors_predict_from_scratch():
+    assert type(DivisionWithTruncation(3).create_reduction_table()) is HistoryReductionTable
+
+
+def test_rebuilding_table_is_rebuilt_only_when_a_maximum_changes():
+    table = DivisionCanDealWithZero().create_reduction_table([3, 0, 6, 9])
+    number_of_rebuilds = table.number_of_rebuilds
+    # the defined ratios are 0 and 1.5, so 6 / 0 is the maximal ratio 1.5. 10 / 9 does not change it, 100 / 10 does
+    table.append(10)
+    assert table.number_of_rebuilds == number_of_rebuilds
+    table.append(100)
+    assert table.number_of_rebuilds == number_of_rebuilds + 1
+
+
+def test_table_without_undefined_steps_is_never_rebuilt():
+    table = DivisionCanDealWithZero().create_reduction_table([1, 2, 4])
+    number_of_rebuilds = table.number_of_rebuilds
+    for element in [8, 16, 3, 100]:
+        table.append(element)
+    assert table.number_of_rebuilds == number_of_rebuilds
+
+
+@pytest.mark.parametrize('predictor', [Subtraction(), ImprovedDivisionCanDealWithZero(), SlopeAndBias(),
+                                       DivisionWithTruncation(2)], ids=lambda predictor: type(predictor).__name__)
+def test_prediction_series_is_made_of_the_predictions_of_the_prefixes(predictor):
+    lis = [1, 3, 7, 15, 31, 64, 127, 255]
+
+    predictions_of_prefixes = [predictor.predict(lis[:i]) for i in range(1, len(lis))]
+    assert create_prediction_series(lis, predictor) == [lis[0]] + predictions_of_prefixes
@@ -0,0 +1,104 @@
+from testing_on_oeis.testing_functions import get_outcomes_of_chunk, score_predictors_on_chunk, \
+    score_predictors_on_sorted_chunk, t_prediction_function
+from predictors import *
+from reference_prediction import ERROR_MARGINS, get_score_of_prediction_errors, score_by_predict
+import pytest
+
+PREDICTORS = [Division(), ImprovedDivision(), DivisionCanDealWithZero(), ImprovedDivisionCanDealWithZero(),
+              Subtraction(), SlopeAndBias(), DivisionWithTruncation(3), WindowedPredictor(Subtraction(), 6)]
+
+
+@pytest.mark.parametrize('number_of_workers, chunk_size', [(1, 1000), (1, 7), (2, 7)])
+def test_scores_are_the_scores_of_predict(oeis_directory, oeis_sequences, number_of_workers, chunk_size):
+    scores = t_prediction_function(PREDICTORS,
+                                   ERROR_MARGINS,
+                                   oeis_directory,
+                                   number_of_workers=number_of_workers,
+                                   chunk_size=chunk_size,
+                                   use_shared_memory=False)
+
+    assert get_score_of_prediction_errors(scores) == score_by_predict(PREDICTORS, [seq for _, seq in oeis_sequences])
+
+
+@pytest.mark.parametrize('number_of_workers', [1, 2])
+def test_scores_of_cache_are_the_scores_of_predict(oeis_directory, oeis_sequences, number_of_workers):
+    # the workers of a parallel run read their chunks from the cache themselves
+    scores = t_prediction_function(PREDICTORS,
+                                   ERROR_MARGINS,
+                                   oeis_directory,
+                                   number_of_workers=number_of_workers,
+                                   chunk_size=7,
+                                   number_of_seqs_to_skip=3,
+                                   use_cache=True,
+                                   use_shared_memory=False)
+
+    assert get_score_of_prediction_errors(scores) == \
+           score_by_predict(PREDICTORS, [seq for _, seq in oeis_sequences[3:]])
+
+
+@pytest.mark.parametrize('number_of_workers, chunk_size', [(1, 1000), (1, 9), (2, 9)])
+def test_scores_of_shared_prefixes_are_the_scores_of_predict(oeis_directory, oeis_sequences, number_of_workers,
+                                                             chunk_size):
+    scores = t_prediction_function(PREDICTORS,
+                                   ERROR_MARGINS,
+                                   oeis_directory,
+                                   number_of_workers=number_of_workers,
+                                   chunk_size=chunk_size,
+                                   share_prefixes=True,
+                                   use_shared_memory=False)
+
+    assert get_score_of_prediction_errors(scores) == score_by_predict(PREDICTORS, [seq for _, seq in oeis_sequences])
+
+
+def test_sorted_chunk_predicts_like_predict_where_the_walk_branches():
+    # a trie with long shared prefixes, branches at every depth and sequences that are prefixes of others
+    base = [i ** 2 - 3 * i + 1 for i in range(30)]
+    sequences = sorted([base[:length] + [extra] for length in range(1, 30, 3) for extra in range(-2, 12)]
+                       + [base[:length] for length in range(1, 31)])
+
+    assert get_score_of_prediction_errors(score_predictors_on_sorted_chunk(PREDICTORS, sequences)) == \
+           score_by_predict(PREDICTORS, sequences)
+
+
+def test_sequences_are_skipped_and_limited_as_in_the_file(oeis_directory, oeis_sequences):
+    scores = t_prediction_function(PREDICTORS,
+                                   ERROR_MARGINS,
+                                   oeis_directory,
+                                   limit_number_of_seqs_to_load=30,
+                                   number_of_workers=2,
+                                   chunk_size=4,
+                                   number_of_seqs_to_skip=10,
+                                   use_shared_memory=False)
+
+    assert get_score_of_prediction_errors(scores) == \
+           score_by_predict(PREDICTORS, [seq for _, seq in oeis_sequences[10: 40]])
+
+
+def test_empty_sequences_are_skipped_as_predict_skips_them():
+    predictors = [Division(), Subtraction(), SlopeAndBias()]
+    sequences = [[], [1, 2, 3], [], [4]]
+
+    scores = score_predictors_on_chunk(predictors, sequences)
+
+    assert get_score_of_prediction_errors(scores) == score_by_predict(predictors, sequences)
+    assert [prediction_errors.count_skipped for prediction_errors in scores] == [3, 3, 3]
+
+
+def test_sorted_chunk_skips_empty_sequences():
+    predictors = [Division(), Subtraction(), SlopeAndBias()]
+    sequences = sorted([[], [1, 2, 3], [], [1, 2, 4], [4]])
+
+    scores = score_predictors_on_sorted_chunk(predictors, sequences)
+
+    assert get_score_of_prediction_errors(scores) == score_by_predict(predictors, sequences)
+
+
+def test_outcomes_of_empty_sequences_are_skipped():
+    predictors = [Division(), Subtraction()]
+
+    name_numbers, outcomes = get_outcomes_of_chunk(predictors, [('A000001', []), ('A000002', [3, 3, 3])])
+
+    assert name_numbers == [1, 2]
+    assert len(outcomes) == 4
+    assert all(outcome != outcome for outcome in outcomes[:2])
+    assert list(outcomes[2:]) == [1.0, 1.0]
@@ -0,0 +1,48 @@
+from predictors import DivisionWithTruncation, ImprovedDivisionWithTruncation, TruncationWrapperCreator
+import pytest
+import random
+
+TRUNCATE_IN_PYTHON = TruncationWrapperCreator.TRUNCATE_IN_PYTHON
+TRUNCATE_WITH_NUMPY = TruncationWrapperCreator.TRUNCATE_WITH_NUMPY
+
+
+def get_numbers():
+    rng = random.Random(0)
+    numbers = [rng.uniform(-1000, 1000) for _ in range(1000)]
+    numbers += [rng.randint(-10 ** 6, 10 ** 6) / 8 for _ in range(1000)]
+    numbers += [0.125, 2.5, -2.5, 1250.0, 1350.0, 1e300, -1e-300, 2.0 ** 60 + 0.5, float('inf'), float('nan')]
+    return numbers
+
+
+@pytest.mark.parametrize('truncation_value', [-5, -3, -2, -1, 0, 1, 2, 3, 7, 15, 23, 30])
+def test_numpy_rounds_like_python(truncation_value):
+    batch_truncation = pytest.importorskip('batch_truncation')
+    numbers = get_numbers()
+    expected = [round(x, truncation_value) for x in numbers]
+
+    truncated = batch_truncation.truncate_array(numbers, truncation_value)
+    # nan is not equal to itself
+    assert [str(x) for x in truncated] == [str(x) for x in expected]
+
+
+@pytest.mark.parametrize('truncation_value', [-3, -2, -1, 0, 3])
+def test_the_ways_to_truncate_give_the_same_lists(truncation_value):
+    pytest.importorskip('numpy')
+    numbers = get_numbers()
+
+    truncated_in_python = TruncationWrapperCreator.truncate_array(numbers, truncation_value, TRUNCATE_IN_PYTHON)
+    truncated_with_numpy = TruncationWrapperCreator.truncate_array(numbers, truncation_value, TRUNCATE_WITH_NUMPY)
+    truncated_by_default = TruncationWrapperCreator.truncate_array(numbers, truncation_value)
+    assert [str(x) for x in truncated_with_numpy] == [str(x) for x in truncated_in_python]
+    assert [str(x) for x in truncated_by_default] == [str(x) for x in truncated_in_python]
+
+
+@pytest.mark.parametrize('predictor_class', [DivisionWithTruncation, ImprovedDivisionWithTruncation])
+@pytest.mark.parametrize('truncation_value', [-2, 0, 3])
+def test_truncated_predictors_predict_the_same_with_numpy(predictor_class, truncation_value):
+    pytest.importorskip('numpy')
+    rng = random.Random(truncation_value)
+    for _ in range(20):
+        lis = [rng.randint(1, 10 ** 6) for _ in range(40)]
+        assert str(predictor_class(truncation_value, TRUNCATE_WITH_NUMPY).predict(lis)) \
+            == str(predictor_class(truncation_value, TRUNCATE_IN_PYTHON).predict(lis))
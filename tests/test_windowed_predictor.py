@@ -0,0 +1,48 @@
+from abstract_prediction_methods import HistoryWindowStream, SlidingWindowStream
+from predictors import *
+from reference_prediction import get_random_lists, predict_by_recursion, predict_or_error
+import pytest
+
+LISTS = [[i ** 3 - 4 * i for i in range(40)], [3 ** i for i in range(40)], [5, 0, 0, 3, 7, 0, 11, 13, 0, 2],
+         [1.5, 2.5, 4.5, 8.5, 16.5]] + get_random_lists(30, maximal_length=40)
+
+PREDICTORS = [Subtraction(), Division(), ImprovedDivision(), DivisionCanDealWithZero(), SlopeAndBias(),
+              DivisionWithTruncation(2)]
+
+
+def get_windowed_predictors():
+    return [WindowedPredictor(predictor, window_size) for predictor in PREDICTORS for window_size in [1, 3, 8]]
+
+
+@pytest.mark.parametrize('windowed_predictor', get_windowed_predictors(), ids=lambda predictor: predictor.get_name())
+def test_window_is_predicted_like_the_last_elements_alone(windowed_predictor):
+    for lis in LISTS:
+        window = lis[-windowed_predictor.window_size:]
+        assert predict_or_error(windowed_predictor.predict, lis) == \
+               predict_or_error(predict_by_recursion, windowed_predictor.predictor, window)
+
+
+@pytest.mark.parametrize('windowed_predictor', get_windowed_predictors(), ids=lambda predictor: predictor.get_name())
+def test_sliding_stream_predicts_every_window_like_predict(windowed_predictor):
+    for lis in LISTS:
+        stream = windowed_predictor.stream()
+        for i, element in enumerate(lis):
+            stream.push(element)
+            assert predict_or_error(stream.peek_next) == predict_or_error(windowed_predictor.predict, lis[: i + 1])
+
+
+def test_only_the_predictors_with_fully_incremental_tables_slide_them():
+    assert type(WindowedPredictor(Subtraction(), 5).stream()) is SlidingWindowStream
+    assert type(WindowedPredictor(Division(), 5).stream()) is SlidingWindowStream
+    assert type(WindowedPredictor(DivisionCanDealWithZero(), 5).stream()) is HistoryWindowStream
+    assert type(WindowedPredictor(SlopeAndBias(), 5).stream()) is HistoryWindowStream
+
+
+def test_batch_of_windows_is_predicted_like_predict():
+    windowed_predictor = WindowedPredictor(Subtraction(), 6)
+    assert windowed_predictor.predict_batch(LISTS) == [windowed_predictor.predict(lis) for lis in LISTS]
+
+
+def test_window_size_is_at_least_1():
+    with pytest.raises(ValueError):
+        WindowedPredictor(Subtraction(), 0)